@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Per-document setup cost for batch chapter runs: Document() + set_styles()
+for every file (what st3.py/int.py did) against doctemplate.new_document()
+(one styled template per process, deep-copied per file).
+
+Reports the setup alone in ms per document, then whole chapters written
+in-process with st3.write_chapter() both ways (--chapters files, cycling
+through st3.chapters), and checks that the two produce the same parts.
+
+Usage (from School/Bkr):
+  python benchmarks/bench_doc_setup.py [--chapters 90] [--repeat 3]
+"""
+
+import io
+import os
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+import st3
+import doctemplate
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def legacy_document(set_styles):
+    """The per-file setup new_document() replaces."""
+    doc = Document()
+    set_styles(doc)
+    return doc
+
+
+def _parts(doc):
+    buf = io.BytesIO()
+    doc.save(buf)
+    with zipfile.ZipFile(buf) as z:
+        # python-docx writes no timestamps into the parts, so they compare byte for byte
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def write_batch(n, outdir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n):
+            ch = st3.chapters[i % len(st3.chapters)]
+            st3.write_chapter(f"{i:04d}_{ch['filename']}", ch, outdir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-document style setup.")
+    parser.add_argument("--chapters", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    doctemplate.template(st3.set_styles)
+    print(f"Template build (once per process): {(time.perf_counter() - t0) * 1000:.1f} ms")
+    assert _parts(legacy_document(st3.set_styles)) == _parts(doctemplate.new_document(st3.set_styles))
+    print("new_document() package matches Document() + set_styles()")
+
+    n = args.chapters
+    t_old = _best(lambda: [legacy_document(st3.set_styles) for _ in range(n)], args.repeat) / n
+    t_new = _best(lambda: [doctemplate.new_document(st3.set_styles) for _ in range(n)], args.repeat) / n
+    print(f"{'setup per document':<22} {t_old * 1000:>8.2f} ms -> {t_new * 1000:>6.2f} ms ({t_old / t_new:.1f}x)")
+
+    with tempfile.TemporaryDirectory() as outdir:
+        current = st3.new_document
+        try:
+            st3.new_document = legacy_document
+            w_old = _best(lambda: write_batch(n, outdir), args.repeat)
+        finally:
+            st3.new_document = current
+        w_new = _best(lambda: write_batch(n, outdir), args.repeat)
+    print(f"{f'{n} chapters written':<22} {w_old:>8.2f} s  -> {w_new:>6.2f} s  "
+          f"({w_old / n * 1000:.1f} -> {w_new / n * 1000:.1f} ms per file)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
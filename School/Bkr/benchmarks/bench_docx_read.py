@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+docx_read.iter_paragraphs() against python-docx's Document(path).paragraphs.
+
+For each DOCX it reports the best of --repeat reads in milliseconds, the
+speed-up over python-docx, the peak traced allocation of one read
+(tracemalloc) and whether both readers return the same paragraph strings.
+Without python-docx only docx_read is timed.
+
+Usage (from School/Bkr):
+  python benchmarks/bench_docx_read.py [FILE.docx ...] [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import importlib.util
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import docx_read
+
+SCHOOL = os.path.dirname(os.path.dirname(HERE))
+DEFAULT_FILES = [
+    os.path.join(SCHOOL, "final", "SChools.docx"),
+    os.path.join(SCHOOL, "Final Brain storming inshaallah.docx"),
+    os.path.join(SCHOOL, "Impact of LED lighting in the school international.docx"),
+]
+
+
+def python_docx_paragraphs(path):
+    from docx import Document
+    return [p.text.strip() for p in Document(path).paragraphs if p.text.strip()]
+
+
+def streamed_paragraphs(path):
+    return list(docx_read.iter_paragraphs(path))
+
+
+def _best(fn, path, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(path)
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def _peak_kb(fn, path):
+    tracemalloc.start()
+    fn(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the streaming DOCX reader.")
+    parser.add_argument("files", nargs="*", default=DEFAULT_FILES)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if importlib.util.find_spec("docx"):
+        readers = [("python-docx", python_docx_paragraphs), ("docx_read", streamed_paragraphs)]
+    else:
+        print("ℹ️ python-docx is not installed; timing docx_read only.")
+        readers = [("docx_read", streamed_paragraphs)]
+
+    print(f"{'file':42} {'reader':12} {'ms':>8} {'speed-up':>9} {'peak KB':>9} {'paras':>6} {'same':>5}")
+    for path in args.files:
+        ref = ref_ms = None
+        for name, fn in readers:
+            paras = fn(path)
+            ms = _best(fn, path, args.repeat)
+            if ref is None:
+                ref, ref_ms = paras, ms
+            print(f"{os.path.basename(path)[:42]:42} {name:12} {ms:>8.2f} {ref_ms / ms:>8.1f}x "
+                  f"{_peak_kb(fn, path):>9.0f} {len(paras):>6} {'yes' if paras == ref else 'NO':>5}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+PNG vs SVG figure output for the three booklet builders.
+
+For each builder and --figure-format it reports, with the figure cache off:
+  - render: time to produce every chapter figure (best of --repeat runs)
+  - build:  full build() time, image optimization included
+  - docx:   final DOCX size, and how much of it is figure media
+
+Builds run in a temporary directory; nothing is left behind.
+
+Usage (from School/Bkr):
+  python benchmarks/bench_figure_format.py [--repeat 3] [--builders st st2 file]
+"""
+
+import os
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+import contextlib
+import importlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import figures
+
+# builder module -> (render function name, parameter list name, dpi attribute or None)
+BUILDERS = {
+    "st": ("render_param", "PARAMS", "FIG_DPI"),
+    "st2": ("render_param", "PARAMS", "FIG_DPI"),
+    "file": ("render_parameter", "PARAMETERS", None),
+}
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), out
+
+
+def _media_bytes(path):
+    with zipfile.ZipFile(path) as z:
+        return sum(i.compress_size for i in z.infolist() if "/media/" in i.filename)
+
+
+def bench(name, figure_format, repeat):
+    mod = importlib.import_module(name)
+    render_name, params_name, dpi_name = BUILDERS[name]
+    render_one = getattr(mod, render_name)
+    params = getattr(mod, params_name)
+    dpi = getattr(mod, dpi_name) if dpi_name else None
+
+    render_s, _ = _best(lambda: figures.render_chapter_figures(render_one, params, figure_format, dpi), repeat)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        build_s, out = _best(lambda: mod.build(use_cache=False, figure_format=figure_format), repeat)
+    return {
+        "builder": name, "format": figure_format, "figures": len(params),
+        "render_s": render_s, "build_s": build_s,
+        "docx_kb": os.path.getsize(out) / 1024, "media_kb": _media_bytes(out) / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PNG vs SVG booklet figures.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--builders", nargs="+", choices=list(BUILDERS), default=list(BUILDERS))
+    args = parser.parse_args(argv)
+
+    rows = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # the builders write under the current directory
+        try:
+            for name in args.builders:
+                for fmt in figures.FIGURE_FORMATS:
+                    rows.append(bench(name, fmt, args.repeat))
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'builder':8} {'format':6} {'figs':>4} {'render s':>9} {'build s':>8} {'docx KB':>8} {'media KB':>9}")
+    for r in rows:
+        print(f"{r['builder']:8} {r['format']:6} {r['figures']:>4} {r['render_s']:>9.2f} "
+              f"{r['build_s']:>8.2f} {r['docx_kb']:>8.1f} {r['media_kb']:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput of keyvalues.py against the per-pattern extractor it replaced.
+
+The text is the corpus store (corpus.py ingest) when it has been filled,
+otherwise a synthetic study of lighting sentences padded with prose; either
+way it is repeated up to --mb megabytes. Reported in MB/s (UTF-8), best of --repeat:
+
+  old       the former st2.extract_key_values: six findall/search scans plus
+            one regex per age label over the joined text
+  scan      keyvalues.scan() over the whole string
+  stream    keyvalues.scan_stream() over --chunk-kb chunks
+
+The summaries of old and scan are compared on the synthetic text, where
+both agree by construction.
+
+Usage (from School/Bkr):
+  python benchmarks/bench_keyvalues.py [--mb 8 32] [--chunk-kb 64] [--synthetic]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+import keyvalues
+
+SENTENCES = [
+    "Classrooms were lit at 4000 K and 6500K with 500 lux on the desks and 300 lx vertical.",
+    "Luminaires with CRI ≥ 80 were compared; flicker at 120 Hz and 100Hz was measured.",
+    "Pupils in kindergarten and primary school showed a 12.5% improvement in reading speed.",
+    "Adolescent students reported an 8 % reduction in headaches after the retrofit.",
+    "The study followed 154 children over two school years in three buildings.",
+]
+# Plain prose between the values, roughly the density of a real paper
+FILLER = (
+    "Daylight availability differed between the east and west wings, and the teachers were free to "
+    "switch the luminaires as they saw fit during lessons. Questionnaires on visual comfort, mood and "
+    "perceived concentration were handed out at the end of each week, and the responses were coded "
+    "blind to the lighting condition by two independent raters."
+)
+
+
+def old_extract(paragraphs):
+    """The per-pattern extractor keyvalues.py replaced (kept here as the reference)."""
+    txt = "\n".join(paragraphs)
+    res = {}
+    cct = re.findall(r"(\b[23-7]\d{2,3})\s*K\b", txt, flags=re.IGNORECASE)
+    if cct:
+        res['CCT_values'] = sorted(set(int(x) for x in cct))
+    lux = re.findall(r"(\b\d{2,4})\s*(?:lux|LX|Lux)\b", txt, flags=re.IGNORECASE)
+    if lux:
+        res['Lux_values'] = sorted(set(int(x) for x in lux))
+    if re.search(r"\bCRI\b", txt, flags=re.IGNORECASE):
+        cri_vals = re.findall(r"CRI.*?(\d{2,3})", txt, flags=re.IGNORECASE)
+        if cri_vals:
+            res['CRI_values'] = sorted(set(int(x) for x in cri_vals))
+    flick = re.findall(r"(\b\d{2,4})\s*Hz\b", txt, flags=re.IGNORECASE)
+    if flick:
+        res['Flicker_freqs_Hz'] = sorted(set(int(x) for x in flick))
+    age_hits = {}
+    for age_label in keyvalues.AGE_LABELS:
+        if re.search(r"\b" + age_label + r"\b", txt, flags=re.IGNORECASE):
+            age_hits[age_label] = True
+    if age_hits:
+        res['age_mentions'] = list(age_hits.keys())
+    pct_changes = re.findall(r"([\d]{1,3}\.?\d{0,2})\s*%\s*(?:improv|increase|decrease|reduc)", txt,
+                             flags=re.IGNORECASE)
+    if pct_changes:
+        res['percent_changes'] = pct_changes
+    return res
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def source_text(synthetic):
+    if not synthetic:
+        texts = [text for _, text in corpus.texts()]
+        if texts:
+            return "\n".join(texts), f"corpus store ({len(texts)} files)"
+    return "\n".join(s + " " + FILLER for s in SENTENCES), "synthetic"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass key-value extractor.")
+    parser.add_argument("--mb", nargs="+", type=float, default=[8, 32])
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--synthetic", action="store_true", help="ignore the corpus store")
+    args = parser.parse_args(argv)
+
+    base, label = source_text(args.synthetic)
+    if label == "synthetic":
+        assert old_extract(base.split("\n")) == keyvalues.summarize(keyvalues.scan(base))
+    print(f"Text: {label}")
+    print(f"{'MB':>6} {'old MB/s':>9} {'scan MB/s':>10} {'stream MB/s':>12} {'hits':>9}")
+    chunk = args.chunk_kb * 1024
+    for mb in args.mb:
+        reps = max(1, int(mb * 1024 * 1024 // len(base.encode("utf-8"))))
+        text = "\n".join([base] * reps)
+        size = len(text.encode("utf-8")) / 1024 / 1024
+        paragraphs = text.split("\n")
+        hits = []
+        t_old = _best(lambda: old_extract(paragraphs), args.repeat)
+        t_scan = _best(lambda: hits.append(len(keyvalues.scan(text))), args.repeat)
+        t_stream = _best(lambda: sum(1 for _ in keyvalues.scan_stream(
+            text[i:i + chunk] for i in range(0, len(text), chunk))), args.repeat)
+        print(f"{size:>6.1f} {size / t_old:>9.1f} {size / t_scan:>10.1f} {size / t_stream:>12.1f} {hits[0]:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+PDF backend (pdf_writer.py) against the DOCX path for full booklets.
+
+For each builder it times build() three ways, best of --repeat runs:
+  - docx:        python-docx with PNG figures (the default build)
+  - docx+stream: docx_stream.StreamingDocument with PNG figures
+  - pdf:         --backend pdf, vector figures embedded in the PDF
+
+once with figures rendered from scratch (cache off) and once from a warm
+figure cache (document assembly alone), and reports output size and, for
+the PDF, page count. Converting the DOCX with LibreOffice is what the PDF
+backend replaces; when `soffice` is on PATH that conversion is timed too.
+
+Builds run in a temporary directory; nothing is left behind.
+
+Usage (from School/Bkr):
+  python benchmarks/bench_pdf.py [--repeat 3] [--builders st st2 file]
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import importlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BUILDERS = ("st", "st2", "file")
+PATHS = {
+    "docx": dict(backend="docx"),
+    "docx+stream": dict(backend="docx", stream=True),
+    "pdf": dict(backend="pdf"),
+}
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), out
+
+
+def _pages(path):
+    with open(path, "rb") as fh:
+        return len(re.findall(rb"/Type /Page\b(?!s)", fh.read()))
+
+
+def soffice_convert(docx, outdir):
+    """Seconds LibreOffice takes to convert docx to PDF, or None without soffice."""
+    exe = shutil.which("soffice") or shutil.which("libreoffice")
+    if exe is None:
+        return None
+    t0 = time.perf_counter()
+    subprocess.run([exe, "--headless", "--convert-to", "pdf", "--outdir", outdir, docx],
+                   check=True, capture_output=True)
+    return time.perf_counter() - t0
+
+
+def bench(name, repeat):
+    mod = importlib.import_module(name)
+    rows = []
+    for label, kwargs in PATHS.items():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            cold, out = _best(lambda: mod.build(use_cache=False, **kwargs), repeat)
+            mod.build(**kwargs)  # fill the figure cache for this format
+            warm, out = _best(lambda: mod.build(**kwargs), repeat)
+        rows.append({
+            "builder": name, "path": label, "cold_s": cold, "warm_s": warm,
+            "kb": os.path.getsize(out) / 1024, "pages": _pages(out) if out.endswith(".pdf") else None,
+            "out": out,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PDF backend against DOCX booklets.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--builders", nargs="+", choices=BUILDERS, default=list(BUILDERS))
+    args = parser.parse_args(argv)
+
+    rows = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # the builders write under the current directory
+        try:
+            for name in args.builders:
+                rows.extend(bench(name, args.repeat))
+            converted = {r["builder"]: soffice_convert(r["out"], os.path.join(tmp, "soffice"))
+                         for r in rows if r["path"] == "docx"}
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'builder':8} {'path':12} {'cold s':>7} {'warm s':>7} {'KB':>8} {'pages':>5}")
+    for r in rows:
+        pages = "" if r["pages"] is None else r["pages"]
+        print(f"{r['builder']:8} {r['path']:12} {r['cold_s']:>7.2f} {r['warm_s']:>7.2f} {r['kb']:>8.1f} {pages:>5}")
+    for name, seconds in converted.items():
+        if seconds is None:
+            print(f"{name}: soffice not found, DOCX -> PDF conversion not timed")
+        else:
+            print(f"{name}: DOCX -> PDF with soffice {seconds:.2f} s (on top of the docx build)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Rooms scored per second by response.score_rooms(), against a per-room loop
+of np.interp / gaussian_peak / descending_curve calls (one curve at a time,
+the way the charts evaluate them).
+
+Each room has one reading per parameter of the edition, drawn uniformly over
+that parameter's span. Best of --repeat runs.
+
+Usage (from School/Bkr):
+  python benchmarks/bench_response.py [--rooms 1e3 1e4 1e5 1e6] [--edition booklet]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import registry
+import response
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def loop_scores(values, edition):
+    """One room at a time, one parameter at a time (reference and for scale)."""
+    specs = registry.specs(edition)
+    peaks = response.peak_response(edition)
+    scores = []
+    for room in values.T:
+        total = 0.0
+        for p, v, peak in zip(specs, room, peaks):
+            anchors = registry.spec_anchors(edition, p)
+            if anchors is not None:
+                y = np.interp(v, *anchors)
+            else:
+                x0, x1 = registry.spec_span(edition, p)
+                xn = np.array([(v - x0) / (x1 - x0 + 1e-9)])
+                if p["curve"] == "gaussian":
+                    y = np.exp(-((xn[0] - p.get("curve_center", 0.5)) ** 2) / (2 * registry.GAUSSIAN_WIDTH ** 2))
+                else:
+                    y = 1.0 / (1.0 + np.exp((xn[0] - registry.DESCENDING_KNEE) * 12.0))
+            score = y / peak
+            total += 1.0 - score if registry.spec_direction(edition, p) == "risk" else score
+        scores.append(total / len(specs))
+    return np.array(scores)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark batched dose-response scoring.")
+    parser.add_argument("--rooms", nargs="+", type=float, default=[1e3, 1e4, 1e5, 1e6])
+    parser.add_argument("--edition", default="booklet")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    span = registry.stacked(args.edition)["span"]
+
+    def rooms(n):
+        return span[:, :1] + rng.random((len(span), n)) * (span[:, 1:] - span[:, :1])
+
+    sample = rooms(2000)
+    t_loop = _best(lambda: loop_scores(sample, args.edition), 1)
+    assert np.allclose(loop_scores(sample, args.edition), response.score_rooms(sample, args.edition))
+    loop_rate = sample.shape[1] / t_loop
+    print(f"{args.edition}: {len(span)} parameters per room")
+    print(f"Per-room loop reference: {loop_rate:,.0f} rooms/s (scores match)")
+
+    print(f"{'rooms':>10} {'rooms/s':>14} {'speedup':>8}")
+    for size in args.rooms:
+        values = rooms(int(size))
+        t = _best(lambda: response.score_rooms(values, args.edition), args.repeat)
+        print(f"{values.shape[1]:>10,} {values.shape[1] / t:>14,.0f} {values.shape[1] / t / loop_rate:>7.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput of zones.classify() on synthetic survey data.
+
+For each size N it draws N uniform random readings per parameter across its
+charted span (plus 10% either side, ~0.1% NaN) and reports the best of
+--repeat runs in million readings per second, per parameter and for the
+whole (P, N) block classified in one call.
+
+A plain per-reading Python loop is timed on a small sample for reference,
+and its zone codes are checked against the vectorized ones.
+
+Usage (from School/Bkr):
+  python benchmarks/bench_zones.py [--sizes 1e5 1e6 1e7] [--edition booklet]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import zones
+import registry
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def synthetic(edges, n, rng):
+    """(P, n) readings spread over each parameter's danger span +/- 10%."""
+    lo, hi = edges[:, 0], edges[:, 5]
+    pad = 0.1 * (hi - lo)
+    u = rng.random((len(edges), n))
+    values = (lo - pad)[:, None] + u * (hi - lo + 2 * pad)[:, None]
+    values[rng.random(values.shape) < 0.001] = np.nan
+    return values
+
+
+def loop_reference(values, e):
+    """What a per-reading loop looks like; only used to check results and for scale."""
+    out = []
+    for v in values:
+        if v != v:
+            out.append(zones.MISSING)
+        elif e[2] <= v <= e[3]:
+            out.append(zones.GOOD)
+        elif e[1] <= v <= e[4]:
+            out.append(zones.WARN)
+        else:
+            out.append(zones.DANGER)
+    return np.array(out, dtype=np.int8)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized zone classifier.")
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e5, 1e6, 1e7])
+    parser.add_argument("--edition", default="booklet")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    ids = registry.ids(args.edition)
+    edges = np.asarray(registry.band_edges(args.edition))
+
+    sample = synthetic(edges, 20_000, rng)
+    t_loop = 0.0
+    for i in range(len(ids)):
+        t0 = time.perf_counter()
+        ref = loop_reference(sample[i], edges[i])
+        t_loop += time.perf_counter() - t0
+        assert np.array_equal(ref, zones.classify(sample[i], edges[i])[0]), ids[i]
+    loop_rate = sample.size / t_loop / 1e6
+    print(f"Python loop reference: {loop_rate:.2f} M readings/s (results match)")
+
+    print(f"{'readings':>12} {'per-param M/s':>14} {'block M/s':>10} {'speedup':>8}")
+    for size in args.sizes:
+        n = int(size)
+        values = synthetic(edges, n, rng)
+        t_param = sum(_best(lambda i=i: zones.classify(values[i], edges[i]), args.repeat) for i in range(len(ids)))
+        t_block = _best(lambda: zones.classify(values, edges[:, None, :]), args.repeat)
+        block_rate = values.size / t_block / 1e6
+        print(f"{values.size:>12,} {values.size / t_param / 1e6:>14.1f} {block_rate:>10.1f} "
+              f"{block_rate / loop_rate:>7.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
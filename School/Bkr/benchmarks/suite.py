@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Regression benchmarks for the document builders, compared with a stored baseline.
+
+Each case builds one document set on fixed inputs, scaled 1x, 10x and 100x:
+  - st, st2, file: the booklets with their parameter lists repeated k times
+                   (k times the chapters and figures; figure cache off)
+  - st3:           the chapter files, chapter list repeated k times (--force)
+  - rooms:         room_reports.py on a seeded sample CSV of 100*k rooms
+
+and records, from the builder's timing.py stages:
+  render_s    figure rendering (render figures / room background + charts)
+  save_s      doc.save() (summed over files)
+  optimize_s  imgopt palette pass (booklets)
+  assembly_s  everything else in the build: document model, pictures, text
+  total_s     whole build; out_kb: size of everything written; peak_mb
+
+Every case runs in a fresh interpreter (no warm module caches, honest peak
+memory); small cases are repeated --repeat times and the best run is kept.
+
+  python benchmarks/suite.py --save-baseline           # record benchmarks/baseline.json
+  python benchmarks/suite.py                           # compare; exit 1 on regression
+  python benchmarks/suite.py --cases st st3 --scales 1 10 --time-threshold 0.5
+
+A time metric regresses when it is more than --time-threshold slower (relative)
+AND more than --min-delta seconds slower; out_kb when it grows more than
+--size-threshold. Baselines are machine-specific: the suite warns when the
+baseline was recorded on a different machine/Python.
+
+Usage (from School/Bkr):
+  python benchmarks/suite.py [--cases ...] [--scales 1 10 100] [--repeat 3]
+                             [--baseline PATH] [--save-baseline] [--output results.json] [-v]
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+import importlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import timing
+
+BASELINE = os.path.join(HERE, "baseline.json")
+CASES = ("st", "st2", "file", "st3", "rooms")
+SCALES = (1, 10, 100)
+ROOMS_PER_SCALE = 100
+SMALL_CASE = 1  # scales up to this are repeated --repeat times; larger ones run once
+
+# Which top-level timing stages count as rendering / saving / image optimization
+RENDER_STAGES = {"render figures", "background", "room chart"}
+SAVE_STAGES = {"save"}
+OPTIMIZE_STAGES = {"optimize images"}
+TIME_METRICS = ("render_s", "assembly_s", "save_s", "optimize_s", "total_s")
+
+
+def scaled(items, k, key, filename=None):
+    """items repeated k times; copies get " (2)", " (3)"... on item[key] (and unique file names)."""
+    out = []
+    for i in range(k):
+        for item in items:
+            item = dict(item)
+            if i:
+                item[key] = f"{item[key]} ({i + 1})"
+                if filename:
+                    stem, ext = os.path.splitext(item[filename])
+                    item[filename] = f"{stem}_{i + 1}{ext}"
+            out.append(item)
+    return out
+
+
+def _sizes(paths):
+    return sum(os.path.getsize(p) for p in paths if os.path.isfile(p))
+
+
+def _stage_sum(stages, names):
+    """Wall seconds of the outermost stages whose own name is in names."""
+    total = 0.0
+    for s in stages:
+        parts = s["stage"].split("/")
+        if parts[-1] in names and not any(p in names for p in parts[:-1]):
+            total += s["wall_s"]
+    return total
+
+
+# ---------- One case (runs in its own interpreter) ----------
+def run_case(name, k, workdir):
+    """Build case name at scale k inside workdir; return (report dict, output bytes)."""
+    os.chdir(workdir)  # the booklet builders write under the current directory
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if name in ("st", "st2", "file"):
+            mod = importlib.import_module(name)
+            attr, key = ("PARAMETERS", "name") if name == "file" else ("PARAMS", "title")
+            setattr(mod, attr, scaled(getattr(mod, attr), k, key))
+            with timing.recording(f"{name}@{k}x") as rec:
+                out = mod.build(use_cache=False)
+            size = _sizes([out])
+        elif name == "st3":
+            mod = importlib.import_module("st3")
+            mod.chapters = scaled(mod.chapters, k, "title", filename="filename")
+            with timing.recording(f"st3@{k}x") as rec:
+                paths = mod.build(os.path.join(workdir, "chapters"), force=True)
+            size = _sizes(paths)
+        elif name == "rooms":
+            mod = importlib.import_module("room_reports")
+            csv_path = os.path.join(workdir, "rooms.csv")
+            mod.write_sample_csv(csv_path, ROOMS_PER_SCALE * k)
+            outdir = os.path.join(workdir, "room_reports")
+            with timing.recording(f"rooms@{k}x") as rec:
+                mod.build(csv_path, outdir, use_cache=False)
+            size = _sizes(os.path.join(outdir, f) for f in os.listdir(outdir))
+        else:
+            raise ValueError(f"unknown case {name!r} (expected one of {CASES})")
+    return rec.report(), size
+
+
+def metrics(report, size):
+    stages = report["stages"]
+    total = report["total"]["wall_s"]
+    render = _stage_sum(stages, RENDER_STAGES)
+    save = _stage_sum(stages, SAVE_STAGES)
+    optimize = _stage_sum(stages, OPTIMIZE_STAGES)
+    return {
+        "render_s": round(render, 4), "assembly_s": round(total - render - save - optimize, 4),
+        "save_s": round(save, 4), "optimize_s": round(optimize, 4), "total_s": round(total, 4),
+        "out_kb": round(size / 1024, 1), "peak_mb": report["total"]["peak_rss_mb"],
+    }
+
+
+def _worker(name, k, result_path):
+    with tempfile.TemporaryDirectory() as workdir:
+        report, size = run_case(name, k, workdir)
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(metrics(report, size), f)
+    return 0
+
+
+def measure(name, k, repeat):
+    """Best-of-repeat metrics for one case, each run in a fresh interpreter."""
+    best = None
+    for _ in range(repeat if k <= SMALL_CASE else 1):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = os.path.join(tmp, "result.json")
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", name, str(k), result],
+                           check=True, env=dict(os.environ, LIGHTING_FIGCACHE_DIR=os.path.join(tmp, "figcache")))
+            with open(result, encoding="utf-8") as f:
+                m = json.load(f)
+        if best is None or m["total_s"] < best["total_s"]:
+            best = m
+    return best
+
+
+# ---------- Baseline comparison ----------
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.node(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, time_threshold, size_threshold, min_delta):
+    """[(case, metric, base, new, verdict)] for every metric present in both."""
+    rows = []
+    for case, new in results.items():
+        base = baseline.get("results", {}).get(case)
+        if base is None:
+            rows.append((case, None, None, None, "new"))
+            continue
+        for metric in TIME_METRICS + ("out_kb",):
+            b, n = base.get(metric), new.get(metric)
+            if b is None or n is None:
+                continue
+            if metric == "out_kb":
+                bad = n > b * (1 + size_threshold)
+            else:
+                bad = n > b * (1 + time_threshold) and n - b > min_delta
+            rows.append((case, metric, b, n, "REGRESSION" if bad else "ok"))
+    return rows
+
+
+def _print_results(results):
+    print(f"{'case':10} {'render s':>9} {'assembly s':>10} {'save s':>7} {'optimize s':>10} "
+          f"{'total s':>8} {'out KB':>9} {'peak MB':>8}")
+    for case, m in results.items():
+        print(f"{case:10} {m['render_s']:>9.2f} {m['assembly_s']:>10.2f} {m['save_s']:>7.2f} "
+              f"{m['optimize_s']:>10.2f} {m['total_s']:>8.2f} {m['out_kb']:>9.1f} {m['peak_mb'] or 0:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the builder benchmarks and compare with the baseline.")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--scales", nargs="+", type=int, default=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per 1x case; the best is kept (default: 3)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--time-threshold", type=float, default=0.25,
+                        help="allowed relative slowdown per time metric (default: 0.25 = +25%%)")
+    parser.add_argument("--size-threshold", type=float, default=0.05,
+                        help="allowed relative growth of the output size (default: 0.05)")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many seconds (default: 0.05)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every compared metric, not just regressions")
+    parser.add_argument("--worker", nargs=3, metavar=("CASE", "SCALE", "RESULT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        name, k, result = args.worker
+        return _worker(name, int(k), result)
+
+    results = {}
+    for name in args.cases:
+        for k in args.scales:
+            print(f"⏳ {name} @ {k}x ...", flush=True)
+            results[f"{name}@{k}x"] = measure(name, k, args.repeat)
+    _print_results(results)
+
+    record = {"machine": machine(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=1)
+            f.write("\n")
+        print(f"✅ Baseline written: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️ No baseline at {args.baseline}; record one with --save-baseline.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != record["machine"]:
+        print(f"⚠️ Baseline was recorded on {baseline.get('machine')}; timings may not be comparable.")
+    rows = compare(results, baseline, args.time_threshold, args.size_threshold, args.min_delta)
+    regressions = [r for r in rows if r[4] == "REGRESSION"]
+    for case, metric, b, n, verdict in rows:
+        if verdict == "new":
+            print(f"  {case:10} not in the baseline")
+        elif verdict == "REGRESSION" or args.verbose:
+            print(f"  {case:10} {metric:11} {b:>9.2f} -> {n:>9.2f} ({(n - b) / b if b else 0:+.0%}) {verdict}")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) against {args.baseline}")
+        return 1
+    print(f"✅ No regressions against {args.baseline} "
+          f"(time +{args.time_threshold:.0%} and +{args.min_delta:g} s, size +{args.size_threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
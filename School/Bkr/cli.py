@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+One entry point for every document in this folder.
+
+  python cli.py intro                 # Intro_School_Lighting.docx        (int.py)
+  python cli.py chapters [-j N]       # school_lighting_chapters/*.docx   (st3.py, incremental)
+  python cli.py booklet  [-j N]       # School_Lighting_Booklet_FULL.docx (st.py; --backend pdf for .pdf)
+  python cli.py merged   [-j N]       # School_Lighting_Booklet_Merged.docx (st2.py)
+  python cli.py final    [-j N]       # School_Lighting_Booklet_FINAL.docx (file.py)
+  python cli.py assemble              # School_Lighting_Chapters_Booklet.docx (docx_merge.py, no re-render)
+  python cli.py rooms rooms.csv       # room_reports/<room>.docx         (room_reports.py)
+  python cli.py escai                 # Smart_Lighting_Research_Final.docx (../../escai/file_old.py)
+
+Only the standard library is imported up front. Each subcommand imports its
+builder module when it runs, so text-only documents (intro, chapters) never
+load matplotlib or numpy, and `--help` starts instantly.
+
+Outputs go to the current directory, exactly as when running the scripts.
+--timings/--profile (before the command) record per-stage timings for any
+of them (timing.py):
+
+  python cli.py --timings report.json merged
+"""
+
+import sys
+import argparse
+import importlib
+import importlib.util
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ESCAI_SCRIPT = HERE.parent.parent / "escai" / "file_old.py"
+
+if str(HERE) not in sys.path:
+    sys.path.insert(0, str(HERE))
+
+
+def _load(name):
+    return importlib.import_module(name)
+
+
+def _load_escai():
+    spec = importlib.util.spec_from_file_location("escai_paper", ESCAI_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---------- Subcommands ----------
+def _figure_kwargs(args):
+    return dict(workers=args.workers, use_cache=args.use_cache, save_images=args.save_images,
+                optimize_images=args.optimize_images, figure_format=args.figure_format, stream=args.stream,
+                backend=args.backend, pipeline=args.pipeline, lossy_images=args.lossy_images)
+
+def cmd_intro(args):
+    return _load("int").build()
+
+def cmd_chapters(args):
+    return _load("st3").build(force=args.force, bundle=args.bundle, workers=args.workers)
+
+def cmd_booklet(args):
+    return _load("st").build(**_figure_kwargs(args))
+
+def cmd_merged(args):
+    return _load("st2").build(**_figure_kwargs(args))
+
+def cmd_final(args):
+    return _load("file").build(**_figure_kwargs(args))
+
+def cmd_assemble(args):
+    return _load("docx_merge").build(args.output, args.parts, args.page_breaks)
+
+def cmd_rooms(args):
+    return _load("room_reports").build(args.csv, args.outdir, args.edition, args.workers, args.use_cache,
+                                       args.batch_size, args.sample)
+
+def cmd_escai(args):
+    return _load_escai().build()
+
+
+def _figure_args(parser):
+    # figures.py, docx_stream.py and pdf_writer.py only pull in the standard library at import time
+    from figures import (add_workers_arg, add_cache_arg, add_save_images_arg, add_optimize_arg, add_format_arg,
+                         add_pipeline_arg)
+    from docx_stream import add_stream_arg
+    from pdf_writer import add_backend_arg
+    add_workers_arg(parser)
+    add_cache_arg(parser)
+    add_save_images_arg(parser)
+    add_optimize_arg(parser)
+    add_format_arg(parser)
+    add_pipeline_arg(parser)
+    add_stream_arg(parser)
+    add_backend_arg(parser)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Build the school lighting documents.")
+    # timing.py is standard library only, like figures.py
+    from timing import add_timing_args
+    add_timing_args(parser)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("intro", help="introduction DOCX (int.py)").set_defaults(func=cmd_intro)
+    p = sub.add_parser("chapters", help="one DOCX per parameter (st3.py)")
+    # Same flags as st3.add_rebuild_args, kept here so the parser never imports python-docx
+    p.add_argument("--force", action="store_true", help="rewrite every chapter, ignoring the build manifest")
+    p.add_argument("--bundle", action="store_true", help="also write school_lighting_chapters.zip (chapters and intro)")
+    p.add_argument("-j", "--workers", type=int, default=1, help="chapter writer processes (0 = one per CPU core)")
+    p.set_defaults(func=cmd_chapters)
+    for name, func, text in [
+        ("booklet", cmd_booklet, "full booklet with figures (st.py)"),
+        ("merged", cmd_merged, "booklet merged with the uploaded study (st2.py)"),
+        ("final", cmd_final, "final booklet with benefit/risk curves (file.py)"),
+    ]:
+        p = sub.add_parser(name, help=text)
+        _figure_args(p)
+        p.set_defaults(func=func)
+    p = sub.add_parser("assemble", help="merge the existing intro and chapter DOCX files (docx_merge.py)")
+    # Same arguments as docx_merge.add_merge_args; lxml is only imported when the command runs
+    p.add_argument("parts", nargs="*", type=Path, help="DOCX files in order (default: intro, then chapters)")
+    p.add_argument("-o", "--output", type=Path, default=Path("School_Lighting_Chapters_Booklet.docx"))
+    p.add_argument("--no-page-breaks", dest="page_breaks", action="store_false")
+    p.set_defaults(func=cmd_assemble)
+    p = sub.add_parser("rooms", help="one compliance report per classroom from a CSV (room_reports.py)")
+    # Same arguments as room_reports.add_rooms_args, which would pull in numpy here
+    p.add_argument("csv", help="room table: room, [school,] one column per parameter id")
+    p.add_argument("-o", "--outdir", default=str(Path.cwd() / "room_reports"))
+    p.add_argument("--edition", default="booklet", choices=("booklet", "merged", "final"))
+    p.add_argument("--batch-size", type=int, default=256)
+    p.add_argument("--sample", type=int, metavar="N", help="first write N synthetic rooms to the CSV path")
+    from figures import add_workers_arg, add_cache_arg
+    add_workers_arg(p)
+    add_cache_arg(p)
+    p.set_defaults(func=cmd_rooms)
+    sub.add_parser("escai", help="eSCai smart street-lighting paper (escai/file_old.py)").set_defaults(func=cmd_escai)
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    from timing import session
+    with session(args.timings, args.profile, args.command):
+        out = args.func(args)
+    if hasattr(out, "rebuilt"):
+        print(f"✅ {out.rebuilt} files rebuilt, {out.up_to_date} up to date.")
+    elif isinstance(out, (list, tuple)):
+        print(f"✅ {len(out)} files written.")
+    else:
+        print("✅ Written:", out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
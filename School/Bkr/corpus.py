@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Plain-text store for the research-paper corpus behind the booklets.
+
+The corpus is every PDF in `school Papers/` and `School/school Papers/` plus
+the DOCX studies in `School/` (CORPUS below). ingest() extracts the text of
+each file, over a process pool, into a persistent store keyed by the SHA-256
+of the file's bytes:
+
+  - a paper that sits in both paper folders is one key, extracted once
+  - an unchanged file is recognised by its (size, mtime) stamp in the store's
+    index and not even re-hashed, so a re-run over an unchanged corpus only
+    checks stamps and that each text is present
+  - bumping EXTRACTOR_VERSION re-extracts everything
+
+PDF pages are separated by a form feed ("\\f"); DOCX text is one paragraph
+(or table row) per line. Files that fail to extract are reported and retried
+on the next run.
+
+The store lives in $LIGHTING_CORPUS_DIR (default ~/.cache/school_lighting/corpus).
+
+Usage (from School/Bkr):
+  python corpus.py ingest [-j N]     # extract new/changed files (0 = one process per core)
+  python corpus.py info              # files, unique texts, size, location
+  python corpus.py show PATH         # print the stored text of one file
+  python corpus.py clear
+
+Requirements:
+  pip install pypdf   (DOCX files are read with the standard library, docx_read.py)
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import docx_read
+from figures import resolve_workers
+from timing import stage, count, session, add_timing_args
+
+HERE = Path(__file__).resolve().parent
+REPO = HERE.parent.parent
+# (folder relative to the repository root, glob)
+CORPUS = (
+    ("school Papers", "*.pdf"),
+    ("School/school Papers", "*.pdf"),
+    ("School", "*.docx"),
+)
+STORE_DIR = Path(os.environ.get(
+    "LIGHTING_CORPUS_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "school_lighting", "corpus"),
+))
+INDEX_NAME = "index.json"
+# Bump when the extractors below change their output
+EXTRACTOR_VERSION = 2
+HASH_CHUNK = 1 << 20
+
+
+# ---------- Corpus files ----------
+def corpus_files(root=REPO, corpus=CORPUS):
+    """Every corpus file in a stable order; Word lock files (~$...) are skipped."""
+    files = []
+    for folder, pattern in corpus:
+        files.extend(sorted(p for p in (Path(root) / folder).glob(pattern)
+                            if p.is_file() and not p.name.startswith("~$")))
+    return files
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _stamp(path):
+    st = Path(path).stat()
+    return [st.st_size, st.st_mtime_ns]
+
+def _rel(path, root=REPO):
+    try:
+        return Path(path).resolve().relative_to(Path(root).resolve()).as_posix()
+    except ValueError:
+        return Path(path).resolve().as_posix()
+
+
+# ---------- Extraction (runs in the pool) ----------
+def pdf_text(path):
+    """Text of every page, pages separated by a form feed."""
+    from pypdf import PdfReader
+    reader = PdfReader(str(path))
+    return "\f".join((page.extract_text() or "").strip() for page in reader.pages)
+
+def docx_text(path):
+    """Paragraphs and table rows of a DOCX, one per line, in body order (docx_read.py)."""
+    return docx_read.read_text(path)
+
+EXTRACTORS = {".pdf": pdf_text, ".docx": docx_text}
+
+def _extract_job(path):
+    """(text, None) or (None, error text); never raises, so one bad file cannot stop the pool."""
+    try:
+        return EXTRACTORS[Path(path).suffix.lower()](path), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+# ---------- Store ----------
+def _text_path(sha, store_dir=None):
+    return Path(store_dir or STORE_DIR) / sha[:2] / f"{sha}.v{EXTRACTOR_VERSION}.txt"
+
+def has_text(sha, store_dir=None):
+    return _text_path(sha, store_dir).exists()
+
+def read_text(sha, store_dir=None):
+    """Stored text for a file hash, or None when it was never extracted."""
+    try:
+        return _text_path(sha, store_dir).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+def _write_atomic(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def load_index(store_dir=None):
+    try:
+        return json.loads((Path(store_dir or STORE_DIR) / INDEX_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def store_text(sha, text, store_dir=None):
+    _write_atomic(_text_path(sha, store_dir), text)
+
+def save_index(index, store_dir=None):
+    _write_atomic(Path(store_dir or STORE_DIR) / INDEX_NAME, json.dumps(index, indent=1, ensure_ascii=False))
+
+
+# ---------- Ingest ----------
+def ingest(files=None, workers=0, store_dir=None, root=REPO):
+    """
+    Bring the store up to date with the corpus and return its index entries,
+    one per file in corpus order: {"path", "sha256", "stamp", "chars"}
+    ("error" instead of "chars" for files that could not be read).
+    """
+    files = corpus_files(root) if files is None else [Path(f) for f in files]
+    old = load_index(store_dir).get("files", {})
+
+    with stage("hash files"):
+        entries = []
+        for path in files:
+            rel, stamp = _rel(path, root), _stamp(path)
+            prev = old.get(rel)
+            if prev and prev.get("stamp") == stamp and prev.get("sha256"):
+                sha = prev["sha256"]  # unchanged since the last run: no need to read it
+            else:
+                sha = file_sha256(path)
+                count("files hashed")
+            entries.append({"path": rel, "sha256": sha, "stamp": stamp, "_file": path})
+
+    # One extraction per distinct content; the first path with that content is the one read
+    todo = {}
+    for e in entries:
+        if e["sha256"] not in todo and not has_text(e["sha256"], store_dir):
+            todo[e["sha256"]] = e["_file"]
+    count("texts up to date", len({e["sha256"] for e in entries}) - len(todo))
+    count("texts extracted", len(todo))
+
+    errors = {}
+    with stage("extract text"):
+        shas, paths = list(todo), [str(p) for p in todo.values()]
+        n = resolve_workers(workers, len(paths))
+        if n == 1:
+            results = map(_extract_job, paths)
+        else:
+            pool = ProcessPoolExecutor(max_workers=n)
+            results = pool.map(_extract_job, paths)
+        try:
+            for sha, path, (text, error) in zip(shas, paths, results):
+                if error is None:
+                    store_text(sha, text, store_dir)
+                    print(f"Extracted: {_rel(path, root)} ({len(text)} chars)")
+                else:
+                    print(f"❌ Failed: {_rel(path, root)}: {error}")
+                    errors[sha] = error
+        finally:
+            if n > 1:
+                pool.shutdown()
+
+    index = {"extractor": EXTRACTOR_VERSION, "files": {}}
+    for e in entries:
+        path = e.pop("_file")
+        if e["sha256"] in errors:
+            e["error"] = errors[e["sha256"]]
+            continue  # no index entry, so the next run hashes and retries it
+        text = read_text(e["sha256"], store_dir)
+        e["chars"] = len(text) if text is not None else 0
+        index["files"][e["path"]] = {k: v for k, v in e.items() if k != "path"}
+    save_index(index, store_dir)
+    return entries
+
+def texts(store_dir=None):
+    """Yield (path, text) for every indexed file whose text is stored; duplicates share one text."""
+    for rel, e in load_index(store_dir).get("files", {}).items():
+        text = read_text(e["sha256"], store_dir)
+        if text is not None:
+            yield rel, text
+
+def clear(store_dir=None):
+    root = Path(store_dir or STORE_DIR)
+    if root.is_dir():
+        shutil.rmtree(root)
+
+
+# ---------- CLI ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract and store the text of the research-paper corpus.")
+    parser.add_argument("command", choices=["ingest", "info", "show", "clear"])
+    parser.add_argument("path", nargs="?", help="corpus file for 'show'")
+    parser.add_argument("--dir", type=Path, default=None, help=f"store directory (default: {STORE_DIR})")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="extraction processes (0 = one per CPU core)")
+    add_timing_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        with session(args.timings, args.profile, "corpus"):
+            entries = ingest(workers=args.workers, store_dir=args.dir)
+        failed = sum("error" in e for e in entries)
+        print(f"✅ {len(entries) - failed} of {len(entries)} files in the store "
+              f"({len({e['sha256'] for e in entries})} distinct).")
+        return 1 if failed else 0
+    if args.command == "info":
+        files = load_index(args.dir).get("files", {})
+        shas = {e["sha256"] for e in files.values()}
+        size = sum(_text_path(s, args.dir).stat().st_size for s in shas if has_text(s, args.dir))
+        print("Corpus store:", args.dir or STORE_DIR)
+        print(f"  files:  {len(files)} ({len(shas)} distinct)")
+        print(f"  text:   {size / 1024 / 1024:.2f} MB")
+        return 0
+    if args.command == "show":
+        if not args.path:
+            parser.error("show needs a corpus file")
+        entry = load_index(args.dir).get("files", {}).get(_rel(args.path))
+        text = read_text(entry["sha256"], args.dir) if entry else None
+        if text is None:
+            print(f"❌ {args.path} is not in the store; run `python corpus.py ingest` first.")
+            return 1
+        print(text)
+        return 0
+    clear(args.dir)
+    print("🧹 Corpus store cleared.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+House-style base documents, built once per process and cloned per output.
+
+int.py and st3.py register their styles (TitleLarge, H1, H2, Body, Bullet)
+with a set_styles(doc) function. Calling it on every Document() repeats the
+python-docx template load and all the style lookups for each file. Instead,
+new_document(set_styles) builds that styled document the first time, keeps
+it, and hands out deep copies of it:
+
+  from doctemplate import new_document
+  doc = new_document(set_styles)   # same package as Document() + set_styles(doc)
+
+Templates are keyed by the set_styles function itself, so each builder keeps
+its own styles; pool workers build theirs on first use (or inherit the
+parent's when forked). benchmarks/bench_doc_setup.py measures the saving.
+
+Requirements:
+  pip install python-docx
+"""
+
+import copy
+
+from docx import Document
+
+_TEMPLATES = {}  # set_styles function (or None) -> styled Document
+
+
+def template(set_styles=None):
+    """The cached base document for set_styles. Treat it as read-only; use new_document()."""
+    if set_styles not in _TEMPLATES:
+        doc = Document()
+        if set_styles is not None:
+            set_styles(doc)
+        _TEMPLATES[set_styles] = doc
+    return _TEMPLATES[set_styles]
+
+
+def new_document(set_styles=None):
+    """A fresh Document with set_styles already applied (a deep copy of the template)."""
+    return copy.deepcopy(template(set_styles))
@@ -0,0 +1,516 @@
+# -*- coding: utf-8 -*-
+"""
+Assemble a booklet from finished DOCX files without re-rendering anything.
+
+  python docx_merge.py              # intro + chapters -> School_Lighting_Chapters_Booklet.docx
+  python docx_merge.py -o Booklet.docx Intro_School_Lighting.docx school_lighting_chapters/0*.docx
+  python cli.py assemble            # same as the first line
+
+The first file is the base: its package (styles, settings, theme, page
+layout) is kept as-is and the body of every following file is appended to
+it, each part starting on a new page. Working on the package XML directly,
+for each appended part:
+  - styles it uses that the base lacks are copied over, with their
+    basedOn/next/link chain; a style whose definition differs from the
+    base's under the same id (int.py and st3.py both define "H1") is copied
+    under a new id ("H12", named "H1 (2)") so every part keeps its look;
+  - list numbering (w:numId in paragraphs and in copied styles) is remapped
+    onto the base numbering.xml, reusing identical definitions;
+  - relationships used by the body (images, SVG blips, hyperlinks) get new
+    rIds in the base; media parts are copied byte for byte, never decoded,
+    and stored once per distinct content;
+  - drawing (wp:docPr) and bookmark ids are renumbered to stay unique.
+
+Section properties, headers/footers, footnotes and comments of appended
+parts are not carried over (none of the builders produce them); a part
+that references footnotes, comments or embedded objects is rejected.
+
+Requirements:
+  pip install python-docx   (for lxml)
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import zipfile
+import argparse
+import functools
+import posixpath
+import tempfile
+from pathlib import Path
+
+from lxml import etree
+
+from timing import stage, count, session, add_timing_args
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CONTENT_TYPES = "http://schemas.openxmlformats.org/package/2006/content-types"
+WP = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+
+RT_OFFICE_DOCUMENT = R + "/officeDocument"
+RT_STYLES = R + "/styles"
+RT_NUMBERING = R + "/numbering"
+RT_IMAGE = R + "/image"
+RT_HYPERLINK = R + "/hyperlink"
+CT_NUMBERING = "application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"
+
+INTRO_DOCX = Path("./Intro_School_Lighting.docx")      # int.py
+CHAPTERS_DIR = Path("./school_lighting_chapters")      # st3.py
+OUTPUT_DOCX = Path("./School_Lighting_Chapters_Booklet.docx")
+
+# References into parts this module does not merge
+_UNSUPPORTED = {f"{{{W}}}{t}" for t in ("footnoteReference", "endnoteReference", "commentReference")}
+
+
+def _w(tag):
+    return f"{{{W}}}{tag}"
+
+
+def _wval(el):
+    return el.get(_w("val"))
+
+
+def _canon(el):
+    return etree.tostring(el, method="c14n")
+
+
+def _resolve(base_dir, target):
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _rels_name(part):
+    return posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+
+
+@functools.lru_cache(maxsize=16)
+def _style_table(styles_xml):
+    """styleId -> w:style element. Parts built by the same script share a styles.xml; parse it once."""
+    return {s.get(_w("styleId")): s for s in etree.fromstring(styles_xml).iter(_w("style"))}
+
+
+@functools.lru_cache(maxsize=16)
+def _numbering_table(numbering_xml):
+    """numId -> (w:num, its w:abstractNum); cached like _style_table."""
+    root = etree.fromstring(numbering_xml)
+    abstracts = {a.get(_w("abstractNumId")): a for a in root.findall(_w("abstractNum"))}
+    return {n.get(_w("numId")): (n, abstracts.get(_wval(n.find(_w("abstractNumId")))))
+            for n in root.findall(_w("num"))}
+
+
+class _Package:
+    """One DOCX: its parts (read on first use) plus its main document relationships."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._zip = zipfile.ZipFile(path)
+        self.infos = self._zip.infolist()
+        self.names = {i.filename for i in self.infos}
+        self._read = {}
+        root_rels = etree.fromstring(self.read("_rels/.rels"))
+        self.main = next(_resolve("", rel.get("Target")) for rel in root_rels
+                         if rel.get("Type") == RT_OFFICE_DOCUMENT)
+        self.main_dir = posixpath.dirname(self.main)
+        self.rels_part = _rels_name(self.main)
+        self.rels = etree.fromstring(self.read(self.rels_part))
+        self.content_types = etree.fromstring(self.read("[Content_Types].xml"))
+
+    def read(self, part):
+        if part not in self._read:
+            self._read[part] = self._zip.read(part)
+        return self._read[part]
+
+    def close(self):
+        self._zip.close()
+
+    def rel(self, r_id):
+        for rel in self.rels:
+            if rel.get("Id") == r_id:
+                return rel
+        raise KeyError(f"{self.path}: no relationship {r_id}")
+
+    def related(self, reltype):
+        """Part name of the main document's first relationship of reltype, or None."""
+        for rel in self.rels:
+            if rel.get("Type") == reltype and rel.get("TargetMode") != "External":
+                return _resolve(self.main_dir, rel.get("Target"))
+        return None
+
+    def xml(self, part):
+        return etree.fromstring(self.read(part)) if part in self.names else None
+
+    def content_type(self, part):
+        for el in self.content_types:
+            if el.tag == f"{{{CONTENT_TYPES}}}Override" and el.get("PartName") == "/" + part:
+                return el.get("ContentType")
+        ext = posixpath.splitext(part)[1].lstrip(".").lower()
+        for el in self.content_types:
+            if el.tag == f"{{{CONTENT_TYPES}}}Default" and el.get("Extension").lower() == ext:
+                return el.get("ContentType")
+        return None
+
+
+class DocxMerger:
+    """Append the bodies of DOCX parts to a base package; see the module docstring."""
+
+    def __init__(self, base_path, page_breaks=True):
+        self.base = _Package(base_path)
+        self.page_breaks = page_breaks
+        self.document = self.base.xml(self.base.main)
+        self.body = self.document.find(_w("body"))
+        last = self.body[-1] if len(self.body) else None
+        self.sect_pr = last if last is not None and last.tag == _w("sectPr") else None
+
+        self.styles_part = self.base.related(RT_STYLES)
+        self.styles = self.base.xml(self.styles_part) if self.styles_part else None
+        self.numbering_part = self.base.related(RT_NUMBERING)
+        self.numbering = self.base.xml(self.numbering_part) if self.numbering_part else None
+        self.new_parts = {}  # part name -> bytes (copied media, created numbering)
+
+        self._style_index = {s.get(_w("styleId")): s for s in self.styles.iter(_w("style"))} \
+            if self.styles is not None else {}
+        self._copied = {}  # (source styleId, source definition) -> id it was copied under
+        # style types (paragraph, character, table, numbering) that already have a default
+        self._default_types = {st.get(_w("type")) for st in self._style_index.values()
+                               if st.get(_w("default")) in ("1", "true", "on")}
+        self._num_index = None  # abstract definition key -> base numId, built on first use
+        self._media = {hashlib.sha1(self.base.read(name)).hexdigest(): name
+                       for name in self.base.names if "/media/" in name}
+        self._media_rels = {rel.get("Target"): rel.get("Id") for rel in self.base.rels
+                            if rel.get("Type") == RT_IMAGE}
+        self._next_rid = 1 + max((int(rel.get("Id")[3:]) for rel in self.base.rels
+                                  if rel.get("Id", "").startswith("rId") and rel.get("Id")[3:].isdigit()),
+                                 default=0)
+        self._next_bookmark = 1 + max((int(b.get(_w("id"))) for b in self.body.iter(_w("bookmarkStart"))),
+                                      default=-1)
+        self.appended = 0
+
+    # ---------- Relationships and media ----------
+    def _add_rel(self, reltype, target, external=False):
+        r_id = f"rId{self._next_rid}"
+        self._next_rid += 1
+        rel = etree.SubElement(self.base.rels, f"{{{PKG_RELS}}}Relationship",
+                               Id=r_id, Type=reltype, Target=target)
+        if external:
+            rel.set("TargetMode", "External")
+        return r_id
+
+    def _ensure_default(self, ext, content_type):
+        types = self.base.content_types
+        if any(el.get("Extension", "").lower() == ext.lower() for el in types):
+            return
+        el = etree.Element(f"{{{CONTENT_TYPES}}}Default", Extension=ext, ContentType=content_type)
+        types.insert(0, el)  # Defaults come before Overrides
+
+    def _copy_media(self, src, part):
+        data = src.read(part)
+        digest = hashlib.sha1(data).hexdigest()
+        if digest not in self._media:
+            stem, ext = posixpath.splitext(posixpath.basename(part))
+            taken = self.base.names | set(self.new_parts)
+            k = 1
+            while f"{self.base.main_dir}/media/image{k}{ext}" in taken:
+                k += 1
+            name = f"{self.base.main_dir}/media/image{k}{ext}"
+            self.new_parts[name] = data
+            self._media[digest] = name
+            self._ensure_default(ext.lstrip("."), src.content_type(part) or "application/octet-stream")
+        return posixpath.relpath(self._media[digest], self.base.main_dir)
+
+    def _map_rel(self, src, r_id, rel_map):
+        if r_id in rel_map:
+            return rel_map[r_id]
+        rel = src.rel(r_id)
+        reltype, target = rel.get("Type"), rel.get("Target")
+        if rel.get("TargetMode") == "External":
+            new = self._add_rel(reltype, target, external=True)
+        elif reltype == RT_IMAGE:
+            target = self._copy_media(src, _resolve(src.main_dir, target))
+            new = self._media_rels.get(target)
+            if new is None:
+                new = self._media_rels[target] = self._add_rel(RT_IMAGE, target)
+        else:
+            raise ValueError(f"{src.path}: cannot merge a {reltype.rsplit('/', 1)[-1]} relationship ({r_id})")
+        rel_map[r_id] = new
+        return new
+
+    # ---------- Styles ----------
+    def _map_style(self, src_styles, style_id, style_map, num_map, src):
+        if style_id in style_map:
+            return style_map[style_id]
+        style = src_styles.get(style_id)
+        if style is None or self.styles is None:
+            return style_id  # dangling in the source; Word falls back to the default
+        existing = self._style_index.get(style_id)
+        definition = (style_id, _canon(style))
+        if existing is not None and _canon(existing) == definition[1]:
+            style_map[style_id] = style_id
+            return style_id
+        if definition in self._copied:  # an earlier part brought the same variant
+            style_map[style_id] = self._copied[definition]
+            return style_map[style_id]
+
+        new_id, n = style_id, 1
+        if existing is not None:
+            while new_id in self._style_index:
+                n += 1
+                new_id = f"{style_id}{n}"
+        style_map[style_id] = new_id  # before recursing: next/link chains are cyclic
+
+        clone = etree.fromstring(etree.tostring(style))
+        clone.set(_w("styleId"), new_id)
+        if clone.get(_w("default")) is not None:
+            # One default per style type: the base's stays, a copied one is demoted
+            if clone.get(_w("type")) in self._default_types:
+                del clone.attrib[_w("default")]
+            elif clone.get(_w("default")) in ("1", "true", "on"):
+                self._default_types.add(clone.get(_w("type")))
+        name = clone.find(_w("name"))
+        if n > 1 and name is not None:
+            name.set(_w("val"), f"{_wval(name)} ({n})")
+        for tag in ("basedOn", "next", "link"):
+            ref = clone.find(_w(tag))
+            if ref is not None:
+                ref.set(_w("val"), self._map_style(src_styles, _wval(ref), style_map, num_map, src))
+        for num_id in clone.iter(_w("numId")):
+            num_id.set(_w("val"), self._map_num(src, _wval(num_id), num_map))
+        self.styles.append(clone)
+        self._style_index[new_id] = clone
+        self._copied[definition] = new_id
+        return new_id
+
+    # ---------- Numbering ----------
+    @staticmethod
+    def _num_key(abstract, num):
+        a = etree.fromstring(etree.tostring(abstract))
+        a.attrib.pop(_w("abstractNumId"), None)
+        for tag in ("nsid", "tmpl"):
+            for el in a.findall(_w(tag)):
+                a.remove(el)
+        overrides = b"".join(_canon(o) for o in num.findall(_w("lvlOverride")))
+        return _canon(a) + overrides
+
+    @staticmethod
+    def _abstracts(numbering):
+        return {a.get(_w("abstractNumId")): a for a in numbering.findall(_w("abstractNum"))}
+
+    def _ensure_numbering(self):
+        if self.numbering is None:
+            self.numbering_part = f"{self.base.main_dir}/numbering.xml"
+            self.numbering = etree.Element(_w("numbering"), nsmap={"w": W})
+            self._add_rel(RT_NUMBERING, "numbering.xml")
+            etree.SubElement(self.base.content_types, f"{{{CONTENT_TYPES}}}Override",
+                             PartName="/" + self.numbering_part, ContentType=CT_NUMBERING)
+        if self._num_index is None:
+            abstracts = self._abstracts(self.numbering)
+            self._num_index = {}
+            for num in self.numbering.findall(_w("num")):
+                abstract = abstracts.get(_wval(num.find(_w("abstractNumId"))))
+                if abstract is not None:
+                    self._num_index.setdefault(self._num_key(abstract, num), num.get(_w("numId")))
+
+    def _map_num(self, src, num_id, num_map):
+        if num_id in num_map or num_id == "0":  # 0 = "no numbering"
+            return num_map.get(num_id, num_id)
+        part = src.related(RT_NUMBERING)
+        num, abstract = _numbering_table(src.read(part)).get(num_id, (None, None)) \
+            if part in src.names else (None, None)
+        if abstract is None:
+            num_map[num_id] = num_id
+            return num_id
+
+        self._ensure_numbering()
+        key = self._num_key(abstract, num)
+        if key not in self._num_index:
+            nums = self.numbering.findall(_w("num"))
+            new_abstract_id = str(1 + max((int(a) for a in self._abstracts(self.numbering)), default=-1))
+            new_num_id = str(1 + max((int(n.get(_w("numId"))) for n in nums), default=0))
+            a = etree.fromstring(etree.tostring(abstract))
+            a.set(_w("abstractNumId"), new_abstract_id)
+            # abstractNum elements must all precede the num elements
+            if nums:
+                nums[0].addprevious(a)
+            else:
+                self.numbering.append(a)
+            n = etree.fromstring(etree.tostring(num))
+            n.set(_w("numId"), new_num_id)
+            n.find(_w("abstractNumId")).set(_w("val"), new_abstract_id)
+            self.numbering.append(n)
+            self._num_index[key] = new_num_id
+        num_map[num_id] = self._num_index[key]
+        return num_map[num_id]
+
+    # ---------- Bodies ----------
+    def _page_break(self):
+        p = etree.Element(_w("p"))
+        etree.SubElement(etree.SubElement(p, _w("r")), _w("br")).set(_w("type"), "page")
+        return p
+
+    def _insert(self, el):
+        if self.sect_pr is not None:
+            self.sect_pr.addprevious(el)
+        else:
+            self.body.append(el)
+
+    def append(self, path):
+        """Append the body of the DOCX at path (after a page break)."""
+        src = _Package(path)
+        try:
+            self._append(src)
+        finally:
+            src.close()
+        self.appended += 1
+
+    def _append(self, src):
+        body = src.xml(src.main).find(_w("body"))
+        styles_part = src.related(RT_STYLES)
+        src_styles = _style_table(src.read(styles_part)) if styles_part in src.names else {}
+        style_map, num_map, rel_map, bookmark_map = {}, {}, {}, {}
+
+        elements = [el for el in body if el.tag != _w("sectPr")]
+        for el in elements:
+            for node in el.iter():
+                if node.tag in _UNSUPPORTED:
+                    raise ValueError(f"{src.path}: {etree.QName(node).localname} is not supported")
+                if node.tag in (_w("pStyle"), _w("rStyle"), _w("tblStyle")):
+                    node.set(_w("val"), self._map_style(src_styles, _wval(node), style_map, num_map, src))
+                elif node.tag == _w("numId") and node.getparent().tag == _w("numPr"):
+                    node.set(_w("val"), self._map_num(src, _wval(node), num_map))
+                elif node.tag in (_w("bookmarkStart"), _w("bookmarkEnd")):
+                    old = node.get(_w("id"))
+                    if old not in bookmark_map:
+                        bookmark_map[old] = str(self._next_bookmark)
+                        self._next_bookmark += 1
+                    node.set(_w("id"), bookmark_map[old])
+                for attr, value in list(node.attrib.items()):
+                    if attr.startswith(f"{{{R}}}"):
+                        node.set(attr, self._map_rel(src, value, rel_map))
+            # Section breaks inside an appended part would override the base page layout
+            for sect in el.findall(f"{_w('pPr')}/{_w('sectPr')}"):
+                sect.getparent().remove(sect)
+
+        if self.page_breaks and (self.appended or len(self.body) > (self.sect_pr is not None)):
+            self._insert(self._page_break())
+        for el in elements:
+            self._insert(el)
+
+    def close(self):
+        self.base.close()
+
+    # ---------- Output ----------
+    def save(self, path):
+        for i, doc_pr in enumerate(self.document.iter(f"{{{WP}}}docPr"), start=1):
+            doc_pr.set("id", str(i))
+
+        changed = {
+            self.base.main: self.document,
+            self.base.rels_part: self.base.rels,
+            "[Content_Types].xml": self.base.content_types,
+        }
+        if self.styles is not None:
+            changed[self.styles_part] = self.styles
+        if self.numbering is not None:
+            changed[self.numbering_part] = self.numbering
+        changed = {name: etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+                   for name, root in changed.items()}
+
+        path = str(path)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".docx.tmp")
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+                for info in self.base.infos:
+                    zout.writestr(info, changed.pop(info.filename, self.base.read(info.filename)),
+                                  compress_type=info.compress_type)
+                for name, data in changed.items():  # created parts (numbering.xml)
+                    zout.writestr(name, data)
+                for name, data in self.new_parts.items():
+                    zout.writestr(name, data)
+            _set_mode(tmp, path)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return Path(path)
+
+
+def _set_mode(tmp, path):
+    """Give tmp (0600 from mkstemp) the mode of the file it replaces, or 0666 minus the umask."""
+    if os.path.exists(path):
+        shutil.copymode(path, tmp)
+        return
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(tmp, 0o666 & ~umask)
+
+
+def merge(out, parts, page_breaks=True):
+    """Write parts[0] with the bodies of parts[1:] appended to out; returns the output path."""
+    parts = [Path(p) for p in parts]
+    if not parts:
+        raise ValueError("nothing to merge")
+    with stage("open base"):
+        merger = DocxMerger(parts[0], page_breaks=page_breaks)
+    try:
+        for part in parts[1:]:
+            with stage("append"):
+                merger.append(part)
+        count("parts", len(parts))
+        with stage("save"):
+            return merger.save(out)
+    finally:
+        merger.close()
+
+
+def default_parts(intro=INTRO_DOCX, chapters_dir=CHAPTERS_DIR):
+    """
+    The introduction followed by the chapter files, in file name order. The
+    chapters folder also holds a copy of the intro, which is not a chapter.
+    """
+    missing = [f"{intro} (python cli.py intro)"] if not Path(intro).exists() else []
+    chapters = sorted(p for p in Path(chapters_dir).glob("*.docx")
+                      if p.name != Path(intro).name and not p.name.startswith("~$"))
+    if not chapters:
+        missing.append(f"{chapters_dir}/*.docx (python cli.py chapters)")
+    if missing:
+        raise FileNotFoundError("missing parts: " + ", ".join(missing))
+    return [Path(intro)] + chapters
+
+
+def build(out=OUTPUT_DOCX, parts=None, page_breaks=True):
+    parts = default_parts() if not parts else parts
+    t0 = time.perf_counter()
+    out = merge(out, parts, page_breaks)
+    print(f"🧩 Merged {len(parts)} parts in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return out
+
+
+def add_merge_args(parser):
+    parser.add_argument("parts", nargs="*", type=Path,
+                        help="DOCX files in booklet order; the first one is the base "
+                             "(default: the intro, then the chapter files)")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_DOCX,
+                        help="merged booklet (default: %(default)s)")
+    parser.add_argument("--no-page-breaks", dest="page_breaks", action="store_false",
+                        help="do not start each part on a new page")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge finished DOCX files into one booklet.")
+    add_merge_args(parser)
+    add_timing_args(parser)
+    args = parser.parse_args(argv)
+    with session(args.timings, args.profile, "docx_merge"):
+        out = build(args.output, args.parts, args.page_breaks)
+    print("✅ Written:", out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
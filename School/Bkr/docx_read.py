@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming DOCX text reader.
+
+  for text in iter_paragraphs("School/final/SChools.docx"):
+      ...
+
+python-docx's Document(path) parses every part of the package (styles,
+numbering, settings, ...) into an lxml tree and wraps it in proxy objects,
+just so a caller can walk doc.paragraphs. Here word/document.xml is
+decompressed straight out of the zip and fed to the standard library's
+incremental parser; each top-level paragraph or table is turned into text as
+soon as its closing tag arrives and then dropped, so memory is bounded by the
+largest single paragraph or table, not by the document.
+
+  iter_paragraphs(path)  body paragraphs, the same strings as
+                         [p.text.strip() for p in Document(path).paragraphs] minus empties
+  iter_blocks(path)      paragraphs and table rows in body order: ("paragraph", text)
+                         and ("row", [cell text, ...]); cells keep their paragraphs
+                         on separate lines, nested tables included
+  read_text(path)        iter_blocks() as one string: a line per paragraph and per
+                         row, cells separated by " | "
+
+Run text follows python-docx: w:t text, tabs as "\\t", line breaks and
+carriage returns as "\\n", non-breaking hyphens as "-"; deleted text
+(w:delText) and field codes are skipped, hyperlink text is kept.
+
+Standard library only.
+"""
+
+import sys
+import zipfile
+import argparse
+import xml.etree.ElementTree as ET
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BODY, _P, _TBL, _TR, _TC = W + "body", W + "p", W + "tbl", W + "tr", W + "tc"
+_R, _HYPERLINK, _T, _TYPE = W + "r", W + "hyperlink", W + "t", W + "type"
+_TAB_CHARS = {W + "tab": "\t", W + "ptab": "\t", W + "cr": "\n", W + "noBreakHyphen": "-"}
+_BR = W + "br"
+DOCUMENT_PART = "word/document.xml"
+
+
+def _run_text(r, parts):
+    for c in r:
+        tag = c.tag
+        if tag == _T:
+            parts.append(c.text or "")
+        elif tag == _BR:
+            if c.get(_TYPE) in (None, "textWrapping"):  # page and column breaks carry no text
+                parts.append("\n")
+        else:
+            ch = _TAB_CHARS.get(tag)
+            if ch:
+                parts.append(ch)
+
+
+def paragraph_text(p):
+    """Text of a w:p element: its runs, including those inside hyperlinks."""
+    parts = []
+    for child in p:
+        if child.tag == _R:
+            _run_text(child, parts)
+        elif child.tag == _HYPERLINK:
+            for r in child.iterfind(_R):
+                _run_text(r, parts)
+    return "".join(parts)
+
+
+def _row_cells(tr):
+    cells = []
+    for tc in tr.iterfind(_TC):
+        lines = (paragraph_text(p).strip() for p in tc.iter(_P))
+        cells.append("\n".join(line for line in lines if line))
+    return cells
+
+
+def iter_blocks(path):
+    """
+    Yield ("paragraph", text) for every non-empty body paragraph and
+    ("row", [cell texts]) for every table row, in document order.
+    path may be a file name or a binary file object.
+    """
+    with zipfile.ZipFile(path) as z, z.open(DOCUMENT_PART) as f:
+        depth = 0      # element depth: w:document 1, w:body 2, top-level blocks 3
+        tables = 0     # open w:tbl elements
+        body = None
+        for event, el in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if el.tag == _TBL:
+                    tables += 1
+                elif el.tag == _BODY:
+                    body = el
+                continue
+            depth -= 1
+            tag = el.tag
+            if tag == _P and depth == 2:
+                text = paragraph_text(el).strip()
+                if text:
+                    yield "paragraph", text
+            elif tag == _TR and tables == 1:
+                yield "row", _row_cells(el)
+                el.clear()
+            elif tag == _TBL:
+                tables -= 1
+            if depth == 2 and body is not None:
+                body.clear()  # the block is done: let the tree stay one block deep
+
+
+def iter_paragraphs(path):
+    """Yield the stripped text of every non-empty body paragraph (not table cells)."""
+    for kind, text in iter_blocks(path):
+        if kind == "paragraph":
+            yield text
+
+
+def iter_lines(path):
+    """Yield one line per paragraph and per table row (cells joined by " | ")."""
+    for kind, text in iter_blocks(path):
+        yield text if kind == "paragraph" else " | ".join(cell.replace("\n", " ") for cell in text)
+
+
+def read_text(path):
+    return "\n".join(iter_lines(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the text of a DOCX file, a paragraph or table row per line.")
+    parser.add_argument("docx")
+    parser.add_argument("--paragraphs", action="store_true", help="body paragraphs only (no tables)")
+    args = parser.parse_args(argv)
+    for line in (iter_paragraphs if args.paragraphs else iter_lines)(args.docx):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming DOCX writer with the slice of the python-docx API the builders use:
+
+  doc = StreamingDocument()
+  doc.add_heading("Title", 0)
+  p = doc.add_paragraph("Body text", style="List Bullet")
+  p.add_run(" more").bold = True
+  doc.add_picture(io.BytesIO(png), width=Inches(6.0))
+  t = doc.add_table(rows=2, cols=2); t.style = "Table Grid"; t.cell(0, 0).text = "x"
+  doc.add_page_break()
+  doc.save("out.docx")
+
+python-docx keeps the whole element tree (and every image blob) in memory
+until save(). Here each element is serialized as soon as the next one is
+added (only the most recent paragraph/table stays editable) and appended to
+a spooled body file; images go to a spool directory as they arrive, stored
+once per distinct content like python-docx does. save() then streams body
+and images into the zip package built from python-docx's default template,
+so memory stays flat however many rooms, paragraphs and figures a booklet
+has. The template's unchanged parts are deflated once per process and
+copied as-is, so many small documents (room_reports.py) save quickly too.
+
+What is not supported: editing anything but the last element, sections,
+headers/footers, comments, and reading documents back (use python-docx).
+
+Requirements:
+  pip install python-docx
+"""
+
+import io
+import os
+import re
+import shutil
+import functools
+import hashlib
+import zipfile
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+NS = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "wp": "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "pic": "http://schemas.openxmlformats.org/drawingml/2006/picture",
+}
+RT_IMAGE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+SVG_BLIP_URI = "{96DAC541-7B7A-43D3-8B79-37D633B846F1}"
+NS_ASVG = "http://schemas.microsoft.com/office/drawing/2016/SVG/main"
+IMAGE_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "jpg": "image/jpeg", "gif": "image/gif",
+               "bmp": "image/bmp", "tiff": "image/tiff", "svg": "image/svg+xml"}
+TEXT_WIDTH_EMU = 5486400  # 6" between the default template's margins
+_CHUNK = 1 << 20
+_REWRITTEN = ("word/document.xml", "word/_rels/document.xml.rels", "[Content_Types].xml")
+
+
+def _template_path():
+    import docx
+    return os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+
+
+@functools.lru_cache(maxsize=4)
+def _template(template):
+    """(style ids, document.xml head/tail, rels, content types) of a template, read once per process."""
+    with zipfile.ZipFile(template) as z:
+        style_map = _style_ids(z.read("word/styles.xml"))
+        doc_xml = z.read("word/document.xml").decode("utf-8")
+        rels_xml = z.read("word/_rels/document.xml.rels").decode("utf-8")
+        types_xml = z.read("[Content_Types].xml").decode("utf-8")
+    body = doc_xml.index("<w:body>") + len("<w:body>")
+    sect = doc_xml.index("<w:sectPr", body)
+    return style_map, doc_xml[:body], doc_xml[sect:], rels_xml, types_xml
+
+
+@functools.lru_cache(maxsize=4)
+def _base_package(template):
+    """
+    Zip bytes holding the template parts save() copies unchanged, deflated
+    once per process; each save appends the rewritten parts to a copy.
+    """
+    buf = io.BytesIO()
+    with zipfile.ZipFile(template) as tpl, zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as out:
+        for info in tpl.infolist():
+            if info.filename not in _REWRITTEN:
+                out.writestr(info, tpl.read(info.filename))
+    return buf.getvalue()
+
+
+def _style_ids(styles_xml):
+    """Map lower-cased UI style names ("heading 1", "table grid") to style ids."""
+    ids = {}
+    for m in re.finditer(rb'<w:style\b[^>]*w:styleId="([^"]+)"[^>]*>.*?<w:name w:val="([^"]+)"', styles_xml, re.S):
+        ids[m.group(2).decode("utf-8").lower()] = m.group(1).decode("utf-8")
+    return ids
+
+
+def _run_xml(text, bold=None, italic=None):
+    props = ("<w:b/>" if bold else "") + ("<w:i/>" if italic else "")
+    out = ["<w:r>"]
+    if props:
+        out.append(f"<w:rPr>{props}</w:rPr>")
+    # python-docx turns \n into <w:br/> and \t into <w:tab/>
+    for piece in re.split(r"(\n|\t)", text):
+        if piece == "\n":
+            out.append("<w:br/>")
+        elif piece == "\t":
+            out.append("<w:tab/>")
+        elif piece:
+            out.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+    out.append("</w:r>")
+    return "".join(out)
+
+
+# -----------------------------------------------------------------------------
+# Pending elements (the last one added stays editable)
+# -----------------------------------------------------------------------------
+class StreamRun:
+    def __init__(self, text=""):
+        self.text = text
+        self.bold = None
+        self.italic = None
+
+    def xml(self):
+        return _run_xml(self.text, self.bold, self.italic)
+
+
+class StreamParagraph:
+    def __init__(self, doc, text="", style=None):
+        self._doc = doc
+        self.style = style
+        self.runs = [StreamRun(text)] if text else []
+
+    def add_run(self, text=""):
+        run = StreamRun(text)
+        self.runs.append(run)
+        return run
+
+    @property
+    def text(self):
+        return "".join(r.text for r in self.runs)
+
+    def xml(self):
+        ppr = f'<w:pPr><w:pStyle w:val="{self._doc._style_id(self.style)}"/></w:pPr>' if self.style else ""
+        return f"<w:p>{ppr}{''.join(r.xml() for r in self.runs)}</w:p>"
+
+
+class StreamCell:
+    def __init__(self):
+        self.text = ""
+
+
+class StreamTable:
+    def __init__(self, doc, rows, cols, style=None):
+        self._doc = doc
+        self.style = style
+        self._cells = [[StreamCell() for _ in range(cols)] for _ in range(rows)]
+
+    def cell(self, row_idx, col_idx):
+        return self._cells[row_idx][col_idx]
+
+    def add_row(self):
+        self._cells.append([StreamCell() for _ in range(len(self._cells[0]))])
+        return self._cells[-1]
+
+    def xml(self):
+        cols = len(self._cells[0]) if self._cells else 0
+        col_w = TEXT_WIDTH_EMU // max(cols, 1) // 635  # EMU -> twips
+        style = f'<w:tblStyle w:val="{self._doc._style_id(self.style)}"/>' if self.style else ""
+        out = [f'<w:tbl><w:tblPr>{style}<w:tblW w:type="auto" w:w="0"/>'
+               '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+               'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>']
+        out.append(f'<w:gridCol w:w="{col_w}"/>' * cols)
+        out.append("</w:tblGrid>")
+        for row in self._cells:
+            out.append("<w:tr>")
+            for cell in row:
+                out.append(f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{col_w}"/></w:tcPr>'
+                           f"<w:p>{_run_xml(cell.text) if cell.text else ''}</w:p></w:tc>")
+            out.append("</w:tr>")
+        out.append("</w:tbl>")
+        return "".join(out)
+
+
+class _Raw:
+    def __init__(self, xml):
+        self._xml = xml
+
+    def xml(self):
+        return self._xml
+
+
+# -----------------------------------------------------------------------------
+# Document
+# -----------------------------------------------------------------------------
+class StreamingDocument:
+    """Write-only DOCX whose body and images are spooled to disk as they are added."""
+
+    streaming = True
+
+    def __init__(self, template=None):
+        self._template = template or _template_path()
+        self._style_map, self._head, self._tail, rels_xml, self._types_xml = _template(self._template)
+        self._rels_xml = rels_xml
+        self._next_rid = 1 + max(int(n) for n in re.findall(r'Id="rId(\d+)"', rels_xml))
+
+        self._spool_dir = tempfile.TemporaryDirectory(prefix="docx_stream_")
+        self._body = open(os.path.join(self._spool_dir.name, "body.xml"), "w+b")
+        self._pending = None
+        self._images = {}   # sha1 -> (rId, partname, spooled file)
+        self._image_no = 0
+        self._shape_id = 0
+
+    # ---------- helpers ----------
+    def _style_id(self, name):
+        return self._style_map.get(name.lower(), name.replace(" ", ""))
+
+    def _push(self, element):
+        if self._pending is not None:
+            self._body.write(self._pending.xml().encode("utf-8"))
+        self._pending = element
+        return element
+
+    def _add_image(self, blob, ext):
+        sha1 = hashlib.sha1(blob).hexdigest()
+        if sha1 not in self._images:
+            self._image_no += 1
+            partname = f"media/image{self._image_no}.{ext}"
+            spooled = os.path.join(self._spool_dir.name, f"image{self._image_no}.{ext}")
+            with open(spooled, "wb") as f:
+                f.write(blob)
+            self._images[sha1] = (f"rId{self._next_rid}", partname, spooled)
+            self._next_rid += 1
+        return self._images[sha1][0]
+
+    # ---------- python-docx compatible API ----------
+    def add_heading(self, text="", level=1):
+        if not 0 <= level <= 9:
+            raise ValueError("level must be in range 0-9, got %d" % level)
+        return self.add_paragraph(text, "Title" if level == 0 else f"Heading {level}")
+
+    def add_paragraph(self, text="", style=None):
+        return self._push(StreamParagraph(self, text, style))
+
+    def add_page_break(self):
+        return self._push(_Raw('<w:p><w:r><w:br w:type="page"/></w:r></w:p>'))
+
+    def add_table(self, rows, cols, style=None):
+        return self._push(StreamTable(self, rows, cols, style))
+
+    def add_picture(self, image_path_or_stream, width=None, height=None, svg=None):
+        """
+        Add an inline picture in its own paragraph. With svg (bytes), the SVG
+        becomes the primary image and the raster stays as the fallback.
+        """
+        from docx.image.image import Image
+
+        if isinstance(image_path_or_stream, (str, os.PathLike)):
+            with open(image_path_or_stream, "rb") as f:
+                blob = f.read()
+        else:
+            image_path_or_stream.seek(0)
+            blob = image_path_or_stream.read()
+        image = Image.from_blob(blob)
+        cx, cy = image.scaled_dimensions(width, height)
+        rid = self._add_image(blob, image.ext)
+
+        self._shape_id += 1
+        n = self._shape_id
+        ext = ""
+        if svg is not None:
+            svg_rid = self._add_image(svg, "svg")
+            ext = (f'<a:extLst><a:ext uri="{SVG_BLIP_URI}"><asvg:svgBlip xmlns:asvg="{NS_ASVG}" '
+                   f'r:embed="{svg_rid}"/></a:ext></a:extLst>')
+        xml = (
+            f'<w:p><w:r><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+            f'<wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{n}" name="Picture {n}"/>'
+            f'<wp:cNvGraphicFramePr><a:graphicFrameLocks xmlns:a="{NS["a"]}" noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+            f'<a:graphic xmlns:a="{NS["a"]}"><a:graphicData uri="{NS["pic"]}">'
+            f'<pic:pic xmlns:pic="{NS["pic"]}"><pic:nvPicPr><pic:cNvPr id="0" name="image.{image.ext}"/>'
+            f'<pic:cNvPicPr/></pic:nvPicPr><pic:blipFill><a:blip r:embed="{rid}">{ext}</a:blip>'
+            f'<a:stretch><a:fillRect/></a:stretch></pic:blipFill><pic:spPr><a:xfrm><a:off x="0" y="0"/>'
+            f'<a:ext cx="{cx}" cy="{cy}"/></a:xfrm><a:prstGeom prst="rect"/></pic:spPr></pic:pic>'
+            f'</a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+        )
+        return self._push(_Raw(xml))
+
+    # ---------- output ----------
+    def _content_types(self, template_types):
+        exts = {partname.rsplit(".", 1)[1] for _, partname, _ in self._images.values()}
+        defaults = "".join(
+            f'<Default Extension="{e}" ContentType="{IMAGE_TYPES.get(e, "application/octet-stream")}"/>'
+            for e in sorted(exts) if f'Extension="{e}"' not in template_types
+        )
+        return template_types.replace("</Types>", defaults + "</Types>")
+
+    def _rels(self):
+        extra = "".join(
+            f'<Relationship Id="{rid}" Type="{RT_IMAGE}" Target={quoteattr(partname)}/>'
+            for rid, partname, _ in self._images.values()
+        )
+        return self._rels_xml.replace("</Relationships>", extra + "</Relationships>")
+
+    def save(self, path_or_stream):
+        """Write the package. The document can be saved once; the spool is removed afterwards."""
+        self._push(None)
+        try:
+            if isinstance(path_or_stream, (str, os.PathLike)):
+                with open(path_or_stream, "wb") as f:
+                    f.write(_base_package(self._template))
+            else:
+                path_or_stream.write(_base_package(self._template))
+            with zipfile.ZipFile(path_or_stream, "a", zipfile.ZIP_DEFLATED) as out:
+                out.writestr("[Content_Types].xml", self._content_types(self._types_xml))
+                out.writestr("word/_rels/document.xml.rels", self._rels())
+                with out.open("word/document.xml", "w", force_zip64=True) as dst:
+                    dst.write(self._head.encode("utf-8"))
+                    self._body.seek(0)
+                    shutil.copyfileobj(self._body, dst, _CHUNK)
+                    dst.write(self._tail.encode("utf-8"))
+                for _, partname, spooled in self._images.values():
+                    out.write(spooled, "word/" + partname)
+        finally:
+            self.close()
+
+    def close(self):
+        """Drop the spool without saving."""
+        if not self._body.closed:
+            self._body.close()
+        self._spool_dir.cleanup()
+
+
+def add_stream_arg(parser):
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="write the DOCX with the streaming writer (flat memory for very large booklets)",
+    )
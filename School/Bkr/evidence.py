@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+Evidence table: every numeric lighting value reported in the corpus, one row each.
+
+  ev = evidence.load()
+  lux = ev.select(unit="lx", ages=(6, 12))            # all lux values for ages 6-12
+  lux.value, lux.summary()
+  bands = evidence.band_arrays("final", ages=(6, 12))  # {pid: (values, edges)}
+
+Rows come from keyvalues.scan() over every page of every text in the
+corpus.py store (pages as in search.py). Columns, one NumPy array each:
+
+  paper    index into .papers (the corpus path of the text; copies count once)
+  page     page number (DOCX texts: blocks of search.DOCX_PAGE_LINES lines)
+  param    index into PARAMS: the params.py ids cct, cri, ugr, eh, ev, medi,
+           plus flicker_hz and percent_change, which have no band chart
+  value    float64
+  unit     index into UNITS
+  age_lo, age_hi   age range in years the value is reported for, NaN if unknown
+  start    character offset of the value on its page
+  context  CONTEXT characters either side of the value, whitespace collapsed
+
+Lux values become eh (horizontal/desk), ev (vertical) or medi (melanopic EDI)
+by the nearest qualifier within LUX_QUALIFIER_CHARS of the number, eh when
+there is none. Values off their parameter's scale (VALID) are dropped: in a
+table row the number after "CRI" can be the next column's lux, "500 K" is no
+colour temperature and "00 lux" no illuminance. Grouped numbers ("2,700 K",
+"1,000 lx") are read whole by keyvalues.py. A value's age range is the nearest
+age mention ("aged 6-12", "primary", ... see AGE_GROUPS) within its context
+window, otherwise the last one before it in the same text; "children" alone
+sets no range.
+
+The table is cached as an uncompressed .npz next to the corpus store, named
+after a hash of the corpus contents, keyvalues.py and this file, so it is
+rebuilt only when a paper or the extraction changes.
+
+Usage (from School/Bkr):
+  python evidence.py build                              # (re)build the table from the store
+  python evidence.py query --unit lx --ages 6-12        # matching rows (--csv for all columns)
+  python evidence.py query --param cct --range 3000..6500 --paper Sleep
+  python evidence.py summary [--by param|paper|age]     # n, papers, min, median, max per group
+  python evidence.py bands --edition final --ages 6-12  # share of values per band, per parameter
+
+Requirements:
+  pip install numpy   (run `python corpus.py ingest` first to fill the store)
+"""
+
+import io
+import os
+import re
+import sys
+import csv
+import bisect
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+from collections import namedtuple
+
+import numpy as np
+
+import corpus
+import search
+import keyvalues
+import registry
+import zones
+from timing import stage, count, session, add_timing_args
+
+# Bump when the row layout or the assignment rules below change
+EVIDENCE_VERSION = 2
+CONTEXT = 80
+LUX_QUALIFIER_CHARS = 30
+
+PARAMS = ("cct", "cri", "ugr", "eh", "ev", "medi", "flicker_hz", "percent_change")
+UNITS = ("K", "Ra", "UGR", "lx", "Hz", "%")
+PARAM_UNITS = {"cct": "K", "cri": "Ra", "ugr": "UGR", "eh": "lx", "ev": "lx", "medi": "lx",
+               "flicker_hz": "Hz", "percent_change": "%"}
+# keyvalues kind -> parameter (lux is decided by its qualifier)
+KIND_PARAMS = {"cct": "cct", "cri": "cri", "ugr": "ugr", "hz": "flicker_hz", "percent": "percent_change"}
+# Plausible value range per parameter; anything outside is a misread
+VALID = {"cct": (1000, 10000), "cri": (0, 100), "ugr": (5, 40),
+         "eh": (1, 10000), "ev": (1, 10000), "medi": (1, 10000)}
+LUX_QUALIFIERS = re.compile(r"vertical|melanopic|m-?edi|horizontal|desk|task|work ?plane")
+AGE_GROUPS = {
+    "preschool": (3, 6), "kindergarten": (3, 6),
+    "elementary": (6, 12), "primary": (6, 12),
+    "secondary": (12, 18), "adolescent": (12, 18),
+    "undergraduate": (18, 25),
+}
+COLUMNS = ("paper", "page", "param", "value", "unit", "age_lo", "age_hi", "start", "context")
+
+Record = namedtuple("Record", "paper page param value unit age_lo age_hi context")
+Group = namedtuple("Group", "key n papers min median max")
+
+_SPACE = re.compile(r"\s+")
+
+
+# ---------- Extraction ----------
+def _lux_param(page_text, start, end):
+    """eh, ev or medi, by the qualifier nearest to the number."""
+    lo = max(start - LUX_QUALIFIER_CHARS, 0)
+    best, param = None, "eh"
+    for m in LUX_QUALIFIERS.finditer(page_text.lower(), lo, end + LUX_QUALIFIER_CHARS):
+        gap = start - m.end() if m.end() <= start else m.start() - end
+        if best is None or gap < best:
+            word = m.group()
+            best, param = gap, "ev" if word == "vertical" else "medi" if word[0] == "m" else "eh"
+    return param
+
+def _age_range(hit):
+    if hit.kind == "age_range":
+        return hit.value
+    return AGE_GROUPS.get(hit.value)
+
+def text_rows(text, docx=False):
+    """Yield (page, param, value, age range or None, start, context) for every value in one text."""
+    carry = None  # last age range of the previous pages
+    for page, page_text in search.pages(text, docx):
+        hits = keyvalues.scan(page_text)
+        ages = [(h.start, _age_range(h)) for h in hits if h.kind in ("age", "age_range") and _age_range(h)]
+        starts = [a[0] for a in ages]
+        for h in hits:
+            if h.kind in ("age", "age_range"):
+                continue
+            param = _lux_param(page_text, h.start, h.end) if h.kind == "lux" else KIND_PARAMS[h.kind]
+            value = float(h.value)
+            lo, hi = VALID.get(param, (-np.inf, np.inf))
+            if not lo <= value <= hi:
+                continue
+            i = bisect.bisect_left(starts, h.start)
+            near = [a for a in ages[max(i - 1, 0):i + 1] if abs(a[0] - h.start) <= CONTEXT]
+            if near:
+                age = min(near, key=lambda a: abs(a[0] - h.start))[1]
+            else:
+                age = ages[i - 1][1] if i else carry
+            context = _SPACE.sub(" ", page_text[max(h.start - CONTEXT, 0):h.end + CONTEXT]).strip()
+            yield page, param, value, age, h.start, context
+        if ages:
+            carry = ages[-1][1]
+
+def extract(store_dir=None):
+    """Build the columns from the corpus store: {column: ndarray} plus the papers name array."""
+    files = corpus.load_index(store_dir).get("files", {})
+    first = {}
+    for path, e in files.items():
+        first.setdefault(e["sha256"], path)
+
+    rows, papers = [], []
+    for sha, path in first.items():
+        text = corpus.read_text(sha, store_dir)
+        if text is None:
+            continue
+        paper = len(papers)
+        papers.append(path)
+        for page, param, value, age, start, context in text_rows(text, docx=path.lower().endswith(".docx")):
+            rows.append((paper, page, PARAMS.index(param), value, UNITS.index(PARAM_UNITS[param]),
+                         age[0] if age else np.nan, age[1] if age else np.nan, start, context))
+    count("evidence rows", len(rows))
+
+    cols = list(zip(*rows)) or [()] * len(COLUMNS)
+    dtypes = (np.int32, np.int32, np.int8, np.float64, np.int8, np.float64, np.float64, np.int32, str)
+    out = {name: np.array(col, dtype=dtype) for name, col, dtype in zip(COLUMNS, cols, dtypes)}
+    out["papers"] = np.array(papers, dtype=str)
+    return out
+
+
+# ---------- Cache ----------
+def digest(store_dir=None):
+    h = hashlib.sha256(f"{EVIDENCE_VERSION}/{corpus.EXTRACTOR_VERSION}/{np.__version__}".encode())
+    for path, e in sorted(corpus.load_index(store_dir).get("files", {}).items()):
+        h.update(f"{path}\0{e['sha256']}\n".encode("utf-8"))
+    for mod in (keyvalues, search, sys.modules[__name__]):
+        with open(mod.__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+def cache_path(store_dir=None):
+    return Path(store_dir or corpus.STORE_DIR) / f"evidence-{digest(store_dir)}.npz"
+
+def build(store_dir=None):
+    """Extract the table and write it (replacing older tables); returns the .npz path."""
+    path = cache_path(store_dir)
+    with stage("extract evidence"):
+        arrays = extract(store_dir)
+    with stage("save evidence"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        for old in path.parent.glob("evidence-*.npz"):
+            if old != path:
+                old.unlink()
+    return path
+
+def load(store_dir=None, rebuild=False):
+    """The corpus's Evidence table, built first if the cached one is missing or stale."""
+    path = cache_path(store_dir)
+    if rebuild or not path.exists():
+        build(store_dir)
+    with np.load(path, allow_pickle=False) as z:
+        return Evidence({name: z[name] for name in COLUMNS}, z["papers"])
+
+
+# ---------- Queries ----------
+def _codes(names, table, what):
+    names = (names,) if isinstance(names, str) else tuple(names)
+    unknown = [n for n in names if n not in table]
+    if unknown:
+        raise KeyError(f"unknown {what} {', '.join(map(repr, unknown))} (have: {', '.join(table)})")
+    return [table.index(n) for n in names]
+
+class Evidence:
+    """
+    A set of evidence rows. select() returns a narrower Evidence sharing the
+    same papers table; columns are plain arrays (ev.value, ev.age_lo, ...).
+    The context strings are the bulk of the table, so a selection keeps row
+    numbers into them (rows) and gathers ev.context only when it is read.
+    """
+
+    def __init__(self, columns, papers, rows=None):
+        self.columns = {name: col for name, col in columns.items() if name != "context"}
+        self.papers = papers
+        self._context = columns["context"]
+        self.rows = np.arange(len(self._context)) if rows is None else rows
+        for name, col in self.columns.items():
+            setattr(self, name, col)
+
+    @property
+    def context(self):
+        return self._context[self.rows]
+
+    def __len__(self):
+        return len(self.value)
+
+    def select(self, param=None, unit=None, ages=None, paper=None, lo=None, hi=None, unknown_age=False):
+        """
+        Rows matching every given filter:
+          param / unit   a name or a list of names (PARAMS / UNITS)
+          ages           (lo, hi): reported age range overlaps it; with
+                         unknown_age=True rows without an age range are kept too
+          paper          substring of the paper path (case-insensitive)
+          lo / hi        value bounds, inclusive
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if param is not None:
+            mask &= np.isin(self.param, _codes(param, PARAMS, "parameter"))
+        if unit is not None:
+            mask &= np.isin(self.unit, _codes(unit, UNITS, "unit"))
+        if ages is not None:
+            overlap = (self.age_lo <= ages[1]) & (self.age_hi >= ages[0])
+            mask &= overlap | np.isnan(self.age_lo) if unknown_age else overlap
+        if paper is not None:
+            hits = [i for i, p in enumerate(self.papers) if paper.lower() in p.lower()]
+            mask &= np.isin(self.paper, hits)
+        if lo is not None:
+            mask &= self.value >= lo
+        if hi is not None:
+            mask &= self.value <= hi
+        columns = {name: col[mask] for name, col in self.columns.items()}
+        columns["context"] = self._context
+        return Evidence(columns, self.papers, self.rows[mask])
+
+    def records(self):
+        context = self.context
+        for i in range(len(self)):
+            yield Record(str(self.papers[self.paper[i]]), int(self.page[i]), PARAMS[self.param[i]],
+                         float(self.value[i]), UNITS[self.unit[i]],
+                         float(self.age_lo[i]), float(self.age_hi[i]), str(context[i]))
+
+    def summary(self, by="param"):
+        """One Group(key, n, papers, min, median, max) per param, paper or age range, by row count."""
+        if by == "param":
+            keys, names = self.param, PARAMS
+        elif by == "paper":
+            keys, names = self.paper, self.papers
+        elif by == "age":
+            # lo * 100 + hi, -1 for rows without an age range
+            keys = np.nan_to_num(self.age_lo * 100 + self.age_hi, nan=-1).astype(np.int64)
+            names = None
+        else:
+            raise ValueError(f"summary by {by!r}: expected param, paper or age")
+        if not len(self):
+            return []
+        order = np.lexsort((self.value, keys))
+        k, v, p = keys[order], self.value[order], self.paper[order]
+        bounds = np.flatnonzero(np.diff(k)) + 1
+        groups = []
+        for ks, vs, ps in zip(np.split(k, bounds), np.split(v, bounds), np.split(p, bounds)):
+            key = int(ks[0])
+            if names is not None:
+                label = str(names[key])
+            else:
+                label = "unknown" if key < 0 else f"{key // 100}-{key % 100}"
+            groups.append(Group(label, len(vs), len(np.unique(ps)), vs[0], float(np.median(vs)), vs[-1]))
+        return sorted(groups, key=lambda g: -g.n)
+
+
+def band_arrays(edition="booklet", ev=None, store_dir=None, **filters):
+    """
+    {pid: (values, edges)} for every parameter of an edition with evidence:
+    values as a float64 array, edges the registry row (danger0, warn0, good0,
+    good1, warn1, danger1) they plot against. filters go to Evidence.select().
+    """
+    ev = load(store_dir) if ev is None else ev
+    ev = ev.select(**filters) if filters else ev
+    edges = registry.band_edges(edition)
+    out = {}
+    for row, pid in enumerate(registry.ids(edition)):
+        if pid in PARAMS:
+            values = ev.value[ev.param == PARAMS.index(pid)]
+            if len(values):
+                out[pid] = (values, edges[row])
+    return out
+
+
+# ---------- CLI ----------
+def _age_arg(text):
+    m = re.fullmatch(r"(\d+)(?:-(\d+))?", text)
+    if not m:
+        raise argparse.ArgumentTypeError(f"expected AGE or LO-HI, got {text!r}")
+    lo = int(m.group(1))
+    return lo, int(m.group(2) or lo)
+
+def _range_arg(text):
+    m = re.fullmatch(r"(-?[\d.]+)?\.\.(-?[\d.]+)?|(-?[\d.]+)", text)
+    if not m:
+        raise argparse.ArgumentTypeError(f"expected LO..HI, LO.., ..HI or N, got {text!r}")
+    if m.group(3):
+        return float(m.group(3)), float(m.group(3))
+    return tuple(float(x) if x else None for x in m.group(1, 2))
+
+def _filters(args):
+    lo, hi = args.range or (None, None)
+    return {"param": args.param, "unit": args.unit, "ages": args.ages, "paper": args.paper,
+            "lo": lo, "hi": hi, "unknown_age": args.unknown_age}
+
+def _ages_text(r):
+    return "-" if np.isnan(r.age_lo) else f"{r.age_lo:g}-{r.age_hi:g}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the table of values reported in the corpus.")
+    parser.add_argument("command", choices=["build", "query", "summary", "bands"])
+    parser.add_argument("--dir", type=Path, default=None, help=f"corpus store (default: {corpus.STORE_DIR})")
+    parser.add_argument("--param", nargs="+", choices=PARAMS, help="parameters to keep")
+    parser.add_argument("--unit", nargs="+", choices=UNITS, help="units to keep")
+    parser.add_argument("--ages", type=_age_arg, help="age range in years, e.g. 6-12 (overlapping rows)")
+    parser.add_argument("--unknown-age", action="store_true", help="with --ages, also keep rows with no age")
+    parser.add_argument("--paper", help="substring of the paper path")
+    parser.add_argument("--range", type=_range_arg, help="value range LO..HI (LO.. / ..HI / N)")
+    parser.add_argument("--by", choices=["param", "paper", "age"], default="param", help="grouping for 'summary'")
+    parser.add_argument("--edition", choices=registry.SPECS, default="booklet", help="bands for 'bands'")
+    parser.add_argument("--csv", action="store_true", help="'query': every column as CSV on stdout")
+    parser.add_argument("-n", "--limit", type=int, default=50, help="'query': rows to print (default: 50)")
+    add_timing_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        with session(args.timings, args.profile, "evidence"):
+            path = build(args.dir)
+        ev = load(args.dir)
+        print(f"✅ Evidence table: {len(ev)} values from {len(ev.papers)} texts -> {path}")
+        return 0
+
+    ev = load(args.dir)
+    if not len(ev.papers):
+        print("❌ The corpus store is empty; run `python corpus.py ingest` first.")
+        return 1
+    try:
+        sel = ev.select(**_filters(args))
+    except KeyError as e:
+        parser.error(str(e))
+
+    if args.command == "query":
+        if args.csv:
+            buf = io.StringIO()
+            w = csv.writer(buf)
+            w.writerow(Record._fields)
+            w.writerows(sel.records())
+            sys.stdout.write(buf.getvalue())
+            return 0
+        for r in list(sel.records())[:args.limit]:
+            print(f"{r.value:>8g} {r.unit:3} {r.param:14} ages {_ages_text(r):6} "
+                  f"{os.path.basename(r.paper)[:40]}, p. {r.page}")
+            print(f"         {r.context}")
+        print(f"{len(sel)} value(s)" + (f", first {args.limit} shown" if len(sel) > args.limit else ""))
+        return 0
+
+    if args.command == "summary":
+        print(f"{args.by:40} {'n':>5} {'papers':>6} {'min':>8} {'median':>8} {'max':>8}")
+        for g in sel.summary(args.by):
+            print(f"{os.path.basename(g.key)[:40]:40} {g.n:>5} {g.papers:>6} {g.min:>8g} {g.median:>8g} {g.max:>8g}")
+        return 0
+
+    names = [zones.ZONE_NAMES[z] for z in (zones.GOOD, zones.WARN, zones.DANGER)]
+    print(f"{'param':10} {'n':>5} " + " ".join(f"{n:>8}" for n in names) + "   (share of values per band)")
+    for pid, (values, edges) in band_arrays(args.edition, sel).items():
+        z, _ = zones.classify(values, edges)
+        shares = [np.count_nonzero(z == code) / len(z) for code in (zones.GOOD, zones.WARN, zones.DANGER)]
+        print(f"{pid:10} {len(values):>5} " + " ".join(f"{s:>8.0%}" for s in shares))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
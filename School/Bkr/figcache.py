@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent, content-addressed cache for the booklet figures.
+
+A figure's key is a SHA-256 over everything that decides its pixels: the
+parameter dict (bands, anchors, labels, markers...), the Matplotlib style,
+DPI, figsize, output format, color constants, the Matplotlib version and the
+source code of the functions that draw it. On a hit the stored PNG (or SVG)
+bytes are returned and Matplotlib is never touched.
+
+The cache lives in $LIGHTING_FIGCACHE_DIR (default ~/.cache/school_lighting/figures)
+and is capped at $LIGHTING_FIGCACHE_MB megabytes (default 256). Hits refresh
+the file's mtime, and eviction drops the least recently used files first.
+
+Usage:
+  python figcache.py info          # entries, size, cap, location
+  python figcache.py clear         # delete every cached figure
+  python figcache.py trim --max-mb 50
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import inspect
+import argparse
+import tempfile
+
+CACHE_DIR = os.environ.get(
+    "LIGHTING_FIGCACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "school_lighting", "figures"),
+)
+MAX_BYTES = int(float(os.environ.get("LIGHTING_FIGCACHE_MB", "256")) * 1024 * 1024)
+
+# -----------------------------------------------------------------------------
+# Keys
+# -----------------------------------------------------------------------------
+def _source(fn):
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        return getattr(fn, "__qualname__", repr(fn))
+
+def figure_key(p, code=(), **settings):
+    """
+    Hash a parameter spec plus the render settings into a cache key.
+
+    code: functions whose source decides the drawing (render fn, band helpers);
+          editing any of them invalidates the affected figures.
+    settings: style, dpi, figsize, colors, ... (anything JSON-serialisable).
+    """
+    import matplotlib
+    payload = {
+        "param": p,
+        "settings": settings,
+        "matplotlib": matplotlib.__version__,
+        "code": [_source(fn) for fn in code],
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def _path(key, cache_dir=None, ext=".png"):
+    return os.path.join(cache_dir or CACHE_DIR, key[:2], key + ext)
+
+# -----------------------------------------------------------------------------
+# Lookup / store / evict
+# -----------------------------------------------------------------------------
+def fetch(key, cache_dir=None, ext=".png"):
+    """Return the cached figure bytes for key, or None on a miss."""
+    src = _path(key, cache_dir, ext)
+    try:
+        with open(src, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(src)  # mark as recently used
+    except FileNotFoundError:
+        pass  # trimmed by another process since the read; the bytes are still good
+    return data
+
+def store(key, data, cache_dir=None, ext=".png"):
+    """Add freshly rendered figure bytes to the cache (atomic, safe across processes)."""
+    dst = _path(key, cache_dir, ext)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def entries(cache_dir=None):
+    """List (path, size, mtime) for every cached figure."""
+    root = cache_dir or CACHE_DIR
+    out = []
+    if not os.path.isdir(root):
+        return out
+    for shard in os.scandir(root):
+        if not shard.is_dir():
+            continue
+        for f in os.scandir(shard.path):
+            if f.name.endswith((".png", ".svg", ".pdf")):
+                st = f.stat()
+                out.append((f.path, st.st_size, st.st_mtime))
+    return out
+
+def evict(max_bytes=None, cache_dir=None):
+    """Delete least-recently-used figures until the cache fits max_bytes. Returns bytes freed."""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    items = sorted(entries(cache_dir), key=lambda e: e[2])
+    total = sum(size for _, size, _ in items)
+    freed = 0
+    for path, size, _ in items:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        freed += size
+    return freed
+
+def clear(cache_dir=None):
+    root = cache_dir or CACHE_DIR
+    n = len(entries(cache_dir))
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    return n
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the booklet figure cache.")
+    parser.add_argument("command", choices=["info", "clear", "trim"])
+    parser.add_argument("--dir", default=None, help=f"cache directory (default: {CACHE_DIR})")
+    parser.add_argument("--max-mb", type=float, default=None, help="size cap for 'trim' (default: LIGHTING_FIGCACHE_MB)")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        items = entries(args.dir)
+        total = sum(size for _, size, _ in items)
+        print("Figure cache:", args.dir or CACHE_DIR)
+        print(f"  entries: {len(items)}")
+        print(f"  size:    {total / 1024 / 1024:.2f} MB of {MAX_BYTES / 1024 / 1024:.0f} MB cap")
+    elif args.command == "clear":
+        print(f"🧹 Removed {clear(args.dir)} cached figures.")
+    else:
+        cap = MAX_BYTES if args.max_mb is None else int(args.max_mb * 1024 * 1024)
+        print(f"🧹 Freed {evict(cap, args.dir) / 1024 / 1024:.2f} MB.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+"""
+Figure rendering helpers shared by the booklet builders (st.py, st2.py, file.py).
+
+render_figures() runs a per-figure render function over a list of jobs and
+returns the results (PNG bytes) in job order, so the DOCX can still be
+assembled chapter by chapter. With workers > 1 the jobs are fanned out over
+a process pool; workers=1 renders serially in the current process.
+
+Figures stay in memory: the builders hand the bytes to doc.add_picture()
+through a BytesIO, and only write image files when asked to (--save-images).
+
+iter_chapter_figures() is the pipelined variant (--pipeline): figures are
+rendered ahead in background processes and handed out in order as each one
+finishes, so the builder adds headings, text and pictures for one chapter
+while the next figures are still being drawn and encoded. A bounded number
+of figures is in flight at a time; the output is the same as without it.
+
+Passing cache_key enables the persistent figure cache (figcache.py): jobs
+whose key is already cached are served from the cache and never rendered.
+
+band_canvas() hands out a reusable figure whose red/amber/green band patches
+(and optional band legend) are built once per process for a given style and
+geometry; each chart then only moves the band edges and draws its curve,
+markers and labels on top.
+
+With --figure-format svg the chapter figures are embedded as vector SVG
+(Word 2016+ / Microsoft 365, LibreOffice 7+) and a FALLBACK_DPI PNG is kept
+alongside for older readers: the same picture, with an asvg:svgBlip extension
+on its blip pointing at the SVG part.
+
+The PDF backend (pdf_writer.py, --backend pdf) asks for figure_format "pdf":
+one-page vector PDFs only, no raster fallback.
+
+Requirements:
+  pip install matplotlib numpy
+"""
+
+import io
+import os
+import itertools
+import collections
+from concurrent.futures import ProcessPoolExecutor, Future
+
+import figcache
+from timing import stage, count
+
+FIGURE_FORMATS = ("png", "svg")  # what a DOCX can embed (--figure-format)
+PDF_FORMAT = "pdf"                 # vector figures for pdf_writer.PdfDocument
+FALLBACK_DPI = 96  # raster fallback resolution in SVG mode
+SVG_CONTENT_TYPE = "image/svg+xml"
+SVG_BLIP_URI = "{96DAC541-7B7A-43D3-8B79-37D633B846F1}"
+NS_ASVG = "http://schemas.microsoft.com/office/drawing/2016/SVG/main"
+
+
+def resolve_workers(workers, n_jobs):
+    """Clamp a --workers value: 0/None -> all cores, never more than the job count."""
+    if not workers:
+        workers = os.cpu_count() or 1
+    return max(1, min(int(workers), n_jobs or 1))
+
+
+def _run(render_one, jobs, workers):
+    if not jobs:
+        return []
+    workers = resolve_workers(workers, len(jobs))
+    if workers == 1:
+        return [render_one(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() yields in submission order regardless of completion order
+        return list(pool.map(render_one, *zip(*jobs)))
+
+
+def render_figures(render_one, jobs, workers=1, cache_key=None, ext=".png"):
+    """
+    Call render_one(*job) for every job and return the figure bytes in job order.
+
+    render_one must be a module-level function (the pool pickles it by name)
+    returning PNG (or SVG) bytes, and each job a tuple of picklable arguments,
+    e.g. (param_dict,).
+
+    cache_key: optional callable(*job) -> figcache key. Cached figures are
+    returned as-is; the rest are rendered and then cached under ext.
+    """
+    jobs = [tuple(job) for job in jobs]
+    if cache_key is None:
+        count("figures rendered", len(jobs))
+        return _run(render_one, jobs, workers)
+
+    results = [None] * len(jobs)
+    with stage("figure cache"):
+        keys = [cache_key(*job) for job in jobs]
+        todo = []
+        for i in range(len(jobs)):
+            results[i] = figcache.fetch(keys[i], ext=ext)
+            if results[i] is None:
+                todo.append(i)
+    count("figures cached", len(jobs) - len(todo))
+    count("figures rendered", len(todo))
+
+    for i, png in zip(todo, _run(render_one, [jobs[i] for i in todo], workers)):
+        figcache.store(keys[i], png, ext=ext)
+        results[i] = png
+    if todo:
+        figcache.evict()
+    return results
+
+
+def render_chapter_figures(render_one, params, figure_format="png", dpi=None, workers=1, cache_key=None):
+    """
+    Render one figure per parameter dict and return [(png, svg), ...] in order.
+
+    render_one(p, fmt, dpi) and cache_key(p, fmt, dpi) are the builder's
+    render/key functions. In PNG mode svg is None; in SVG mode png is the
+    FALLBACK_DPI raster that Word shows when it cannot draw the SVG. In PDF
+    mode the first item is the vector PDF itself (add_picture() takes it).
+    """
+    if figure_format not in FIGURE_FORMATS + (PDF_FORMAT,):
+        raise ValueError(f"unknown figure format {figure_format!r} (expected one of {FIGURE_FORMATS + (PDF_FORMAT,)})")
+    if figure_format in ("png", PDF_FORMAT):
+        figs = render_figures(render_one, [(p, figure_format, dpi) for p in params], workers, cache_key,
+                              ext="." + figure_format)
+        return [(fig, None) for fig in figs]
+    svgs = render_figures(render_one, [(p, "svg", dpi) for p in params], workers, cache_key, ext=".svg")
+    pngs = render_figures(render_one, [(p, "png", FALLBACK_DPI) for p in params], workers, cache_key)
+    return list(zip(pngs, svgs))
+
+
+def _variants(figure_format, dpi):
+    """(fmt, dpi) of the figures rendered per parameter, in (primary picture, svg) order."""
+    if figure_format not in FIGURE_FORMATS + (PDF_FORMAT,):
+        raise ValueError(f"unknown figure format {figure_format!r} (expected one of {FIGURE_FORMATS + (PDF_FORMAT,)})")
+    if figure_format == "svg":
+        return [("png", FALLBACK_DPI), ("svg", dpi)]
+    return [(figure_format, dpi)]
+
+
+def iter_chapter_figures(render_one, params, figure_format="png", dpi=None, workers=1, cache_key=None,
+                         ahead=None):
+    """
+    Pipelined render_chapter_figures(): yield (png, svg) per parameter, in order.
+
+    Figures are rendered in `workers` background processes (at least one, so
+    workers=1 still overlaps rendering with the caller's assembly). At most
+    `ahead` parameters (default: two per worker) are queued past the one the
+    caller is waiting for. Cached figures skip the pool; new ones are cached
+    as they arrive. Time spent waiting on the pool is the "render figures" stage.
+    """
+    variants = _variants(figure_format, dpi)
+    params = list(params)
+    workers = resolve_workers(workers, len(params))
+    ahead = max(1, ahead or 2 * workers)
+    pending = collections.deque()
+    rendered = False
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def submit(p):
+            slots = []
+            for fmt, d in variants:
+                key = cache_key(p, fmt, d) if cache_key is not None else None
+                fig = figcache.fetch(key, ext="." + fmt) if key is not None else None
+                if fig is None:
+                    count("figures rendered")
+                    fig = pool.submit(render_one, p, fmt, d)
+                else:
+                    count("figures cached")
+                slots.append((key, fmt, fig))
+            pending.append(slots)
+
+        todo = iter(params)
+        try:
+            with stage("render figures"):
+                for p in itertools.islice(todo, ahead + 1):
+                    submit(p)
+            while pending:
+                figs = []
+                with stage("render figures"):
+                    for key, fmt, fig in pending.popleft():
+                        if isinstance(fig, Future):
+                            fig = fig.result()
+                            rendered = True
+                            if key is not None:
+                                figcache.store(key, fig, ext="." + fmt)
+                        figs.append(fig)
+                    # Refill before handing the figure out, so the pool keeps working during assembly
+                    for p in itertools.islice(todo, 1):
+                        submit(p)
+                yield (figs[0], figs[1] if len(figs) > 1 else None)
+        finally:
+            # A caller that stops early must not wait for the figures it will never take
+            for slots in pending:
+                for _, _, fig in slots:
+                    if isinstance(fig, Future):
+                        fig.cancel()
+    if rendered and cache_key is not None:
+        figcache.evict()
+
+
+def fig_to_png(fig, **savefig_kwargs):
+    """Serialize a figure to PNG bytes without touching the filesystem."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", **savefig_kwargs)
+    return buf.getvalue()
+
+
+def fig_to_svg(fig, **savefig_kwargs):
+    """Serialize a figure to SVG bytes; ids and metadata are fixed so equal charts give equal bytes."""
+    import matplotlib
+    buf = io.BytesIO()
+    with matplotlib.rc_context({"svg.hashsalt": "school-lighting"}):
+        fig.savefig(buf, format="svg", metadata={"Date": None}, **savefig_kwargs)
+    return buf.getvalue()
+
+
+def fig_to_pdf(fig, **savefig_kwargs):
+    """Serialize a figure to a one-page vector PDF; no creation date, so equal charts give equal bytes."""
+    import matplotlib
+    buf = io.BytesIO()
+    # Type 42: chart text stays a real (subsetted) TrueType font instead of Type 3 glyph procedures
+    with matplotlib.rc_context({"pdf.fonttype": 42}):
+        fig.savefig(buf, format="pdf", metadata={"CreationDate": None}, **savefig_kwargs)
+    return buf.getvalue()
+
+
+def picture_stream(png):
+    """Wrap PNG bytes for doc.add_picture()."""
+    return io.BytesIO(png)
+
+
+def _svg_part(doc_part, svg):
+    from docx.opc.part import Part
+    package = doc_part.package
+    for part in package.iter_parts():
+        if part.content_type == SVG_CONTENT_TYPE and part.blob == svg:
+            return part  # identical SVGs share one part, like python-docx does for PNGs
+    partname = package.next_partname("/word/media/image%d.svg")
+    return Part(partname, SVG_CONTENT_TYPE, svg, package)
+
+
+def add_figure(doc, png, width, svg=None):
+    """
+    doc.add_picture() for a rendered figure. With svg, the picture carries the
+    SVG as its primary image and png becomes the fallback for older readers.
+    """
+    if getattr(doc, "streaming", False):
+        # docx_stream.StreamingDocument writes the svgBlip itself (pdf_writer.PdfDocument ignores it)
+        return doc.add_picture(picture_stream(png), width=width, svg=svg)
+    shape = doc.add_picture(picture_stream(png), width=width)
+    if svg is None:
+        return shape
+
+    from lxml import etree
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    rid = doc.part.relate_to(_svg_part(doc.part, svg), RT.IMAGE)
+    blip = shape._inline.graphic.graphicData.pic.blipFill.blip
+    ext_lst = OxmlElement("a:extLst")
+    ext = OxmlElement("a:ext")
+    ext.set("uri", SVG_BLIP_URI)
+    svg_blip = etree.SubElement(ext, f"{{{NS_ASVG}}}svgBlip", nsmap={"asvg": NS_ASVG})
+    svg_blip.set(qn("r:embed"), rid)
+    ext_lst.append(ext)
+    blip.append(ext_lst)
+    return shape
+
+
+def write_images(pngs, paths):
+    """Write rendered figures to disk (only used with --save-images)."""
+    for png, path in zip(pngs, paths):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(png)
+    return paths
+
+
+# -----------------------------------------------------------------------------
+# Reusable band background
+# -----------------------------------------------------------------------------
+# One canvas per (style, geometry, band look) and process
+_CANVASES = {}
+
+
+class BandCanvas:
+    """
+    A figure with the five band rectangles already in place:
+      danger[0]..warn[0] | warn[0]..good[0] | good | good[1]..warn[1] | warn[1]..danger[1]
+
+    start() moves the band edges for the next chart and clears what the
+    previous one drew, including the layout tight_layout() left behind, so a
+    chart comes out byte for byte as it would on a figure of its own, whatever
+    was drawn before it; finish() returns the PNG bytes.
+    """
+
+    def __init__(self, figsize, colors, alphas, labels=(None, None, None),
+                 hide_yticks=False, band_legend=False):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        bad, warn, good = colors
+        a_bad, a_warn, a_good = alphas
+        l_bad, l_warn, l_good = labels
+        # A bare Agg figure, outside pyplot's figure manager: it lives for the whole process
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.figure_dpi = self.fig.dpi  # what dpi="figure" means, whatever the last chart used
+        # tight_layout() moves the Axes; every chart starts again from this layout
+        sp = self.fig.subplotpars
+        self.subplotpars = dict(left=sp.left, right=sp.right, bottom=sp.bottom, top=sp.top,
+                                wspace=sp.wspace, hspace=sp.hspace)
+
+        # The very patches axvspan() makes (grid transform, interpolated path), so the
+        # bands draw exactly as on a fresh figure
+        looks = [(bad, a_bad, l_bad), (warn, a_warn, l_warn), (good, a_good, l_good),
+                 (warn, a_warn, None), (bad, a_bad, None)]
+        self.spans = [self.ax.axvspan(0, 0, color=color, alpha=alpha, label=label)
+                      for color, alpha, label in looks]
+
+        if hide_yticks:
+            self.ax.set_yticks([])
+        self.static_legend = None
+        if band_legend:
+            handles = [r for r in self.spans if r.get_label() and not r.get_label().startswith("_")]
+            self.static_legend = self.ax.legend(handles, [h.get_label() for h in handles], loc="upper right")
+
+    def start(self, xlim, good, warn, danger):
+        """Clear the previous chart, move the bands and return the Axes to draw on."""
+        ax = self.ax
+        for artist in list(ax.lines) + list(ax.texts):
+            artist.remove()
+        legend = ax.get_legend()
+        if legend is not None and legend is not self.static_legend:
+            legend.remove()
+            if self.static_legend is not None:
+                ax.legend_ = self.static_legend
+        ax.set_title("")
+        ax.set_xlabel("")
+        ax.set_ylabel("")
+        self.fig.subplots_adjust(**self.subplotpars)
+
+        edges = (danger[0], warn[0], good[0], good[1], warn[1], danger[1])
+        for rect, x0, x1 in zip(self.spans, edges[:-1], edges[1:]):
+            rect.set_x(x0)
+            rect.set_width(x1 - x0)
+
+        # Data limits come from the chart's own lines, as on a fresh Axes: relim()
+        # would also count the bands' 0..1 axes-fraction heights as y data
+        for rect in self.spans:
+            rect.set_visible(False)
+        ax.relim(visible_only=True)
+        for rect in self.spans:
+            rect.set_visible(True)
+        ax.autoscale(enable=True, axis="y")
+        ax.set_xlim(*xlim)
+        return ax
+
+    def finish(self, dpi=None, bbox_inches=None, pad_inches=None, fmt="png"):
+        """
+        Lay out and return PNG bytes (or SVG/PDF bytes with fmt="svg"/"pdf").
+
+        The output is exactly savefig(dpi=..., bbox_inches="tight") of the same
+        chart on a fresh figure. For PNGs the tight box is measured here and
+        handed to savefig as a Bbox, which spares savefig its own measuring
+        draw: the chart is drawn once.
+        """
+        import matplotlib
+
+        fig = self.fig
+        dpi = dpi or matplotlib.rcParams["savefig.dpi"]
+        if dpi == "figure":
+            dpi = self.figure_dpi
+        # Laid out at the figure's own dpi, as a fresh figure is before savefig(dpi=...):
+        # text extents (and so the layout) shift slightly with the dpi they are measured at
+        fig.set_dpi(self.figure_dpi)
+        with stage("tight_layout"):
+            fig.tight_layout()
+        # tight_layout() leaves a placeholder layout engine behind, and any engine
+        # makes savefig draw the whole figure once more before printing it
+        fig.set_layout_engine(None)
+        if fmt in ("svg", PDF_FORMAT):
+            with stage("savefig"):
+                to_bytes = fig_to_svg if fmt == "svg" else fig_to_pdf
+                return to_bytes(fig, bbox_inches=bbox_inches, pad_inches=pad_inches)
+
+        if bbox_inches == "tight":
+            if pad_inches is None:
+                pad_inches = matplotlib.rcParams["savefig.pad_inches"]
+            # The box savefig would measure: same dpi, so the same text extents
+            fig.set_dpi(dpi)
+            bbox_inches = fig.get_tightbbox(fig.canvas.get_renderer()).padded(pad_inches)
+            pad_inches = None
+            fig.set_dpi(self.figure_dpi)
+        with stage("savefig"):
+            return fig_to_png(fig, dpi=dpi, bbox_inches=bbox_inches, pad_inches=pad_inches)
+
+
+# Everything a band_canvas() chart goes through once drawn: part of the builders' figure cache keys
+CANVAS_CODE = (BandCanvas, fig_to_png, fig_to_svg, fig_to_pdf)
+
+
+def band_canvas(figsize, colors, alphas, labels=(None, None, None),
+                hide_yticks=False, band_legend=False, style=None):
+    """Return this process's BandCanvas for the given look, creating it on first use."""
+    key = (style, tuple(figsize), tuple(colors), tuple(alphas), tuple(labels), hide_yticks, band_legend)
+    canvas = _CANVASES.get(key)
+    if canvas is None:
+        canvas = _CANVASES[key] = BandCanvas(figsize, colors, alphas, labels, hide_yticks, band_legend)
+    return canvas
+
+
+def add_workers_arg(parser):
+    parser.add_argument(
+        "-j", "--workers", type=int, default=1,
+        help="figure render processes (1 = serial, 0 = one per CPU core)",
+    )
+
+
+def add_pipeline_arg(parser):
+    parser.add_argument(
+        "--pipeline", action="store_true",
+        help="render figures in background processes while the chapters are assembled (-j sets how many)",
+    )
+
+
+def add_cache_arg(parser):
+    parser.add_argument(
+        "--no-cache", dest="use_cache", action="store_false",
+        help="always re-render figures instead of reusing the figure cache",
+    )
+
+
+def add_save_images_arg(parser):
+    parser.add_argument(
+        "--save-images", action="store_true",
+        help="also write every figure as a PNG file next to the DOCX",
+    )
+
+
+def add_format_arg(parser):
+    parser.add_argument(
+        "--figure-format", choices=FIGURE_FORMATS, default="png",
+        help="embed figures as PNG, or as vector SVG with a PNG fallback",
+    )
+
+
+def add_optimize_arg(parser):
+    parser.add_argument(
+        "--no-optimize-images", dest="optimize_images", action="store_false",
+        help="keep the rendered PNGs as-is instead of palette-optimizing them (imgopt.py)",
+    )
+    parser.add_argument(
+        "--lossy-images", action="store_true",
+        help="also allow 256-color median-cut palettes above imgopt.MIN_PSNR (smaller, not lossless)",
+    )
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Shrink the images inside a finished DOCX (post-pass for st.py, st2.py, file.py).
+
+For every PNG in the package:
+  - images with at most 256 distinct colors are rewritten as an exact indexed
+    palette (lossless, alpha kept through tRNS);
+  - busier images (antialiased curve edges push the band charts to ~1-2k
+    colors) are left as they are: matplotlib has already deflated them, and
+    re-deflating costs far more time than the few percent it saves. Only when
+    a min_psnr floor is given (--min-psnr, or --lossy-images in the builders)
+    do they get a 256-color median-cut palette, kept if it stays above that
+    many dB against the original;
+  - text chunks, timestamps and "Software" tags are dropped (dpi and any ICC
+    profile are kept);
+  - a result is only used when it is smaller than what was there.
+
+Identical images are then stored once: duplicate media parts are removed and
+every relationship that pointed at them is retargeted to the kept copy.
+(python-docx already shares a part when the exact same bytes are added twice;
+this also catches images that only become identical after optimization.)
+
+The rewritten file keeps the original's permissions.
+
+Usage:
+  python imgopt.py School_Lighting_Booklet_FULL.docx            # lossless
+  python imgopt.py School_Lighting_Booklet_FULL.docx --lossy    # median-cut above MIN_PSNR
+  python imgopt.py School_Lighting_Booklet_FULL.docx --min-psnr 50
+
+Requirements:
+  pip install pillow numpy
+"""
+
+import io
+import os
+import re
+import sys
+import hashlib
+import zipfile
+import argparse
+import shutil
+import posixpath
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+MIN_PSNR = 45.0  # dB floor for opt-in lossy palettes; the band charts land around 55-60
+
+
+# -----------------------------------------------------------------------------
+# Single images
+# -----------------------------------------------------------------------------
+def _exact_palette(img):
+    """Indexed copy of img if it has <= 256 colors, else None. Lossless."""
+    if img.getcolors(256) is None:
+        return None
+    arr = np.asarray(img)
+    flat = arr.reshape(-1, arr.shape[-1]).astype(np.uint32)
+    packed = np.zeros(len(flat), dtype=np.uint32)
+    for c in range(flat.shape[1]):
+        packed = (packed << 8) | flat[:, c]
+    colors, index = np.unique(packed, return_inverse=True)
+
+    channels = np.stack([(colors >> (8 * s)) & 0xFF for s in reversed(range(flat.shape[1]))], axis=1)
+    pal = Image.fromarray(index.reshape(arr.shape[:2]).astype(np.uint8), "P")
+    pal.putpalette(channels[:, :3].astype(np.uint8).tobytes(), rawmode="RGB")
+    if img.mode == "RGBA":
+        pal.info["transparency"] = channels[:, 3].astype(np.uint8).tobytes()
+    return pal
+
+
+def _psnr(a, b):
+    mse = np.mean((np.asarray(a, dtype=np.float32) - np.asarray(b, dtype=np.float32)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def _quantized(img, min_psnr):
+    """256-color median-cut copy of an RGB img, or None if it loses too much."""
+    if img.mode != "RGB" or min_psnr is None:
+        return None
+    pal = img.quantize(256, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+    return pal if _psnr(img, pal.convert("RGB")) >= min_psnr else None
+
+
+def optimize_png(data, min_psnr=None):
+    """
+    Return smaller PNG bytes for data, or data itself if nothing helps.
+
+    With min_psnr=None (the default) only images that fit an exact palette are
+    rewritten; busier ones are returned as they are. A floor in dB also allows
+    median-cut palettes for those.
+    """
+    img = Image.open(io.BytesIO(data))
+    if img.format != "PNG" or img.mode not in ("RGB", "RGBA", "L", "P"):
+        return data
+    img.load()
+    keep = {k: img.info[k] for k in ("dpi", "icc_profile") if k in img.info}
+    busy = img.mode in ("RGB", "RGBA") and img.getcolors(256) is None
+    if busy and min_psnr is None:
+        return data  # already deflated by matplotlib; re-deflating is slow for a few %
+
+    if img.mode == "RGBA" and img.getextrema()[3][0] == 255:
+        img = img.convert("RGB")  # fully opaque
+    if img.mode in ("RGB", "RGBA"):
+        img = (None if busy else _exact_palette(img)) or _quantized(img, min_psnr) or img
+
+    if "transparency" in img.info:
+        keep["transparency"] = img.info["transparency"]
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True, **keep)
+    out = buf.getvalue()
+    return out if len(out) < len(data) else data
+
+
+# -----------------------------------------------------------------------------
+# Whole packages
+# -----------------------------------------------------------------------------
+_TARGET = re.compile(r'(Target=")([^"]+)(")')
+
+
+def _rels_source_dir(rels_name):
+    # word/_rels/document.xml.rels -> word ; _rels/.rels -> ""
+    return posixpath.dirname(posixpath.dirname(rels_name))
+
+
+def _retarget(xml, rels_name, moved):
+    base = _rels_source_dir(rels_name)
+
+    def sub(m):
+        target = m.group(2)
+        if "://" in target:
+            return m.group(0)
+        resolved = posixpath.normpath(posixpath.join(base, target)).lstrip("/")
+        if resolved not in moved:
+            return m.group(0)
+        return m.group(1) + posixpath.relpath(moved[resolved], base or ".") + m.group(3)
+
+    return _TARGET.sub(sub, xml)
+
+
+def optimize_docx(path, min_psnr=None):
+    """
+    Optimize and deduplicate the PNGs inside the DOCX at path, in place.
+
+    Returns a dict: before/after (file bytes), images, optimized, duplicates.
+    """
+    before = os.path.getsize(path)
+    with zipfile.ZipFile(path) as zin:
+        infos = zin.infolist()
+        parts = {i.filename: zin.read(i.filename) for i in infos}
+
+    optimized = 0
+    kept = {}   # sha1 -> part name
+    moved = {}  # duplicate part name -> kept part name
+    images = [n for n in parts if "/media/" in n and n.lower().endswith(".png")]
+    for name in images:
+        data = optimize_png(parts[name], min_psnr)
+        if data is not parts[name]:
+            optimized += 1
+            parts[name] = data
+        digest = hashlib.sha1(data).hexdigest()
+        if digest in kept:
+            moved[name] = kept[digest]
+        else:
+            kept[digest] = name
+
+    if moved:
+        for name in parts:
+            if name.endswith(".rels"):
+                xml = parts[name].decode("utf-8")
+                parts[name] = _retarget(xml, name, moved).encode("utf-8")
+
+    stats = {"before": before, "images": len(images), "optimized": optimized, "duplicates": len(moved)}
+    if not optimized and not moved:
+        stats["after"] = before
+        return stats
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".docx.tmp")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info in infos:
+                if info.filename not in moved:
+                    zout.writestr(info, parts[info.filename], compress_type=info.compress_type)
+        shutil.copymode(path, tmp)  # mkstemp creates the file 0600
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    stats["after"] = os.path.getsize(path)
+    return stats
+
+
+def describe(stats):
+    saved = stats["before"] - stats["after"]
+    pct = 100.0 * saved / stats["before"] if stats["before"] else 0.0
+    return (f"🗜️ Images: {stats['optimized']}/{stats['images']} optimized, "
+            f"{stats['duplicates']} duplicates removed, saved {saved / 1024:.1f} KB "
+            f"({stats['before'] / 1024:.1f} → {stats['after'] / 1024:.1f} KB, -{pct:.0f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shrink and deduplicate the images inside DOCX files.")
+    parser.add_argument("docx", nargs="+")
+    lossy = parser.add_mutually_exclusive_group()
+    lossy.add_argument("--lossy", dest="min_psnr", action="store_const", const=MIN_PSNR,
+                       help=f"allow median-cut palettes that stay above {MIN_PSNR:g} dB")
+    lossy.add_argument("--min-psnr", type=float, default=None,
+                       help="allow median-cut palettes that stay above this many dB (default: lossless only)")
+    args = parser.parse_args(argv)
+    for path in args.docx:
+        stats = optimize_docx(path, args.min_psnr)
+        print(path + ":", describe(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
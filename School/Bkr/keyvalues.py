@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass extraction of lighting values from study text.
+
+One compiled pattern walks the lowercased text once and yields a Hit per
+value found, with its character offsets in the source:
+
+  cct       "4000 K", "2700K"             3-4 digit kelvin values starting 2-7
+  lux       "500 lux", "300 lx"           2-4 digits
+  hz        "120 Hz"                      2-4 digits
+  cri       "CRI ≥ 80", "CRI of 90"       first 2-3 digit number after CRI on its line
+  ugr       "UGR < 19", "UGR of 16"       first 1-2 digit number after UGR on its line
+  percent   "12.5% improvement"           % followed by improv/increase/decrease/reduc
+  age       "kindergarten", "children"    the AGE_LABELS words
+  age_range "aged 6-12", "ages 8 to 11"   (lo, hi) in years after age/aged/ages
+
+scan(text) scans a string; Scanner.feed() takes the text in chunks of any
+size (a paragraph, a PDF page, 1 MB of a corpus file) and keeps only a short
+tail between calls, so offsets and results do not depend on the chunking.
+summarize() folds hits into the dict st2.py puts in its intro, and
+extract_key_values() is the drop-in for the old per-pattern version.
+
+Numbers are whole tokens: "1000 lux" and "1,000 lux" are 1000, "1.500 lux" is
+not a lux value, and "CRI 1000" gives no CRI value (the old regexes took
+digits out of the middle of longer numbers). Thousands separators are read as
+search.py reads them, 1-3 digits then groups of ",ddd"; a malformed grouping
+such as "1,0000 lux" gives nothing rather than its pieces.
+"""
+
+import re
+from collections import namedtuple
+
+AGE_LABELS = ("preschool", "kindergarten", "elementary", "primary", "secondary", "adolescent",
+              "undergraduate", "children")
+KINDS = ("cct", "lux", "hz", "cri", "ugr", "percent", "age", "age_range")
+# Keywords whose value is the next number on the same line: kind -> allowed digit counts
+ARMING = {"cri": (2, 3), "ugr": (1, 2)}
+
+Hit = namedtuple("Hit", "kind value start end")
+
+# Every branch starts with a plain character, which lets re skip ahead in C to the
+# next digit, newline or keyword initial instead of trying each branch at every
+# position (a named group or \b in front would turn that off). Text is lowercased
+# first; a match starting with a digit is a number, anything else a keyword, and
+# the left word boundary is checked in Scanner._hit().
+_AGE_RANGE = r"age[sd]?[^\S\n]*(?:of[^\S\n]*)?[0-9]{1,2}[^\S\n]*(?:-|–|—|to\b)[^\S\n]*[0-9]{1,2}\b"
+_NUMBER = r"(?:[0-9]{0,2}(?:,[0-9]{3})+(?![0-9])|[0-9]*)(?:\.[0-9]+)?[^\S\n]*(?:(?:lux|lx|hz|k)\b|%\s*(?:improv|increase|decrease|reduc)?)?"
+TOKEN = re.compile("|".join(
+    [d + _NUMBER for d in "0123456789"] + ["\n"] + [word + r"\b" for word in ARMING]
+    + [_AGE_RANGE] + [label + r"\b" for label in AGE_LABELS]
+))
+NUMBER = re.compile(r"([0-9]{1,3}(?:,[0-9]{3})+|[0-9]+)(?:\.([0-9]+))?[^\S\n]*(?:(lux|lx|hz|k)|(%)\s*(improv|increase|decrease|reduc)?)?")
+# Lowercasing that keeps offsets, for the rare text where str.lower() changes the length
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+# Longest stretch of text a single token can span; Scanner holds this much back between chunks
+HOLD = 64
+
+
+class Scanner:
+    """
+    Incremental extractor: feed() text chunks in order, then close().
+
+    Both return the hits completed so far. A token cut by a chunk boundary is
+    finished on the next feed(); a CRI or UGR waits for its number across
+    chunks until the end of its line.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._base = 0   # source offset of _buf[0]
+        self._pos = 0    # where scanning resumes in _buf (earlier chars are context for \b)
+        self._armed = None  # "cri"/"ugr" while waiting for that keyword's number
+
+    def feed(self, chunk, final=False):
+        low = chunk.lower()
+        if len(low) != len(chunk):
+            low = chunk.translate(_ASCII_LOWER)
+        buf = self._buf + low
+        limit = len(buf) if final else len(buf) - HOLD
+        hits = []
+        resume = self._pos
+        for m in TOKEN.finditer(buf, self._pos):
+            if m.end() > limit:
+                break  # may still grow with the next chunk
+            self._hit(buf, m, hits)
+            resume = m.end()
+        else:
+            resume = max(resume, limit)
+        if not final:
+            keep = max(resume - 1, 0)
+            self._buf, self._pos = buf[keep:], resume - keep
+            self._base += keep
+        else:
+            self._buf, self._pos = "", 0
+            self._base += len(buf)
+        return hits
+
+    def close(self):
+        hits = self.feed("", final=True)
+        self._armed = None
+        return hits
+
+    def _hit(self, buf, m, hits):
+        start, end = m.span()
+        first = buf[start]
+        if first == "\n":
+            self._armed = None
+            return
+        if start and (buf[start - 1].isalnum() or buf[start - 1] == "_"):
+            return  # inside a longer word or number
+        if start > 1 and buf[start - 1] == "," and buf[start - 2].isdigit():
+            return  # rest of a malformed grouping such as "1,0000"
+        offset = self._base
+        if not first.isdigit():
+            word = m.group()
+            if word in ARMING:
+                self._armed = word
+            elif word.startswith("age"):
+                lo, hi = map(int, re.findall(r"[0-9]+", word))
+                if lo < hi:
+                    hits.append(Hit("age_range", (lo, hi), offset + start, offset + end))
+            else:
+                hits.append(Hit("age", word, offset + start, offset + end))
+            return
+
+        grouped, frac, unit, _, change = NUMBER.match(m.group()).groups()
+        whole = grouped.replace(",", "")
+        if self._armed:
+            low, high = ARMING[self._armed]
+            if low <= len(whole) <= high:
+                n = len(grouped) + (len(frac) + 1 if frac else 0)
+                hits.append(Hit(self._armed, int(whole), offset + start, offset + start + n))
+                self._armed = None
+        if change:
+            if len(whole) <= 3 and (frac is None or len(frac) <= 2):
+                hits.append(Hit("percent", whole + ("." + frac if frac else ""), offset + start, offset + end))
+            return
+        if frac is not None or unit is None:
+            return  # kelvin, lux and Hz values are whole numbers
+        if unit == "k":
+            ok = 3 <= len(whole) <= 4 and whole[0] in "234567"
+        else:
+            ok = 2 <= len(whole) <= 4
+        if ok:
+            kind = "lux" if unit in ("lux", "lx") else "hz" if unit == "hz" else "cct"
+            hits.append(Hit(kind, int(whole), offset + start, offset + end))
+
+
+def scan(text):
+    """Every Hit in text, in source order."""
+    s = Scanner()
+    return s.feed(text) + s.close()
+
+
+def scan_stream(chunks):
+    """Yield the Hits of a text given as an iterable of chunks (offsets are into the joined text)."""
+    s = Scanner()
+    for chunk in chunks:
+        yield from s.feed(chunk)
+    yield from s.close()
+
+
+def summarize(hits):
+    """Fold hits into st2.py's summary dict; keys only appear when something was found."""
+    found = {kind: [] for kind in KINDS}
+    for h in hits:
+        found[h.kind].append(h.value)
+    res = {}
+    if found["cct"]:
+        res["CCT_values"] = sorted(set(found["cct"]))
+    if found["lux"]:
+        res["Lux_values"] = sorted(set(found["lux"]))
+    if found["cri"]:
+        res["CRI_values"] = sorted(set(found["cri"]))
+    if found["hz"]:
+        res["Flicker_freqs_Hz"] = sorted(set(found["hz"]))
+    ages = set(found["age"])
+    if ages:
+        res["age_mentions"] = [a for a in AGE_LABELS if a in ages]
+    if found["percent"]:
+        res["percent_changes"] = found["percent"]
+    return res
+
+
+def extract_key_values(paragraphs):
+    """
+    Best-effort values from study paragraphs: CCT, lux, CRI, flicker
+    frequencies, age groups and % changes (see summarize()).
+    """
+    return summarize(scan_stream(_lines(paragraphs)))
+
+
+def _lines(paragraphs):
+    for i, p in enumerate(paragraphs):
+        yield ("\n" if i else "") + p
@@ -0,0 +1,635 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter specifications for every booklet edition, kept in one place.
+
+  BOOKLET   st.py    School_Lighting_Booklet_FULL.docx
+  MERGED    st2.py   School_Lighting_Booklet_Merged.docx
+  FINAL     file.py  School_Lighting_Booklet_FINAL.docx
+  OVERVIEW  file2.py School_Lighting_Booklet.docx
+
+Each edition keeps the ranges, anchors and wording it was published with, so
+the numbers still differ between editions where the source documents do.
+Every spec carries an "id" that is shared across editions:
+  cct, cri, flicker, ugr, uniformity, medi, ev, exposure, eh
+
+A spec's curve is a benefit (higher is better) unless it says
+"direction": "risk": the BOOKLET and MERGED flicker and glare curves plot
+adverse-effect and discomfort probability, so higher is worse there.
+
+Dense curves and band edges are not computed here: registry.py compiles them
+once from these specs and caches the result as a flat float64 .npy file
+(memory-mapped on load) plus a .json index of the array offsets.
+"""
+
+INPUT_UPLOADED_DOCX = "/mnt/data/Schools information.docx"  # path to your uploaded docx
+
+EDITIONS = ("booklet", "merged", "final", "overview")
+
+# -----------------------------------------------------------------------------
+# BOOKLET (st.py)
+#    Each entry defines:
+#      - x-range (min, max)
+#      - safe/caution/danger bands
+#      - anchor points -> interpolated biological curve
+#      - labels and references (title + url)
+# -----------------------------------------------------------------------------
+
+BOOKLET = [
+    # 1) CCT
+    {
+        "id": "cct",
+        "title": "CCT (Correlated Color Temperature, K)",
+        "xspan": (2000, 7000),
+        "bands": { "good": (4000, 5000), "warn": (3000, 6500), "danger": (2000, 7000) },
+        # Biological proxy: daytime alerting potential / melatonin suppression tendency (relative %)
+        # Anchors inspired by lab studies showing higher arousal with cooler CCT in day.
+        "anchors": {
+            "x":  [2000, 2700, 3000, 3500, 4000, 5000, 6500, 7000],
+            "y":  [10,   18,   25,   45,   65,   70,   60,   55],  # %
+        },
+        "y_label": "Estimated Alerting Potential (%)",
+        "x_label": "CCT (Kelvin)",
+        "notes": (
+            "Daytime 4000–5000 K generally supports alertness and visual comfort; "
+            "short task-specific use of 6500 K may boost performance but can increase discomfort if overused."
+        ),
+        "refs": [
+            ("EN 12464-1 overview (indoor workplaces: illuminance, UGR, CRI)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            ("Park et al., 2015: CCT, EEG & task performance", "https://pmc.ncbi.nlm.nih.gov/articles/PMC4668153/"),
+            ("Chen et al., 2022: CCT × illuminance effects", "https://www.mdpi.com/1996-1073/15/12/4477"),
+        ],
+        "markers": [
+            (4000, "Typical classroom"),
+            (5000, "Upper preferred")
+        ],
+    },
+
+    # 2) CRI
+    {
+        "id": "cri",
+        "title": "CRI (Color Rendering Index, Ra)",
+        "xspan": (60, 100),
+        "bands": { "good": (80, 100), "warn": (70, 80), "danger": (60, 100) },
+        # Biological/visual performance proxy (% correct color/visual recognition)
+        "anchors": {
+            "x": [60, 70, 75, 80, 85, 90, 95, 100],
+            "y": [50, 60, 70, 82, 90, 96, 99, 100],  # %
+        },
+        "y_label": "Visual Color Fidelity / Recognition (%)",
+        "x_label": "CRI (Ra)",
+        "notes": "CRI ≥80 is generally recommended for classrooms; ≥90 for art/graphics where color evaluation matters.",
+        "refs": [
+            ("EN 12464-1 overview (Ra requirements)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+        ],
+        "markers": [
+            (80, "Baseline classroom"),
+            (90, "Art / graphics")
+        ],
+    },
+
+    # 3) Flicker
+    {
+        "id": "flicker",
+        "title": "Flicker (Percent Modulation, typical LED)",
+        "xspan": (0, 50),
+        "bands": { "good": (0, 5), "warn": (5, 20), "danger": (0, 50) },
+        # Biological risk proxy: headache/eyestrain risk index (%) – increases with modulation depth
+        "anchors": {
+            "x": [0, 2, 5, 10, 20, 30, 40, 50],
+            "y": [0, 5, 10, 25, 50, 70, 85, 95],  # %
+        },
+        "y_label": "Estimated Adverse Effect Risk (%)",
+        "direction": "risk",
+        "x_label": "Percent Flicker (%)",
+        "notes": "Keep percent flicker as low as practical (<5%). Avoid low-frequency PWM; follow IEEE 1789 guidance.",
+        "refs": [
+            ("IEEE 1789-2015: Flicker Recommended Practice (PDF)", "https://www.lisungroup.com/wp-content/uploads/2020/02/IEEE-2015-STANDARDS-1789-Standard-Free-Download.pdf"),
+            ("DOE/LightFair: Understanding IEEE Flicker Practice (PDF)", "https://www.energy.gov/sites/default/files/2022-11/ssl-miller-lehman_flicker_lightfair2015.pdf"),
+            ("Miller et al., 2022 review (PDF)", "https://www.energy.gov/sites/default/files/2022-08/ssl-miller-etal-2022-LRT-flicker-review-tlm-stimulus-response.pdf"),
+        ],
+        "markers": [
+            (5, "Preferred max"),
+            (20, "High risk")
+        ],
+    },
+
+    # 4) Glare (UGR)
+    {
+        "id": "ugr",
+        "title": "Glare (Unified Glare Rating, UGR)",
+        "xspan": (10, 30),
+        "bands": { "good": (10, 19), "warn": (19, 22), "danger": (10, 30) },
+        # Biological/comfort proxy: discomfort probability (%). Higher UGR -> higher discomfort.
+        "anchors": {
+            "x": [10, 13, 16, 19, 22, 25, 28, 30],
+            "y": [5, 8, 15, 30, 55, 75, 90, 95],  # %
+        },
+        "y_label": "Estimated Discomfort Probability (%)",
+        "direction": "risk",
+        "x_label": "UGR",
+        "notes": "Aim UGR <19 for classrooms; even lower (≈16–18) near screens/IBs to minimize discomfort and distraction.",
+        "refs": [
+            ("CIBSE Factfile: Importance of glare & calculating UGR (PDF)", "https://www.cibse.org/media/polbabib/factfile-15-the-importance-of-glare-and-calculating-ugr-jul2019.pdf"),
+            ("EN 12464-1 overview (UGR contexts)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+        ],
+        "markers": [
+            (19, "Classroom max"),
+            (16, "Screen work")
+        ],
+    },
+
+    # 5) Melanopic EDI
+    {
+        "id": "medi",
+        "title": "Melanopic EDI (melanopic lux at eye, vertical)",
+        "xspan": (0, 800),
+        "bands": { "good": (250, 500), "warn": (100, 250), "danger": (0, 800) },
+        # Biological effect: melatonin suppression (%) under daytime conditions (saturating response)
+        "anchors": {
+            "x": [0, 20, 50, 100, 250, 500, 800],
+            "y": [0, 5, 15, 35, 65, 80, 90],  # %
+        },
+        "y_label": "Estimated Melatonin Suppression (%)",
+        "x_label": "Melanopic EDI (lux)",
+        "notes": "Provide ≥250 melanopic EDI during the day for circadian entrainment and alertness (measured vertically at ~1.2 m).",
+        "refs": [
+            ("Brown et al., 2022 (PLOS Biology): Consensus recommendations", "https://journals.plos.org/plosbiology/article?id=10.1371/journal.pbio.3001571"),
+            ("Brown et al., 2022 (PMC)", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/"),
+            ("WELL v2 – Circadian Lighting context (Article)", "https://resources.wellcertified.com/articles/circadian-rhythms/"),
+        ],
+        "markers": [
+            (250, "Daytime target (min)"),
+            (500, "Robust daytime")
+        ],
+    },
+
+    # 6) Vertical Illuminance
+    {
+        "id": "ev",
+        "title": "Vertical Illuminance (lux at eye/face)",
+        "xspan": (50, 1000),
+        "bands": { "good": (300, 500), "warn": (200, 800), "danger": (50, 1000) },
+        # Biological effect: Circadian Stimulus (CS, 0-0.7+) proxy (increases with vertical lx; saturates)
+        "anchors": {
+            "x": [50, 100, 150, 300, 500, 800, 1000],
+            "y": [0.05, 0.12, 0.22, 0.40, 0.55, 0.65, 0.70],  # CS (unitless)
+        },
+        "y_label": "Circadian Stimulus (CS, unitless)",
+        "x_label": "Vertical Illuminance (lux)",
+        "notes": "Aim ~300–500 lx vertical on faces/eye for daytime non-visual benefits; much lower levels are advisable in evening school events.",
+        "refs": [
+            ("EN 12464-1 overview; vertical/ambient aspects", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            ("WELL v2 circadian context (Article)", "https://resources.wellcertified.com/articles/circadian-rhythms/"),
+        ],
+        "markers": [
+            (300, "Daytime min"),
+            (500, "Strong CS")
+        ],
+    },
+
+    # 7) Exposure Duration
+    {
+        "id": "exposure",
+        "title": "Exposure Duration (hours of daytime light meeting target)",
+        "xspan": (0, 8),
+        "bands": { "good": (2, 4), "warn": (1, 6), "danger": (0, 8) },
+        # Biological effect: cumulative melatonin suppression (%) at moderate melanopic stimulus
+        "anchors": {
+            "x": [0, 0.5, 1, 2, 3, 4, 6, 8],
+            "y": [0, 10, 20, 40, 60, 75, 90, 95],  # %
+        },
+        "y_label": "Estimated Cumulative Melatonin Suppression (%)",
+        "x_label": "Exposure Duration (hours)",
+        "notes": "Sustained daytime exposure (~2–4 h at adequate spectrum/levels) supports alertness and entrainment; avoid excessive high-intensity late-day exposure.",
+        "refs": [
+            ("Brown et al., 2022 (PMC): Day vs evening guidance", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/"),
+        ],
+        "markers": [
+            (2, "Effective"),
+            (4, "Robust")
+        ],
+    },
+
+    # 8) Horizontal Illuminance
+    {
+        "id": "eh",
+        "title": "Horizontal Illuminance (desk/task, lux)",
+        "xspan": (100, 1500),
+        "bands": { "good": (300, 500), "warn": (200, 1000), "danger": (100, 1500) },
+        # Biological/visual performance: % task speed/accuracy vs lx (saturating)
+        "anchors": {
+            "x": [100, 200, 300, 500, 750, 1000, 1500],
+            "y": [60, 75, 85, 95, 98, 99, 99],  # %
+        },
+        "y_label": "Visual Task Performance (%)",
+        "x_label": "Horizontal Illuminance (lux)",
+        "notes": "Provide 300–500 lx at desks for general classrooms; 500–750+ lx for labs/graphics. Short-term 800–1000 lx can be used for exam focus.",
+        "refs": [
+            ("EN 12464-1 overview (classroom/task lx)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            ("MDPI (2025) review referencing EN 12464-1 classroom levels", "https://www.mdpi.com/2075-5309/15/8/1233"),
+        ],
+        "markers": [
+            (300, "General min"),
+            (500, "Classroom target"),
+            (750, "Lab/graphics")
+        ],
+    },
+]
+
+# -----------------------------------------------------------------------------
+# MERGED (st2.py): anchors are literature-anchored approximations
+#    Each parameter: title, xspan, bands (good, warn, danger), anchors_x, anchors_y,
+#    x_label, y_label, notes, refs, markers
+# -----------------------------------------------------------------------------
+
+MERGED = [
+    {
+        "id": "cct",
+        "title": "CCT (Correlated Color Temperature, K)",
+        "xspan": (2000, 7000),
+        "bands": {"good": (4000, 5000), "warn": (3000, 6500), "danger": (2000, 7000)},
+        "anchors_x": [2000, 2700, 3000, 3500, 4000, 5000, 6500, 7000],
+        "anchors_y": [8, 15, 25, 45, 65, 75, 60, 55],   # alerting potential (% relative)
+        "x_label": "CCT (K)",
+        "y_label": "Estimated Alerting Potential (%)",
+        "notes": "Higher CCT (bluer light) tends to increase alertness and cognitive stimulation during daytime; warmer CCT supports calmness and relaxation.",
+        "refs": [
+            ("Park et al., 2015 (PMC)", "https://pmc.ncbi.nlm.nih.gov/articles/PMC4668153/"),
+            ("Mott et al., classroom focus literature", "https://journals.sagepub.com/doi/abs/10.1177/1477153512446099"),
+            ("User uploaded study (Schools information.docx) - CCT tests at 2500K,3000K,4000K,5000K,6500K", INPUT_UPLOADED_DOCX)
+        ],
+        "markers": [(5000, "5000K - observed optimum"), (6500, "6500K - high alertness")]
+    },
+
+    {
+        "id": "cri",
+        "title": "CRI (Color Rendering Index, Ra)",
+        "xspan": (60, 100),
+        "bands": {"good": (80, 100), "warn": (70, 80), "danger": (60, 100)},
+        "anchors_x": [60, 70, 75, 80, 85, 90, 95, 100],
+        "anchors_y": [50, 60, 72, 82, 90, 96, 99, 100],   # visual color fidelity percent
+        "x_label": "CRI (Ra)",
+        "y_label": "Visual Color Fidelity / Recognition (%)",
+        "notes": "Higher CRI improves color recognition and visual comfort; CRI is typically kept high in classrooms for accurate color tasks.",
+        "refs": [
+            ("EN 12464 standard (CRI guidance)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            (INPUT_UPLOADED_DOCX, "User uploaded study: CRI mentioned in docx (high CRI noted)")
+        ],
+        "markers": [(80, "CRI 80 baseline"), (90, "CRI 90 art/graphics")]
+    },
+
+    {
+        "id": "flicker",
+        "title": "Flicker (Percent modulation)",
+        "xspan": (0, 50),
+        "bands": {"good": (0, 5), "warn": (5, 20), "danger": (0, 50)},
+        "anchors_x": [0, 2, 5, 10, 20, 30, 40, 50],
+        "anchors_y": [0, 3, 8, 20, 45, 70, 85, 95],   # adverse effect risk %
+        "x_label": "Percent Flicker (%)",
+        "y_label": "Estimated Adverse Effect Risk (%)",
+        "direction": "risk",
+        "notes": "Unnoticeable high-frequency flicker still can impact sensitive individuals; keep flicker as low as possible (IEEE 1789 guidance).",
+        "refs": [
+            ("IEEE 1789 recommended practice", "https://www.lisungroup.com/wp-content/uploads/2020/02/IEEE-2015-STANDARDS-1789-Standard-Free-Download.pdf"),
+            ("User uploaded study (Schools information.docx) noted ~100Hz fluorescent flicker in many classrooms", INPUT_UPLOADED_DOCX)
+        ],
+        "markers": [(5, "Preferred <5%"), (20, "High risk >20%")]
+    },
+
+    {
+        "id": "ugr",
+        "title": "Glare (Unified Glare Rating UGR)",
+        "xspan": (10, 30),
+        "bands": {"good": (10, 19), "warn": (19, 22), "danger": (10, 30)},
+        "anchors_x": [10, 13, 16, 19, 22, 25, 28, 30],
+        "anchors_y": [5, 8, 15, 30, 55, 80, 92, 96],   # discomfort %
+        "x_label": "UGR",
+        "y_label": "Estimated Discomfort Probability (%)",
+        "direction": "risk",
+        "notes": "High glare leads to eye strain and distraction; control luminaire placement and reflections to keep UGR low in classrooms.",
+        "refs": [
+            ("CIBSE guidance on UGR", "https://www.cibse.org/"),
+            (INPUT_UPLOADED_DOCX, "User file: glare noted as a negative factor")
+        ],
+        "markers": [(19, "UGR 19 classroom max")]
+    },
+
+    {
+        "id": "uniformity",
+        "title": "Uniformity (Emin / Eavg)",
+        "xspan": (0.1, 1.0),
+        "bands": {"good": (0.6, 1.0), "warn": (0.4, 0.59), "danger": (0.1, 1.0)},
+        "anchors_x": [0.1, 0.2, 0.3, 0.45, 0.6, 0.75, 0.9, 1.0],
+        "anchors_y": [40, 55, 70, 82, 92, 96, 98, 99],   # performance index %
+        "x_label": "Uniformity (Emin / Eavg)",
+        "y_label": "Task Performance Index (%)",
+        "notes": "Higher uniformity reduces local visual contrast and improves even task performance across the room.",
+        "refs": [
+            ("EN 12464-1 uniformity recommendations", "https://www.performanceinlighting.com/mo/en/en-12464-1")
+        ],
+        "markers": [(0.6, "Recommended ≥0.6")]
+    },
+
+    {
+        "id": "medi",
+        "title": "Melanopic EDI (melanopic lux at eye)",
+        "xspan": (0, 800),
+        "bands": {"good": (250, 500), "warn": (100, 250), "danger": (0, 800)},
+        "anchors_x": [0, 20, 50, 100, 250, 500, 800],
+        "anchors_y": [0, 5, 15, 35, 65, 80, 90],   # melatonin suppression %
+        "x_label": "Melanopic EDI (lux)",
+        "y_label": "Estimated Melatonin Suppression (%)",
+        "notes": "Melanopic EDI of ~250 lux or higher in daytime supports circadian entrainment and alertness (Brown et al., 2022 consensus).",
+        "refs": [
+            ("Brown et al., 2022 consensus (PLOS Biology)", "https://journals.plos.org/plosbiology/article?id=10.1371/journal.pbio.3001571"),
+            (INPUT_UPLOADED_DOCX, "User file: referenced melanopic / circadian impacts in literature review")
+        ],
+        "markers": [(250, "250 mEDI recommended min"), (500, "Strong daytime level")]
+    },
+
+    {
+        "id": "ev",
+        "title": "Vertical Illuminance (lux at eye/face)",
+        "xspan": (50, 1000),
+        "bands": {"good": (300, 500), "warn": (200, 800), "danger": (50, 1000)},
+        "anchors_x": [50, 100, 150, 300, 500, 800, 1000],
+        "anchors_y": [0.05, 0.12, 0.22, 0.40, 0.55, 0.65, 0.68],   # circadian stimulus (CS) approximate
+        "x_label": "Vertical Illuminance (lux)",
+        "y_label": "Circadian Stimulus (CS, approx.)",
+        "notes": "Vertical lux is crucial for non-visual responses; measure at eye/face level for circadian effect estimates.",
+        "refs": [
+            ("EN 12464-1 and WELL references on vertical illumination", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            (INPUT_UPLOADED_DOCX, "User file: some studies included vertical illuminance ranges (350-1000) in literature")
+        ],
+        "markers": [(300, "300 lux target"), (500, "500 lux strong")]
+    },
+
+    {
+        "id": "exposure",
+        "title": "Exposure Duration (hours of daytime light at target levels)",
+        "xspan": (0, 8),
+        "bands": {"good": (2, 4), "warn": (1, 6), "danger": (0, 8)},
+        "anchors_x": [0, 0.5, 1, 2, 3, 4, 6, 8],
+        "anchors_y": [0, 10, 20, 40, 60, 75, 90, 95],   # cumulative melatonin suppression %
+        "x_label": "Exposure Duration (hours)",
+        "y_label": "Estimated Cumulative Melatonin Suppression (%)",
+        "notes": "Sustained daytime exposure (~2–4 h at adequate EDI) supports entrainment. Short or irregular exposure is less effective.",
+        "refs": [
+            ("Brown et al., 2022 consensus; circadian exposure guidance", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/"),
+            (INPUT_UPLOADED_DOCX, "User file: exposure duration context in literature review")
+        ],
+        "markers": [(2, "2 h effective"), (4, "4 h robust")]
+    },
+
+    {
+        "id": "eh",
+        "title": "Horizontal Illuminance (desk/task lux)",
+        "xspan": (100, 1500),
+        "bands": {"good": (300, 500), "warn": (200, 1000), "danger": (100, 1500)},
+        "anchors_x": [100, 200, 300, 500, 750, 1000, 1500],
+        "anchors_y": [60, 75, 85, 95, 98, 99, 99],   # visual performance %
+        "x_label": "Horizontal Illuminance (lux)",
+        "y_label": "Visual Task Performance (%)",
+        "notes": "300–500 lx on desk level is typical for classrooms; exams/labs may use short-term higher levels (≥750 lx).",
+        "refs": [
+            ("EN 12464-1 classroom illuminance (desk level)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            (INPUT_UPLOADED_DOCX, "User file: tested 275, 475, 613 lux and reported alertness increases")
+        ],
+        "markers": [(300, "300 lx baseline"), (500, "500 lx target"), (1000, "1000 lx focus/exam")]
+    }
+]
+
+# -----------------------------------------------------------------------------
+# FINAL (file.py): ranges, curve types, and references
+#    NOTE: Ranges reflect trusted sources cited in each entry
+# -----------------------------------------------------------------------------
+
+FINAL = [
+    {
+        "id": "cct",
+        "name": "CCT (Correlated Color Temperature, K)",
+        "span": (2000, 8000),
+        "good": (4000, 5000),
+        "warn": (3000, 6500),
+        "danger": (2000, 8000),
+        "curve": "gaussian",     # benefit rises toward mid (balanced) then falls
+        "curve_center": 0.54,    # slightly toward cooler end (within 2k..8k)
+        "xlabel": "CCT (K)",
+        "effect": (
+            "Balanced 4000–5000 K supports alertness and visual comfort for classrooms. "
+            "Too warm (<3000 K) can promote sleepiness; too cool (>6500 K) may increase discomfort/glare. "
+            "Short, task-specific boosts at 6500 K/1000 lx can improve reading fluency during tests."
+        ),
+        "refs": [
+            ("EN 12464-1: Indoor work lighting (general targets)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            ("Mott et al., 2012: High CCT/illuminance improved reading fluency", "https://journals.sagepub.com/doi/abs/10.1177/1477153512446099"),
+            ("Sleegers et al., 2013: Dynamic lighting and concentration", "https://journals.sagepub.com/doi/abs/10.1177/1477153512446099"),
+            ("Park et al., 2015: CCT, EEG & task performance", "https://pmc.ncbi.nlm.nih.gov/articles/PMC4668153/"),
+            ("Chen et al., 2022: CCT × illuminance responses", "https://www.mdpi.com/1996-1073/15/12/4477")
+        ]
+    },
+    {
+        "id": "cri",
+        "name": "CRI (Color Rendering Index, Ra)",
+        "span": (50, 100),
+        "good": (80, 100),
+        "warn": (70, 80),
+        "danger": (50, 100),
+        "curve": "gaussian",
+        "curve_center": 0.95,
+        "xlabel": "CRI (Ra)",
+        "effect": (
+            "CRI ≥80 supports natural color appearance and reduces visual fatigue. "
+            "Art/graphics benefit from CRI ≥90. Very low CRI (<70) hampers color discrimination and comfort."
+        ),
+        "refs": [
+            ("EN 12464-1: Ra ≥80 typical; ≥90 for demanding color tasks", "https://www.performanceinlighting.com/mo/en/en-12464-1")
+        ]
+    },
+    {
+        "id": "flicker",
+        "name": "Flicker (% modulation at typical LED driving frequencies)",
+        "span": (0, 50),
+        "good": (0, 5),
+        "warn": (5, 20),
+        "danger": (0, 50),
+        "curve": "descending",
+        "xlabel": "Percent Flicker (%)",
+        "effect": (
+            "Keep percent flicker <5% to minimize headaches, eyestrain, and distraction. "
+            "Between 5–20% some occupants are affected; >20% increases adverse effects. "
+            "Use high-frequency drivers and avoid PWM at low frequencies per IEEE 1789."
+        ),
+        "refs": [
+            ("IEEE 1789-2015: Flicker recommended practice", "https://www.lisungroup.com/wp-content/uploads/2020/02/IEEE-2015-STANDARDS-1789-Standard-Free-Download.pdf"),
+            ("DOE/LightFair deck: factors increasing risk", "https://www.energy.gov/sites/default/files/2022-11/ssl-miller-lehman_flicker_lightfair2015.pdf"),
+            ("DIAL explainer on IEEE 1789 terms", "https://www.dial.de/en-GB/articles/ieee-1789-a-new-standard-for-evaluating-flickering-leds")
+        ]
+    },
+    {
+        "id": "ugr",
+        "name": "Glare (UGR)",
+        "span": (10, 30),
+        "good": (10, 19),
+        "warn": (19, 22),
+        "danger": (10, 30),
+        "curve": "descending",
+        "xlabel": "UGR",
+        "effect": (
+            "UGR <19 recommended for classrooms to avoid discomfort and maintain performance. "
+            "Aim lower (≈16–18) near screens/interactive boards."
+        ),
+        "refs": [
+            ("EN 12464-1: UGR targets for tasks", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            ("CIBSE Factfile: importance of UGR", "https://www.cibse.org/media/polbabib/factfile-15-the-importance-of-glare-and-calculating-ugr-jul2019.pdf")
+        ]
+    },
+    {
+        "id": "medi",
+        "name": "Melanopic EDI (lux at eye, vertical)",
+        "span": (0, 800),
+        "good": (250, 500),
+        "warn": (100, 250),
+        "danger": (0, 800),
+        "curve": "gaussian",
+        "curve_center": 0.45,
+        "xlabel": "Melanopic EDI (lux)",
+        "effect": (
+            "Daytime ≥250 melanopic EDI at eye supports circadian entrainment and alertness "
+            "(measure at ≈1.2 m seated, vertical). Evening levels should be much lower."
+        ),
+        "refs": [
+            ("Global consensus (Brown et al., 2022): daytime ≥250 mEDI", "https://journals.plos.org/plosbiology/article?id=10.1371/journal.pbio.3001571"),
+            ("PMC version", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/"),
+            ("WELL v2 L03 circadian targets (EML/mEDI)", "https://standard.wellcertified.com/light/circadian-lighting-design")
+        ]
+    },
+    {
+        "id": "ev",
+        "name": "Vertical Illuminance (lux at eye/face)",
+        "span": (50, 1000),
+        "good": (300, 500),
+        "warn": (200, 800),
+        "danger": (50, 1000),
+        "curve": "gaussian",
+        "curve_center": 0.45,
+        "xlabel": "Vertical Illuminance (lux)",
+        "effect": (
+            "Adequate vertical illuminance improves visibility of faces/boards and supports non-visual effects. "
+            "Keep roughly 300–500 lx on faces in learning spaces; avoid very low or very high values."
+        ),
+        "refs": [
+            ("EN 12464-1: room surface/vertical illuminance guidance", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            ("CIBSE LG5/education guidance (context)", "https://www.cibse.org/knowledge-research/knowledge-portal/lg7-lighting-for-offices-2023")
+        ]
+    },
+    {
+        "id": "exposure",
+        "name": "Exposure Duration (hours of daytime light meeting targets)",
+        "span": (0, 12),
+        "good": (3, 6),
+        "warn": (1, 8),
+        "danger": (0, 12),
+        "curve": "gaussian",
+        "curve_center": 0.45,
+        "xlabel": "Hours per school day",
+        "effect": (
+            "Sustained exposure (≈3–6 h) to target illuminance/spectrum during the school day supports alertness "
+            "and entrainment; very little or excessive high-intensity exposure is less beneficial."
+        ),
+        "refs": [
+            ("Consensus guidance on daytime vs evening exposure (Brown et al., 2022)", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/")
+        ]
+    },
+    {
+        "id": "eh",
+        "name": "Horizontal Illuminance (desk, lux)",
+        "span": (100, 1500),
+        "good": (300, 500),
+        "warn": (200, 1000),
+        "danger": (100, 1500),
+        "curve": "gaussian",
+        "curve_center": 0.40,
+        "xlabel": "Horizontal Illuminance (lux)",
+        "effect": (
+            "Provide 300–500 lx at desks for most classroom tasks; 500–750+ lx for labs/graphics. "
+            "Higher levels (≈1000 lx) may be used short-term for exams/focus sessions."
+        ),
+        "refs": [
+            ("EN 12464-1: classroom/task illuminance", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+            ("Mott/Sleegers: high-lx focus settings evidence", "https://journals.sagepub.com/doi/abs/10.1177/1477153512446099")
+        ]
+    }
+]
+
+# -----------------------------------------------------------------------------
+# OVERVIEW (file2.py): real values summarized from CIE, WELL, IES standards
+#    Keyed by section heading; x/y are the plotted points themselves
+# -----------------------------------------------------------------------------
+
+OVERVIEW = {
+    "CCT (Color Temperature)": {
+        "id": "cct",
+        "x": [2700, 3000, 3500, 4000, 5000, 6500],
+        "y": [3, 4, 6, 8, 7, 5],  # Effect on alertness/concentration (1=poor, 10=excellent)
+        "acceptable": (3500, 5000),
+        "explanation": "Cooler CCT (4000–5000K) improves alertness and concentration in classrooms, while too warm (<3000K) reduces focus. Very high (>6500K) can cause visual discomfort.",
+        "reference": "CIE S 026/E:2018; Figueiro & Rea 2010, Lighting Research & Technology"
+    },
+    "CRI (Color Rendering Index)": {
+        "id": "cri",
+        "x": [70, 75, 80, 85, 90, 95, 100],
+        "y": [3, 4, 6, 7, 9, 10, 10],  # Quality of color perception
+        "acceptable": (80, 100),
+        "explanation": "Higher CRI (>90) ensures natural color perception, reduces eye strain, and supports accurate visual tasks in classrooms.",
+        "reference": "IES Lighting Handbook, 10th Edition; CIE 13.3-1995"
+    },
+    "Flicker": {
+        "id": "flicker",
+        "x": [0, 5, 10, 20, 30, 50, 100],
+        "y": [10, 9, 7, 5, 3, 2, 1],  # Comfort/health rating (higher = better)
+        "acceptable": (0, 10),  # Percent flicker
+        "explanation": "High flicker (>20%) is linked to headaches, eyestrain, and reduced reading performance in children.",
+        "reference": "IEEE Std 1789-2015; Wilkins et al., Brain (1989)"
+    },
+    "Glare (UGR)": {
+        "id": "ugr",
+        "x": [10, 13, 16, 19, 22, 25, 28],
+        "y": [10, 9, 7, 5, 3, 2, 1],  # Comfort scale
+        "acceptable": (16, 19),  # Classroom recommendation
+        "explanation": "UGR above 22 causes visual discomfort and reduced attention. UGR <19 is recommended for classrooms.",
+        "reference": "EN 12464-1:2021 Lighting of Workplaces"
+    },
+    "Melanopic EDI": {
+        "id": "medi",
+        "x": [100, 150, 200, 250, 300, 350, 400],
+        "y": [3, 5, 7, 9, 10, 9, 7],  # Effect on circadian rhythm alignment
+        "acceptable": (200, 350),
+        "explanation": "Melanopic Equivalent Daylight Illuminance (EDI) ≥ 200 lux in morning hours supports circadian entrainment and improves alertness.",
+        "reference": "CIE S 026/E:2018; Lucas et al., NPJ Biological Rhythms (2014)"
+    },
+    "Vertical Illuminance": {
+        "id": "ev",
+        "x": [100, 150, 200, 300, 500, 1000],
+        "y": [2, 5, 7, 9, 10, 8],  # Support for visual tasks & circadian effect
+        "acceptable": (300, 500),
+        "explanation": "Vertical illuminance at the eye ensures proper non-visual stimulation. 300–500 lux is ideal in classrooms.",
+        "reference": "WELL Building Standard v2; CIE S 026/E:2018"
+    },
+    "Exposure Duration": {
+        "id": "exposure",
+        "x": [0.5, 1, 2, 3, 4, 6, 8],  # hours
+        "y": [2, 4, 7, 9, 10, 8, 6],  # Learning benefit scale
+        "acceptable": (2, 4),  # Daily exposure
+        "explanation": "2–4 hours of exposure to proper lighting is beneficial for children’s circadian rhythm and sustained focus.",
+        "reference": "Gooley et al., J. Clin. Endocrinol. Metab. (2011); CIE 2018"
+    },
+    "Lux (Horizontal Illuminance)": {
+        "id": "eh",
+        "x": [100, 200, 300, 500, 750, 1000],
+        "y": [2, 4, 6, 9, 10, 9],  # Reading & task performance
+        "acceptable": (300, 500),
+        "explanation": "300–500 lux at desk level improves reading speed, comprehension, and reduces eye strain. Too low (<200) impairs visual performance.",
+        "reference": "EN 12464-1:2021; IESNA Handbook"
+    }
+}
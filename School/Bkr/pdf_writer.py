@@ -0,0 +1,623 @@
+# -*- coding: utf-8 -*-
+"""
+PDF writer with the slice of the python-docx API the booklet builders use:
+
+  doc = PdfDocument()
+  doc.add_heading("Title", 0)
+  p = doc.add_paragraph("Body text", style="List Bullet")
+  p.add_run(" more").bold = True
+  doc.add_picture(io.BytesIO(pdf_or_png), width=Inches(6.0))
+  doc.add_page_break()
+  doc.save("out.pdf")
+
+The builders (st.py, st2.py, file.py) take --backend pdf to write their
+booklet with it instead of a DOCX: the same headings and paragraphs, laid
+out on A4 pages, with every chapter figure rendered by matplotlib as a
+one-page vector PDF (figures.fig_to_pdf) and embedded as a form XObject, so
+charts stay vector and no office suite is needed to get a PDF.
+
+Text uses the standard PDF fonts (Helvetica and its bold/oblique faces, in
+WinAnsiEncoding), which every viewer has and which are never embedded. Line
+breaking uses their metrics from the AFM files that ship with matplotlib, so
+nothing is downloaded. Characters outside WinAnsi come from the Symbol font
+when it has them (≤ ≥ ≈ ...), otherwise from their compatibility
+decomposition (subscript 2 -> 2), otherwise "?".
+
+Like docx_stream.StreamingDocument, each element is laid out once the next
+one is added (only the most recent paragraph stays editable) and each page
+is compressed and spooled as soon as it is full, so memory stays flat.
+
+What is not supported: tables, sections, headers (pages get a centred page
+number), hyperlinks, outlines, and editing anything but the last element.
+
+Requirements:
+  pip install matplotlib pillow   (AFM metrics; pillow only for PNG pictures)
+"""
+
+import io
+import os
+import re
+import zlib
+import hashlib
+import tempfile
+import functools
+import unicodedata
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89  # A4 in points
+MARGIN = 56.7                              # 2 cm all round
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+EMU_PER_PT = 12700                         # python-docx lengths (Inches(6.0)) are EMU
+_SPOOL_BYTES = 8 << 20
+
+# Font resource name -> (AFM file in matplotlib's mpl-data/fonts/afm, PostScript name)
+FONTS = {
+    "F1": ("phvr8a.afm", "Helvetica"),
+    "F2": ("phvb8a.afm", "Helvetica-Bold"),
+    "F3": ("phvro8a.afm", "Helvetica-Oblique"),
+    "F4": ("phvbo8a.afm", "Helvetica-BoldOblique"),
+    "F5": ("psyr.afm", "Symbol"),
+}
+SYMBOL = "F5"
+
+# Paragraph styles, by lower-cased python-docx style name. Sizes in points;
+# colours are the default DOCX template's, so both backends look alike.
+STYLES = {
+    "normal":      dict(size=10.5, leading=13.5, before=0, after=6, bold=False, color=None),
+    "list bullet": dict(size=10.5, leading=13.5, before=0, after=3, bold=False, color=None, indent=18),
+    "title":       dict(size=24, leading=29, before=0, after=14, bold=False, color=(0.09, 0.21, 0.36), rule=True),
+    "heading 1":   dict(size=15, leading=19, before=18, after=6, bold=True, color=(0.21, 0.37, 0.57)),
+    "heading 2":   dict(size=12.5, leading=16, before=12, after=4, bold=True, color=(0.31, 0.51, 0.74)),
+    "heading 3":   dict(size=11, leading=14, before=10, after=3, bold=True, color=(0.31, 0.51, 0.74)),
+}
+KEEP_WITH_NEXT = 3  # lines of body text a heading must have room for below it
+
+
+# -----------------------------------------------------------------------------
+# Font metrics and encoding
+# -----------------------------------------------------------------------------
+def _afm_widths(filename):
+    """(glyph name -> width, code -> width) in 1/1000 em from one of matplotlib's AFM files."""
+    import matplotlib
+    path = os.path.join(matplotlib.get_data_path(), "fonts", "afm", filename)
+    by_name, by_code = {}, {}
+    with open(path, "rb") as fh:
+        for line in fh:
+            if not line.startswith(b"C "):
+                continue
+            fields = dict(f.strip().split(b" ", 1) for f in line.split(b";") if f.strip())
+            width, name = float(fields[b"WX"]), fields[b"N"].decode("ascii")
+            by_name[name] = width
+            code = int(fields[b"C"])
+            if code >= 0:
+                by_code[code] = width
+    return by_name, by_code
+
+
+@functools.lru_cache(maxsize=None)
+def _metrics():
+    """font name -> 256 byte widths (1/1000 em), plus Symbol's char -> byte map; read once per process."""
+    from fontTools.agl import UV2AGL
+
+    widths = {}
+    for key, (afm, _) in FONTS.items():
+        by_name, by_code = _afm_widths(afm)
+        if key == SYMBOL:
+            # Symbol has its own built-in encoding: the AFM codes are the byte values
+            widths[key] = [by_code.get(b, 0.0) for b in range(256)]
+            continue
+        space = by_name["space"]
+        table = []
+        for b in range(256):
+            try:
+                ch = bytes([b]).decode("cp1252")
+            except UnicodeDecodeError:
+                table.append(space)
+                continue
+            table.append(by_name.get(UV2AGL.get(ord(ch), ""), space))
+        widths[key] = table
+    return widths, _symbol_map()
+
+
+@functools.lru_cache(maxsize=None)
+def _symbol_map():
+    """Unicode character -> byte in the Symbol font's built-in encoding."""
+    import matplotlib
+    from fontTools.agl import AGL2UV
+    path = os.path.join(matplotlib.get_data_path(), "fonts", "afm", FONTS[SYMBOL][0])
+    out = {}
+    with open(path, "rb") as fh:
+        for m in re.finditer(rb"^C (\d+) ;.*? N (\w+) ;", fh.read(), re.M):
+            name = m.group(2).decode("ascii")
+            if name in AGL2UV:
+                out.setdefault(chr(AGL2UV[name]), int(m.group(1)))
+    return out
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode(text, font):
+    """Split text into [(font, bytes)] runs: WinAnsi in font, Symbol for what WinAnsi lacks."""
+    symbols = _metrics()[1]
+    out = []
+    for ch in text:
+        if ch == "\t":
+            ch = "    "
+        try:
+            piece = (font, ch.encode("cp1252"))
+        except UnicodeEncodeError:
+            if ch in symbols:
+                piece = (SYMBOL, bytes([symbols[ch]]))
+            else:
+                plain = "".join(c for c in unicodedata.normalize("NFKD", ch) if not unicodedata.combining(c))
+                piece = (font, plain.encode("cp1252", "replace") if plain else b"?")
+        if out and out[-1][0] == piece[0]:
+            out[-1] = (piece[0], out[-1][1] + piece[1])
+        else:
+            out.append(piece)
+    return tuple(out)
+
+
+def _width(pieces, size):
+    widths = _metrics()[0]
+    return sum(widths[font][b] for font, data in pieces for b in data) * size / 1000.0
+
+
+def _literal(data):
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"\\r") + b")"
+
+
+def _num(x, digits=2):
+    return f"{x:.{digits}f}".rstrip("0").rstrip(".")
+
+
+def _text_string(text):
+    """A PDF text string (UTF-16BE with BOM) for the document information dictionary."""
+    return "<FEFF" + text.encode("utf-16-be").hex().upper() + ">"
+
+
+# -----------------------------------------------------------------------------
+# Importing a one-page PDF (matplotlib's output) as a form XObject
+# -----------------------------------------------------------------------------
+_REF = re.compile(rb"(\d+)\s+(\d+)\s+R\b")
+
+
+def _dict_end(data, pos):
+    """Index just past the dictionary starting at data[pos] ('<<'), skipping strings."""
+    depth, i = 0, pos
+    while i < len(data):
+        c = data[i:i + 1]
+        if data.startswith(b"<<", i):
+            depth, i = depth + 1, i + 2
+            continue
+        if data.startswith(b">>", i):
+            depth, i = depth - 1, i + 2
+            if depth == 0:
+                return i
+            continue
+        if c == b"(":  # literal string, possibly with nested/escaped parentheses
+            nest, i = 1, i + 1
+            while nest:
+                if data[i:i + 1] == b"\\":
+                    i += 1
+                elif data[i:i + 1] == b"(":
+                    nest += 1
+                elif data[i:i + 1] == b")":
+                    nest -= 1
+                i += 1
+            continue
+        if c == b"<":  # hex string
+            i = data.index(b">", i) + 1
+            continue
+        i += 1
+    raise ValueError("unterminated dictionary")
+
+
+class _SourcePdf:
+    """Objects of a PDF with a classic xref table, read on demand."""
+
+    def __init__(self, data):
+        self.data = data
+        start = int(data[data.rindex(b"startxref") + 9:].split()[0])
+        self.offsets = {}
+        m = re.compile(rb"xref\s+").match(data, start)
+        if m is None:
+            raise ValueError("only PDFs with an xref table can be embedded")
+        pos = m.end()
+        while True:
+            head = re.compile(rb"(\d+) (\d+)\s*\r?\n").match(data, pos)
+            if head is None:
+                break
+            first, count = int(head.group(1)), int(head.group(2))
+            pos = head.end()
+            for n in range(first, first + count):
+                entry = data[pos:pos + 20]
+                if entry[17:18] == b"n":
+                    self.offsets[n] = int(entry[:10])
+                pos += 20
+        trailer = data[data.index(b"trailer", pos):]
+        self.trailer = trailer[trailer.index(b"<<"):_dict_end(trailer, trailer.index(b"<<"))]
+
+    def get(self, num):
+        """(object text without the stream, stream bytes or None) for object num."""
+        data = self.data
+        m = re.compile(rb"\d+\s+\d+\s+obj\s*").match(data, self.offsets[num])
+        pos = m.end()
+        if not data.startswith(b"<<", pos):
+            return data[pos:data.index(b"endobj", pos)].strip(), None
+        end = _dict_end(data, pos)
+        head = data[pos:end]
+        s = re.compile(rb"\s*stream\r?\n").match(data, end)
+        if s is None:
+            return head, None
+        length = re.search(rb"/Length\s+(\d+)(\s+\d+\s+R)?", head)
+        n = int(self.get(int(length.group(1)))[0]) if length.group(2) else int(length.group(1))
+        return head, data[s.end():s.end() + n]
+
+    def value(self, text, key):
+        """The value of /key in a dictionary's text: a reference (int) or the raw text."""
+        m = re.search(rb"/" + key + rb"\s*(\d+\s+\d+\s+R|\[[^\]]*\]|<<)", text)
+        if m is None:
+            return None
+        if m.group(1) == b"<<":
+            return text[m.start(1):_dict_end(text, m.start(1))]
+        ref = _REF.fullmatch(m.group(1))
+        return int(ref.group(1)) if ref else m.group(1)
+
+    def resolve(self, value):
+        return self.get(value)[0] if isinstance(value, int) else value
+
+    def first_page(self):
+        pages = self.resolve(self.value(self.resolve(self.value(self.trailer, b"Root")), b"Pages"))
+        kids = self.value(pages, b"Kids")
+        return self.get(int(_REF.search(kids).group(1)))[0]
+
+
+# -----------------------------------------------------------------------------
+# Document elements (the last one added stays editable)
+# -----------------------------------------------------------------------------
+class PdfRun:
+    def __init__(self, text=""):
+        self.text = text
+        self.bold = None
+        self.italic = None
+
+
+class PdfParagraph:
+    def __init__(self, text="", style=None):
+        self.style = style
+        self.runs = []
+        if text:
+            self.add_run(text)
+
+    def add_run(self, text=""):
+        run = PdfRun(text)
+        self.runs.append(run)
+        return run
+
+    @property
+    def text(self):
+        return "".join(r.text for r in self.runs)
+
+
+class _PageBreak:
+    pass
+
+
+class PdfDocument:
+    """Write-through PDF with python-docx's add_heading/add_paragraph/add_picture/save."""
+
+    # figures.add_figure hands pictures straight to add_picture(), as for StreamingDocument
+    streaming = True
+
+    def __init__(self):
+        self._body = tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES)
+        self._body.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets = {}
+        self._next_id = 4  # 1 catalog, 2 page tree, 3 shared resources
+        self._pages = []
+        self._xobjects = {}  # name -> object id
+        self._forms = {}     # name -> (width, height) of a form XObject's own space; images draw in 1x1
+        self._pictures = {}  # sha1 of picture bytes -> (name, width pt, height pt)
+        self._pending = None
+        self._ops = None
+        self._y = None
+        self.title = None
+
+    # ---------- low-level objects ----------
+    def _alloc(self):
+        self._next_id += 1
+        return self._next_id - 1
+
+    def _write(self, num, body):
+        self._offsets[num] = self._body.tell()
+        self._body.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+    def _write_stream(self, num, entries, data):
+        self._write(num, b"<< " + entries + b" /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+
+    def _copy(self, src, num, seen):
+        """Copy object num of src (and everything it references) into this file; return the new id."""
+        if num in seen:
+            return seen[num]
+        new = seen[num] = self._alloc()
+        text, stream = src.get(num)
+        if stream is not None:
+            text = re.sub(rb"/Length\s+\d+(\s+\d+\s+R)?", b"", text)
+        text = _REF.sub(lambda m: b"%d 0 R" % self._copy(src, int(m.group(1)), seen), text)
+        if stream is None:
+            self._write(new, text)
+        else:
+            self._write_stream(new, text[2:-2].strip(), stream)
+        return new
+
+    def _import_pdf(self, data):
+        """Embed the first page of a PDF as a form XObject; return (id, width pt, height pt)."""
+        src = _SourcePdf(data)
+        page = src.first_page()
+        x0, y0, x1, y1 = (float(v) for v in src.resolve(src.value(page, b"MediaBox")).strip(b"[]").split())
+        seen = {}
+        resources = src.value(page, b"Resources")
+        resources = (b"%d 0 R" % self._copy(src, resources, seen) if isinstance(resources, int)
+                     else _REF.sub(lambda m: b"%d 0 R" % self._copy(src, int(m.group(1)), seen), resources or b"<< >>"))
+        contents = src.value(page, b"Contents")
+        refs = [contents] if isinstance(contents, int) else [int(m.group(1)) for m in _REF.finditer(contents)]
+        content = b""
+        for ref in refs:
+            head, stream = src.get(ref)
+            content += zlib.decompress(stream) if b"/FlateDecode" in head else stream
+        num = self._alloc()
+        bbox = " ".join(_num(v, 4) for v in (x0, y0, x1, y1)).encode("ascii")
+        self._write_stream(num, b"/Type /XObject /Subtype /Form /BBox [" + bbox + b"] /Resources " + resources
+                           + b" /Filter /FlateDecode", zlib.compress(content, 6))
+        return num, x1 - x0, y1 - y0
+
+    def _import_image(self, data):
+        """Embed a raster picture (PNG, JPEG, ...) as an RGB image XObject."""
+        from PIL import Image
+        img = Image.open(io.BytesIO(data))
+        dpi = img.info.get("dpi", (96, 96))[0] or 96
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            flat = Image.new("RGB", img.size, "white")
+            flat.paste(img, mask=img.getchannel("A"))
+            img = flat
+        img = img.convert("RGB")
+        num = self._alloc()
+        self._write_stream(num, b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                                b"/BitsPerComponent 8 /Filter /FlateDecode" % img.size,
+                           zlib.compress(img.tobytes(), 6))
+        return num, img.width * 72.0 / dpi, img.height * 72.0 / dpi
+
+    # ---------- pages ----------
+    def _new_page(self):
+        if self._ops is not None:
+            self._finish_page()
+        self._ops = []
+        self._y = PAGE_HEIGHT - MARGIN
+
+    def _finish_page(self):
+        number = str(len(self._pages) + 1)
+        x = (PAGE_WIDTH - _width(_encode(number, "F1"), 9)) / 2
+        self._ops.append(f"0.4 g BT /F1 9 Tf {_num(x)} {_num(MARGIN / 2)} Td ".encode("ascii")
+                         + _literal(number.encode("ascii")) + b" Tj ET 0 g")
+        content = self._alloc()
+        self._write_stream(content, b"/Filter /FlateDecode", zlib.compress(b"\n".join(self._ops), 6))
+        page = self._alloc()
+        self._write(page, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] /Resources 3 0 R /Contents %d 0 R >>"
+                    % (_num(PAGE_WIDTH).encode(), _num(PAGE_HEIGHT).encode(), content))
+        self._pages.append(page)
+        self._ops = None
+
+    def _at_top(self):
+        return self._ops is not None and not self._ops
+
+    def _room(self, height):
+        """Start a new page unless height points still fit above the bottom margin."""
+        if self._ops is None or self._y - height < MARGIN:
+            self._new_page()
+
+    # ---------- layout ----------
+    def _wrap(self, paragraph, size, width):
+        """Break a paragraph's runs into lines of [(font, bytes)] no wider than width."""
+        lines, line, x = [], [], 0.0
+        for run in paragraph.runs:
+            font = "F%d" % (1 + bool(run.bold or paragraph.style.get("bold")) + 2 * bool(run.italic))
+            for tok in re.findall(r"\n|[ \t]+|[^\s]+", run.text):
+                if tok == "\n":
+                    lines.append(line)
+                    line, x = [], 0.0
+                    continue
+                pieces = _encode(tok, font)
+                w = _width(pieces, size)
+                if tok.isspace():
+                    if line or not lines:  # keep leading indentation, drop spaces at a wrap
+                        line.extend(pieces)
+                        x += w
+                    continue
+                if x + w > width and line:
+                    lines.append(line)
+                    line, x = [], 0.0
+                while w > width:  # a word (usually a URL) longer than the line: break it anywhere
+                    cut = len(tok)
+                    while cut > 1 and _width(_encode(tok[:cut], font), size) > width:
+                        cut -= 1
+                    lines.append(list(_encode(tok[:cut], font)))
+                    tok = tok[cut:]
+                    pieces = _encode(tok, font)
+                    w = _width(pieces, size)
+                line.extend(pieces)
+                x += w
+        lines.append(line)
+        return lines
+
+    def _draw_line(self, pieces, x, baseline, size):
+        ops = [b"BT %s %s Td" % (_num(x).encode(), _num(baseline).encode())]
+        merged = []
+        for f, data in pieces:  # one Tj per font change, not per word
+            if merged and merged[-1][0] == f:
+                merged[-1][1].append(data)
+            else:
+                merged.append((f, [data]))
+        for f, parts in merged:
+            ops.append(b"/%s %s Tf " % (f.encode(), _num(size).encode()) + _literal(b"".join(parts)) + b" Tj")
+        ops.append(b"ET")
+        self._ops.append(b" ".join(ops))
+
+    def _layout_paragraph(self, paragraph):
+        style = paragraph.style
+        size, leading = style["size"], style["leading"]
+        indent = style.get("indent", 0)
+        lines = self._wrap(paragraph, size, TEXT_WIDTH - indent)
+        keep = len(lines) * leading + (KEEP_WITH_NEXT * STYLES["normal"]["leading"] if style["bold"] else 0)
+        self._room(style["before"] + min(keep, PAGE_HEIGHT - 2 * MARGIN - style["before"]))
+        if not self._at_top():
+            self._y -= style["before"]
+        if style["color"]:
+            self._ops.append(("%s %s %s rg" % tuple(_num(c) for c in style["color"])).encode("ascii"))
+        for i, line in enumerate(lines):
+            self._room(leading)
+            self._y -= leading
+            baseline = self._y + (leading - size) / 2 + size * 0.22
+            if indent and i == 0:  # List Bullet
+                self._draw_line(_encode("\u2022", "F1"), MARGIN + indent - 10, baseline, size)
+            self._draw_line(line, MARGIN + indent, baseline, size)
+        if style["color"]:
+            self._ops.append(b"0 g")
+        if style.get("rule"):
+            self._y -= 4
+            self._ops.append(b"0.31 0.51 0.74 RG 0.75 w %s %s m %s %s l S 0 G"
+                             % tuple(_num(v).encode() for v in (MARGIN, self._y, PAGE_WIDTH - MARGIN, self._y)))
+        self._y -= style["after"]
+
+    def _layout_picture(self, name, width, height):
+        if height > PAGE_HEIGHT - 2 * MARGIN:  # never taller than a page
+            width, height = width * (PAGE_HEIGHT - 2 * MARGIN) / height, PAGE_HEIGHT - 2 * MARGIN
+        self._room(height)
+        self._y -= height
+        form_w, form_h = self._forms.get(name, (1, 1))
+        self._ops.append(b"q %s 0 0 %s %s %s cm /%s Do Q" % (
+            _num(width / form_w, 4).encode(), _num(height / form_h, 4).encode(), _num(MARGIN).encode(),
+            _num(self._y).encode(), name.encode()))
+        self._y -= STYLES["normal"]["after"]
+
+    def _flush(self):
+        element, self._pending = self._pending, None
+        if isinstance(element, PdfParagraph):
+            self._layout_paragraph(element)
+        elif isinstance(element, _PageBreak):
+            self._room(0)
+            self._new_page()
+        elif element is not None:
+            self._layout_picture(*element)
+
+    def _push(self, element):
+        self._flush()
+        self._pending = element
+        return element
+
+    # ---------- python-docx API ----------
+    def add_heading(self, text="", level=1):
+        if level == 0 and self.title is None:
+            self.title = text
+        return self.add_paragraph(text, "Title" if level == 0 else f"Heading {level}")
+
+    def add_paragraph(self, text="", style=None):
+        paragraph = PdfParagraph(text, STYLES.get((style or "Normal").lower(), STYLES["normal"]))
+        return self._push(paragraph)
+
+    def add_page_break(self):
+        self._push(_PageBreak())
+
+    def add_picture(self, image_path_or_stream, width=None, height=None, svg=None):
+        """
+        Add a picture as its own block. PDF bytes (figures.fig_to_pdf) stay
+        vector; raster images are embedded as RGB. width/height are
+        python-docx lengths (EMU); with only one given the aspect is kept.
+        svg is accepted for figures.add_figure() and ignored.
+        """
+        if hasattr(image_path_or_stream, "read"):
+            data = image_path_or_stream.read()
+        else:
+            with open(image_path_or_stream, "rb") as fh:
+                data = fh.read()
+        key = hashlib.sha1(data).hexdigest()
+        if key not in self._pictures:
+            name = f"Im{len(self._xobjects) + 1}"
+            if data.startswith(b"%PDF"):
+                num, w, h = self._import_pdf(data)
+                self._forms[name] = (w, h)
+            else:
+                num, w, h = self._import_image(data)
+            self._xobjects[name] = num
+            self._pictures[key] = (name, w, h)
+        name, w, h = self._pictures[key]
+        if width is not None and height is not None:
+            w, h = width / EMU_PER_PT, height / EMU_PER_PT
+        elif width is not None:
+            w, h = width / EMU_PER_PT, h * width / EMU_PER_PT / w
+        elif height is not None:
+            w, h = w * height / EMU_PER_PT / h, height / EMU_PER_PT
+        if w > TEXT_WIDTH:
+            w, h = TEXT_WIDTH, h * TEXT_WIDTH / w
+        self._push((name, w, h))
+
+    def save(self, path_or_stream):
+        self._flush()
+        if self._ops is None:
+            self._new_page()
+        self._finish_page()
+
+        fonts = []
+        for key, (_, base) in FONTS.items():
+            num = self._alloc()
+            encoding = b"" if key == SYMBOL else b" /Encoding /WinAnsiEncoding"
+            self._write(num, b"<< /Type /Font /Subtype /Type1 /BaseFont /%s%s >>" % (base.encode(), encoding))
+            fonts.append(b"/%s %d 0 R" % (key.encode(), num))
+        xobjects = b" ".join(b"/%s %d 0 R" % (k.encode(), v) for k, v in self._xobjects.items())
+        self._write(3, b"<< /ProcSet [/PDF /Text /ImageC] /Font << " + b" ".join(fonts)
+                    + b" >> /XObject << " + xobjects + b" >> >>")
+        self._write(2, b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % p for p in self._pages)
+                    + b"] /Count %d >>" % len(self._pages))
+        self._write(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        info = self._alloc()
+        title = f" /Title {_text_string(self.title)}" if self.title else ""
+        self._write(info, f"<< /Producer (pdf_writer.py){title} >>".encode("ascii"))
+
+        xref = self._body.tell()
+        size = self._next_id
+        out = [b"xref\n0 %d\n0000000000 65535 f \n" % size]
+        out += [b"%010d 00000 n \n" % self._offsets[n] for n in range(1, size)]
+        out.append(b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, info, xref))
+        self._body.write(b"".join(out))
+
+        self._body.seek(0)
+        if hasattr(path_or_stream, "write"):
+            _copy_stream(self._body, path_or_stream)
+        else:
+            with open(path_or_stream, "wb") as fh:
+                _copy_stream(self._body, fh)
+        self.close()
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def close(self):
+        self._body.close()
+
+
+def _copy_stream(src, dst):
+    while True:
+        chunk = src.read(1 << 20)
+        if not chunk:
+            return
+        dst.write(chunk)
+
+
+BACKENDS = ("docx", "pdf")
+
+
+def add_backend_arg(parser):
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="docx",
+        help="write the booklet as DOCX, or directly as PDF with vector figures (pdf_writer.py)",
+    )
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled parameter registry: the specs from params.py plus, for every edition
+and parameter, the dense curve each builder plots and its band edges.
+
+The compiled arrays are cached as one flat float64 .npy file (memory-mapped
+on load) plus a small .json index of array offsets, both named after a hash
+of params.py, this file and the NumPy version. Editing a spec or a curve
+function recompiles on the next run; every other run maps the file instead
+of recomputing. (An .npz archive was tried first: unpacking its members cost
+more than compiling the curves.)
+
+  x, y  = registry.curve("booklet", "cct")      # dense curve as plotted
+  edges = registry.band_edges("final")           # (n, 6) array, one row per spec
+  ids   = registry.ids("merged")                 # spec ids in edition order
+
+Band edge rows are (danger0, warn0, good0, good1, warn1, danger1), the order
+BandCanvas.start() draws them in.
+
+Each edition's response curves are also stored in stacked form for batched
+evaluation (response.py): anchors padded to a (P, K) block (x padded with
++inf, y with the last anchor), anchor counts, curve kind, the span used
+to normalize the gaussian/descending curves, and whether the curve is a
+risk (higher is worse) rather than a benefit. Anchor lists whose x and y
+lengths differ are trimmed to the shorter one, as the charts always did,
+but with an AnchorMismatchWarning naming the spec.
+
+The cache lives in $LIGHTING_REGISTRY_DIR (default ~/.cache/school_lighting).
+
+Usage:
+  python registry.py info      # editions, specs, cache file
+  python registry.py build     # (re)compile the cache now
+
+Requirements:
+  pip install numpy
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+import warnings
+
+import numpy as np
+
+import params
+
+CACHE_DIR = os.environ.get(
+    "LIGHTING_REGISTRY_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "school_lighting"),
+)
+
+SPECS = {
+    "booklet": params.BOOKLET,
+    "merged": params.MERGED,
+    "final": params.FINAL,
+    "overview": [dict(spec, name=name) for name, spec in params.OVERVIEW.items()],
+}
+
+# Curve kinds in the stacked arrays
+CURVE_INTERP, CURVE_GAUSSIAN, CURVE_DESCENDING = 0, 1, 2
+DIRECTIONS = ("benefit", "risk")  # a spec's "direction"; benefit when absent
+GAUSSIAN_WIDTH = 0.18  # as a fraction of the span, as charted in the FINAL edition
+DESCENDING_KNEE = 0.15
+
+
+class AnchorMismatchWarning(UserWarning):
+    """A spec's anchor x and y lists have different lengths and were trimmed."""
+
+# -----------------------------------------------------------------------------
+# Curve functions (one per edition's plotting convention)
+# -----------------------------------------------------------------------------
+def interpolate_curve(x, anchors_x, anchors_y, name="anchors"):
+    """Piecewise-linear curve through the anchors (anchors_x increasing).
+    Mismatched anchor lists are trimmed to the shorter one, with a warning."""
+    anchors_x = np.asarray(anchors_x)
+    anchors_y = np.asarray(anchors_y)
+    if anchors_x.size != anchors_y.size:
+        m = min(anchors_x.size, anchors_y.size)
+        warnings.warn(f"{name}: {anchors_x.size} x vs {anchors_y.size} y anchors, using the first {m}",
+                      AnchorMismatchWarning, stacklevel=2)
+        anchors_x = anchors_x[:m]
+        anchors_y = anchors_y[:m]
+    return np.interp(x, anchors_x, anchors_y)
+
+def gaussian_peak(x, center, width=0.2, maxy=1.0):
+    """Symmetric 'benefit' curve peaking at center (as fraction of span)."""
+    # x is numeric array; normalize to 0..1
+    x0, x1 = x.min(), x.max()
+    xn = (x - x0) / (x1 - x0 + 1e-9)
+    return maxy * np.exp(-((xn - center) ** 2) / (2 * width ** 2))
+
+def descending_curve(x, knee_frac=DESCENDING_KNEE):
+    """Monotonic decreasing curve for risk parameters (Flicker, UGR): 1 where the risk is lowest."""
+    x0, x1 = x.min(), x.max()
+    xn = (x - x0) / (x1 - x0 + 1e-9)
+    # High at 0, falls rapidly after knee
+    return 1.0 / (1.0 + np.exp( (xn - knee_frac) * 12.0 ))
+
+def spec_anchors(edition, p):
+    """(x, y) anchor lists of an interpolated spec, or None for analytic curves."""
+    if edition == "booklet":
+        return p["anchors"]["x"], p["anchors"]["y"]
+    if edition == "merged":
+        return p["anchors_x"], p["anchors_y"]
+    if edition == "overview":
+        return p["x"], p["y"]
+    return None
+
+def spec_span(edition, p):
+    if edition in ("booklet", "merged"):
+        return p["xspan"]
+    if edition == "final":
+        return p["span"]
+    return (min(p["x"]), max(p["x"]))
+
+def spec_direction(edition, p):
+    """Whether the spec's curve is a "benefit" or a "risk" (higher is worse, e.g. discomfort probability)."""
+    direction = p.get("direction", "benefit")
+    if direction not in DIRECTIONS:
+        raise ValueError(f"{edition}/{p['id']}: direction must be one of {DIRECTIONS}, not {direction!r}")
+    return direction
+
+def compile_curve(edition, p):
+    """Dense (x, y) for one spec, exactly as its builder plots it."""
+    name = f"{edition}/{p['id']}"
+    if edition == "booklet":
+        x0, x1 = p["xspan"]
+        x = np.linspace(x0, x1, 400)
+        return x, interpolate_curve(x, *spec_anchors(edition, p), name=name)
+    if edition == "merged":
+        x0, x1 = p["xspan"]
+        # 500 points for moderate integer spans, 400 for very tight/spread ranges
+        n = 500 if isinstance(x0, int) and isinstance(x1, int) and (x1 - x0) <= 1000 else 400
+        x = np.linspace(x0, x1, n)
+        return x, interpolate_curve(x, *spec_anchors(edition, p), name=name)
+    if edition == "final":
+        x0, x1 = p["span"]
+        x = np.linspace(x0, x1, 400)
+        if p["curve"] == "gaussian":
+            return x, gaussian_peak(x, center=p.get("curve_center", 0.5), width=GAUSSIAN_WIDTH, maxy=1.0)
+        return x, descending_curve(x)
+    if edition == "overview":
+        # plotted point by point, no densification
+        return np.asarray(p["x"], dtype=float), np.asarray(p["y"], dtype=float)
+    raise KeyError(f"unknown edition {edition!r} (expected one of {params.EDITIONS})")
+
+def compile_edges(edition, p):
+    """Band edges (danger0, warn0, good0, good1, warn1, danger1) for one spec."""
+    if edition in ("booklet", "merged"):
+        b = p["bands"]
+        good, warn, danger = b["good"], b["warn"], b["danger"]
+    elif edition == "final":
+        good, warn, danger = p["good"], p["warn"], p["danger"]
+    else:
+        # a single acceptable range, shaded against the plotted extent
+        good = warn = p["acceptable"]
+        danger = (min(p["x"]), max(p["x"]))
+    return (danger[0], warn[0], good[0], good[1], warn[1], danger[1])
+
+def compile_stacked(edition, specs):
+    """Stacked (P, K) anchor arrays plus per-spec curve kind, span, shape and direction."""
+    anchors, trimmed, kinds, centers = [], [], [], []
+    for p in specs:
+        a = spec_anchors(edition, p)
+        if a is None:
+            anchors.append(([], []))
+            trimmed.append(False)
+            gaussian = p["curve"] == "gaussian"
+            kinds.append(CURVE_GAUSSIAN if gaussian else CURVE_DESCENDING)
+            centers.append(p.get("curve_center", 0.5) if gaussian else np.nan)
+            continue
+        ax, ay = list(a[0]), list(a[1])
+        m = min(len(ax), len(ay))
+        if len(ax) != len(ay):
+            warnings.warn(f"{edition}/{p['id']}: {len(ax)} x vs {len(ay)} y anchors, using the first {m}",
+                          AnchorMismatchWarning, stacklevel=2)
+        if any(b <= a for a, b in zip(ax[:m], ax[1:m])):
+            raise ValueError(f"{edition}/{p['id']}: anchor x values must be strictly increasing")
+        anchors.append((ax[:m], ay[:m]))
+        trimmed.append(m != max(len(ax), len(ay)))
+        kinds.append(CURVE_INTERP)
+        centers.append(np.nan)
+
+    k = max(1, max(len(ax) for ax, _ in anchors))
+    stack_x = np.full((len(specs), k), np.inf)
+    stack_y = np.zeros((len(specs), k))
+    for i, (ax, ay) in enumerate(anchors):
+        if ax:
+            stack_x[i, :len(ax)] = ax
+            stack_y[i, :len(ay)] = ay
+            stack_y[i, len(ay):] = ay[-1]
+    return {
+        "anchors_x": stack_x,
+        "anchors_y": stack_y,
+        "anchors_n": np.array([len(ax) for ax, _ in anchors], dtype=float),
+        "anchors_trimmed": np.array(trimmed, dtype=float),
+        "kind": np.array(kinds, dtype=float),
+        "center": np.array(centers, dtype=float),
+        "span": np.array([spec_span(edition, p) for p in specs], dtype=float),
+        "risk": np.array([spec_direction(edition, p) == "risk" for p in specs], dtype=float),
+    }
+
+# -----------------------------------------------------------------------------
+# Compile / cache
+# -----------------------------------------------------------------------------
+def digest():
+    h = hashlib.sha256(np.__version__.encode())
+    for mod in (params, sys.modules[__name__]):
+        with open(mod.__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+def cache_path():
+    """Path of the .npy data file; its index sits next to it as .json."""
+    return os.path.join(CACHE_DIR, f"registry-{digest()}.npy")
+
+def _index_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+def compile_all():
+    """Compute every edition's curves and band edges: {array name: ndarray}."""
+    arrays = {}
+    for edition, specs in SPECS.items():
+        arrays[f"{edition}/ids"] = np.array([p["id"] for p in specs])
+        arrays[f"{edition}/edges"] = np.array([compile_edges(edition, p) for p in specs], dtype=float)
+        for name, arr in compile_stacked(edition, specs).items():
+            arrays[f"{edition}/{name}"] = arr
+        for p in specs:
+            x, y = compile_curve(edition, p)
+            arrays[f"{edition}/{p['id']}/x"] = x
+            arrays[f"{edition}/{p['id']}/y"] = y
+    return arrays
+
+def _write_atomic(path, write):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def build(path=None):
+    """Compile and write the cache (data first, index last); returns the data path."""
+    path = path or cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    compiled = compile_all()
+    index = {"ids": {}, "arrays": {}}
+    chunks, offset = [], 0
+    for name, arr in compiled.items():
+        if arr.dtype.kind == "U":
+            index["ids"][name] = arr.tolist()
+            continue
+        index["arrays"][name] = [offset, list(arr.shape)]
+        chunks.append(arr.astype(np.float64).ravel())
+        offset += arr.size
+    data = np.concatenate(chunks)
+    _write_atomic(path, lambda f: np.save(f, data))
+    _write_atomic(_index_path(path), lambda f: f.write(json.dumps(index).encode("utf-8")))
+    return path
+
+def _load(path):
+    """Map the cache; raises OSError, EOFError, ValueError or KeyError if it is missing, truncated or mismatched."""
+    with open(_index_path(path), encoding="utf-8") as f:
+        index = json.load(f)
+    data = np.load(path, mmap_mode="r")
+    if data.ndim != 1 or data.dtype != np.float64:
+        raise ValueError(f"{path}: not a flat float64 array")
+    out = {name: np.array(ids) for name, ids in index["ids"].items()}
+    for name, (offset, shape) in index["arrays"].items():
+        size = int(np.prod(shape))
+        if offset + size > data.size:
+            raise ValueError(f"{path}: {name} runs past the end of the data")
+        out[name] = data[offset:offset + size].reshape(shape)
+    return out
+
+_ARRAYS = None  # this process's compiled arrays
+
+def arrays():
+    global _ARRAYS
+    if _ARRAYS is None:
+        path = cache_path()
+        try:
+            _ARRAYS = _load(path)
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            # Missing, truncated or half-written cache: a miss, compile it again
+            try:
+                build(path)
+                _ARRAYS = _load(path)
+            except OSError:
+                # read-only home etc.: keep the compiled arrays in memory only
+                _ARRAYS = compile_all()
+    return _ARRAYS
+
+# -----------------------------------------------------------------------------
+# Lookups
+# -----------------------------------------------------------------------------
+def specs(edition):
+    return SPECS[edition]
+
+def ids(edition):
+    return [str(i) for i in arrays()[f"{edition}/ids"]]
+
+def curve(edition, pid):
+    a = arrays()
+    return a[f"{edition}/{pid}/x"], a[f"{edition}/{pid}/y"]
+
+def band_edges(edition):
+    return arrays()[f"{edition}/edges"]
+
+def stacked(edition):
+    """The edition's stacked curve arrays: anchors_x/_y/_n/_trimmed, kind, center, span, risk."""
+    a = arrays()
+    return {name: a[f"{edition}/{name}"] for name in
+            ("anchors_x", "anchors_y", "anchors_n", "anchors_trimmed", "kind", "center", "span", "risk")}
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the compiled parameter registry.")
+    parser.add_argument("command", choices=["info", "build"])
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        print("✅ Registry compiled:", build())
+        return 0
+    path = cache_path()
+    print("Registry cache:", path, "(present)" if os.path.exists(_index_path(path)) else "(not built yet)")
+    for edition in SPECS:
+        print(f"  {edition:9} {len(SPECS[edition])} specs: {', '.join(ids(edition))}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
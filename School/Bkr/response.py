@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Batched dose-response evaluation: every parameter's response curve, for
+arbitrary measurement arrays, in one vectorized pass.
+
+The charts evaluate one curve at a time on a fixed 400-500 point grid. Here
+the curves come from the registry's stacked form, (P, K) anchor blocks plus
+curve kind/span per parameter, and a whole (P, N) block of measurements
+(one row per parameter, one column per room) is evaluated at once:
+
+  R = evaluate({"eh": lux, "ugr": ugr, "cct": cct}, edition="booklet")  # (3, N)
+  s = score_rooms(M, edition="final")                                    # (N,) in 0..1
+
+Interpolated curves behave like np.interp (flat beyond the first/last
+anchor); gaussian/descending curves use the same normalized formulas as the
+FINAL charts, relative to each parameter's span. NaN measurements give NaN.
+evaluate() returns the curves as plotted; score_rooms() turns risk curves
+(registry.spec_direction, e.g. the BOOKLET flicker and UGR discomfort
+probabilities) into 1 - risk so that higher is better for every parameter.
+
+Anchor lists whose x and y lengths differ are trimmed by the registry with
+an AnchorMismatchWarning; strict=True turns that into a ValueError instead.
+
+Requirements:
+  pip install numpy
+"""
+
+import numpy as np
+
+import registry
+
+
+def _rows(edition, pids):
+    ids = registry.ids(edition)
+    if pids is None:
+        return ids, np.arange(len(ids))
+    missing = [pid for pid in pids if pid not in ids]
+    if missing:
+        raise KeyError(f"not in the {edition} edition: {', '.join(missing)} (have: {', '.join(ids)})")
+    return list(pids), np.array([ids.index(pid) for pid in pids])
+
+
+def _stack(measurements, edition, pids):
+    """dict {pid: (N,)} or (P, N) array -> (ids, registry rows, (P, N) float array)."""
+    if isinstance(measurements, dict):
+        pids = list(measurements)
+        values = np.vstack([np.asarray(v, dtype=np.float64).ravel() for v in measurements.values()])
+    else:
+        values = np.atleast_2d(np.asarray(measurements, dtype=np.float64))
+    pids, rows = _rows(edition, pids)
+    if values.shape[0] != len(rows):
+        raise ValueError(f"{values.shape[0]} measurement rows for {len(rows)} parameters ({', '.join(pids)})")
+    return pids, rows, values
+
+
+def _interp_rows(values, ax, ay, n):
+    """Row-wise np.interp: values (P, N), anchors (P, K) padded with +inf, n (P,) real anchor counts."""
+    # Segment index = number of anchors at or below each value; one pass per anchor column, not per reading
+    idx = np.zeros(values.shape, dtype=np.intp)
+    for k in range(ax.shape[1]):
+        idx += values >= ax[:, k:k + 1]
+    np.clip(idx, 1, np.maximum(n - 1, 1)[:, None], out=idx)
+
+    x0 = np.take_along_axis(ax, idx - 1, axis=1)
+    x1 = np.take_along_axis(ax, idx, axis=1)
+    y0 = np.take_along_axis(ay, idx - 1, axis=1)
+    y1 = np.take_along_axis(ay, idx, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (values - x0) / (x1 - x0)
+    t[~np.isfinite(x1)] = 0.0  # single-anchor rows: flat
+    np.clip(t, 0.0, 1.0, out=t)  # NaN stays NaN
+    return y0 + t * (y1 - y0)
+
+
+def evaluate(measurements, edition="booklet", pids=None, strict=False):
+    """
+    Response of every parameter's curve at the given measurements.
+
+    measurements: {pid: array of N readings}, or a (P, N) array whose rows
+    follow pids (default: registry.ids(edition)).
+    Returns a (P, N) float array; rows in the same order as the input.
+    """
+    pids, rows, values = _stack(measurements, edition, pids)
+    s = registry.stacked(edition)
+    if strict and s["anchors_trimmed"][rows].any():
+        bad = [pid for pid, r in zip(pids, rows) if s["anchors_trimmed"][r]]
+        raise ValueError(f"{edition}: mismatched anchor x/y lengths for {', '.join(bad)}")
+
+    kind = s["kind"][rows].astype(int)
+    out = np.empty(values.shape)
+
+    interp = kind == registry.CURVE_INTERP
+    if interp.any():
+        r = rows[interp]
+        out[interp] = _interp_rows(values[interp], s["anchors_x"][r], s["anchors_y"][r],
+                                   s["anchors_n"][r].astype(np.intp))
+
+    analytic = ~interp
+    if analytic.any():
+        r = rows[analytic]
+        x0, x1 = s["span"][r, 0:1], s["span"][r, 1:2]
+        xn = (values[analytic] - x0) / (x1 - x0 + 1e-9)
+        gauss = np.exp(-((xn - s["center"][r][:, None]) ** 2) / (2 * registry.GAUSSIAN_WIDTH ** 2))
+        desc = 1.0 / (1.0 + np.exp((xn - registry.DESCENDING_KNEE) * 12.0))
+        out[analytic] = np.where((kind[analytic] == registry.CURVE_GAUSSIAN)[:, None], gauss, desc)
+    return out
+
+
+def peak_response(edition="booklet", pids=None):
+    """Maximum of each parameter's curve (for normalizing responses to 0..1)."""
+    pids, rows = _rows(edition, pids)
+    s = registry.stacked(edition)
+    peaks = np.ones(len(rows))  # gaussian/descending curves peak at 1
+    interp = s["kind"][rows] == registry.CURVE_INTERP
+    peaks[interp] = s["anchors_y"][rows[interp]].max(axis=1)
+    return peaks
+
+
+def score_rooms(measurements, edition="booklet", pids=None, strict=False):
+    """
+    One 0..1 score per room (column): each response divided by its curve's
+    peak (one minus that for risk curves), averaged over the parameters that
+    were measured (NaN rows skipped).
+    """
+    pids, rows, values = _stack(measurements, edition, pids)
+    r = evaluate(values, edition, pids, strict=strict) / peak_response(edition, pids)[:, None]
+    risk = registry.stacked(edition)["risk"][rows] == 1
+    r[risk] = 1.0 - r[risk]
+    measured = ~np.isnan(r)
+    counts = measured.sum(axis=0)
+    with np.errstate(invalid="ignore"):
+        return np.where(counts > 0, np.nansum(r, axis=0) / np.maximum(counts, 1), np.nan)
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+One compliance report per classroom, from a CSV of measured rooms.
+
+  python room_reports.py rooms.csv [-j N] [--edition booklet] [-o room_reports]
+  python room_reports.py rooms.csv --sample 2000      # write a synthetic table first
+  python cli.py rooms rooms.csv -j 0
+
+The CSV has a "room" column, an optional "school" column and one column per
+parameter id of the edition (cct, cri, flicker, ugr, medi, ev, exposure, eh;
+"uniformity" too for merged). Blank cells mean "not measured"; parameters
+without a column are reported as not measured.
+
+Each room gets room_reports/<room>.docx with its overall score
+(response.score_rooms: the mean of the measured parameters' responses, with
+flicker and glare risk counted against the room, so higher is better), a
+table of measured value, zone and optimal range per parameter
+(zones.classify against the registry's bands), a chart of the readings on
+the red/amber/green bands, and a list of what to fix.
+
+Throughput comes from sharing everything that does not depend on the room:
+  - the band chart is rendered once per edition with Matplotlib (and kept in
+    the figure cache between runs); each room only has its markers drawn on
+    a copy of that image with PIL;
+  - readings are read, classified and scored BATCH_SIZE rooms at a time,
+    vectorized over the batch;
+  - reports are written by the streaming DOCX writer, over a process pool
+    with -j; workers inherit the rendered background.
+Memory stays bounded by the batch size, whatever the number of rooms. A
+summary.csv (score and zone per parameter for every room) is written
+alongside, and progress is printed with the running rooms-per-second rate.
+
+Requirements:
+  pip install python-docx matplotlib numpy pillow
+"""
+
+import io
+import os
+import re
+import csv
+import json
+import time
+import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from docx.shared import Inches
+
+import zones
+import registry
+import response
+import figcache
+from docx_stream import StreamingDocument
+from figures import add_figure, resolve_workers, add_workers_arg, add_cache_arg
+from timing import stage, count, instrument, session, add_timing_args
+
+OUT_DIR = os.path.join(os.getcwd(), "room_reports")
+BATCH_SIZE = 256
+
+# Same band colors and alphas as the booklet charts; markers in a darker shade of the zone's color
+COLOR_GOOD, COLOR_WARN, COLOR_BAD = "#2ca02c", "#ffbf00", "#d62728"
+BAND_ALPHAS = (0.30, 0.30, 0.25)
+MARKER_COLORS = {zones.GOOD: (27, 110, 27), zones.WARN: (166, 110, 0), zones.DANGER: (160, 24, 24)}
+PNG_COMPRESS_LEVEL = 3  # palette PNGs: level 6 is ~2x slower for ~15% smaller files
+
+ROW_HEIGHT = 0.42   # inches per parameter row
+FIG_WIDTH = 7.0
+FIG_DPI = 150
+
+
+# -----------------------------------------------------------------------------
+# Shared band chart
+# -----------------------------------------------------------------------------
+def _short_title(spec):
+    return spec.get("title", spec.get("name")).split(" (")[0]  # FINAL specs have a "name"
+
+
+def render_background(edition, dpi=FIG_DPI):
+    """
+    Band chart with one row per parameter, each normalized to its full span.
+    Returns (PNG bytes, geometry) where geometry maps row/span fractions to pixels.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.patches import Rectangle
+    from matplotlib.colors import to_rgb
+
+    specs = registry.specs(edition)
+    edges = np.asarray(registry.band_edges(edition), dtype=float)
+    n = len(specs)
+    fig = Figure(figsize=(FIG_WIDTH, 0.6 + ROW_HEIGHT * n), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    # Opaque, pre-blended on white and stacked span -> caution -> optimal: some specs have a caution
+    # band narrower than the optimal one (CRI: 70-80 vs 80-100), where translucent patches would mix
+    good, warn, bad = [tuple(1 - a + a * c for c in to_rgb(color))
+                       for color, a in zip((COLOR_GOOD, COLOR_WARN, COLOR_BAD), BAND_ALPHAS)]
+    for row, e in enumerate(edges):
+        y = n - 1 - row
+        xn = (e - e[0]) / (e[5] - e[0])
+        for color, (i, j) in ((bad, (0, 5)), (warn, (1, 4)), (good, (2, 3))):
+            ax.add_patch(Rectangle((xn[i], y - 0.35), xn[j] - xn[i], 0.7, color=color, linewidth=0))
+        ax.text(-0.005, y - 0.42, f"{e[0]:g}", ha="left", va="top", fontsize=6, color="#555555")
+        ax.text(1.005, y - 0.42, f"{e[5]:g}", ha="right", va="top", fontsize=6, color="#555555")
+    ax.set_xlim(-0.03, 1.03)
+    ax.set_ylim(-0.7, n - 0.4)
+    ax.set_yticks(range(n))
+    ax.set_yticklabels([_short_title(s) for s in reversed(specs)], fontsize=8)
+    ax.set_xticks([])
+    for side in ("top", "right", "bottom"):
+        ax.spines[side].set_visible(False)
+    fig.tight_layout()
+    fig.canvas.draw()
+
+    width, height = fig.canvas.get_width_height()
+    to_px = ax.transData.transform
+    (x0, _), (x1, _) = to_px([(0.0, 0.0), (1.0, 0.0)])
+    rows = [height - to_px([(0.0, n - 1 - r)])[0][1] for r in range(n)]
+    half = abs(to_px([(0.0, 0.35)])[0][1] - to_px([(0.0, 0.0)])[0][1])
+    geometry = {"x0": x0, "x1": x1, "rows": rows, "half": half, "size": [width, height]}
+
+    from PIL import Image
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    buf = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").convert("RGB").save(buf, format="png", dpi=(dpi, dpi))
+    return buf.getvalue(), geometry
+
+
+def background_key(edition, dpi=FIG_DPI):
+    specs = [(s["id"], _short_title(s)) for s in registry.specs(edition)]
+    return figcache.figure_key(
+        {"edition": edition, "specs": specs, "edges": np.asarray(registry.band_edges(edition)).tolist()},
+        code=(render_background, _short_title), dpi=dpi, figsize=(FIG_WIDTH, ROW_HEIGHT),
+        colors=(COLOR_GOOD, COLOR_WARN, COLOR_BAD),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def background(edition, use_cache=True):
+    """
+    (palette image, geometry) of the shared band chart: from the figure cache,
+    else rendered; once per process. The last palette slots hold the marker
+    colors, so room_chart() draws by index and saves a small indexed PNG.
+    """
+    from PIL import Image
+    key = background_key(edition)
+    png = figcache.fetch(key) if use_cache else None
+    meta = figcache.fetch(key, ext=".json") if use_cache else None
+    if png is None or meta is None:
+        png, geometry = render_background(edition)
+        if use_cache:
+            figcache.store(key, png)
+            figcache.store(key, json.dumps(geometry).encode("utf-8"), ext=".json")
+    else:
+        geometry = json.loads(meta)
+    marks = list(MARKER_COLORS.values()) + [(255, 255, 255)]
+    img = Image.open(io.BytesIO(png)).convert("RGB").quantize(256 - len(marks), method=Image.Quantize.MEDIANCUT)
+    palette = img.getpalette()[:3 * (256 - len(marks))]
+    img.putpalette(palette + [c for rgb in marks for c in rgb])
+    geometry["marker_index"] = {z: 256 - len(marks) + i for i, z in enumerate(MARKER_COLORS)}
+    geometry["white_index"] = 255
+    return img, geometry
+
+
+def room_chart(edition, fractions, zone_codes, use_cache=True):
+    """PNG of the shared band chart with this room's readings marked (fractions of each row's span)."""
+    from PIL import ImageDraw
+    base, g = background(edition, use_cache)
+    img = base.copy()
+    draw = ImageDraw.Draw(img)
+    x0, x1, half = g["x0"], g["x1"], g["half"]
+    r = max(3, int(half * 0.28))
+    for y, f, z in zip(g["rows"], fractions, zone_codes):
+        if z == zones.MISSING:
+            continue
+        color = g["marker_index"][int(z)]
+        x = x0 + min(max(f, -0.025), 1.025) * (x1 - x0)  # off-scale readings sit just past the edge
+        draw.line([(x, y - half), (x, y + half)], fill=color, width=3)
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=color, outline=g["white_index"])
+    buf = io.BytesIO()
+    img.save(buf, format="png", dpi=(FIG_DPI, FIG_DPI), compress_level=PNG_COMPRESS_LEVEL)
+    return buf.getvalue()
+
+
+# -----------------------------------------------------------------------------
+# Room table
+# -----------------------------------------------------------------------------
+def _float(cell, where):
+    cell = (cell or "").strip()
+    if not cell:
+        return np.nan
+    try:
+        return float(cell)
+    except ValueError:
+        raise ValueError(f"{where}: not a number: {cell!r}") from None
+
+
+def read_batches(path, ids, batch_size=BATCH_SIZE):
+    """Yield (rooms, schools, (P, B) readings) from the CSV, batch_size rooms at a time."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        columns = {c.strip().lower(): c for c in reader.fieldnames or []}
+        if "room" not in columns:
+            raise ValueError(f"{path}: no 'room' column (have: {', '.join(columns)})")
+        found = [pid for pid in ids if pid in columns]
+        if not found:
+            raise ValueError(f"{path}: no parameter columns; expected some of: {', '.join(ids)}")
+        rooms, schools, rows = [], [], []
+        for line, rec in enumerate(reader, start=2):
+            rooms.append(rec[columns["room"]].strip())
+            schools.append(rec[columns["school"]].strip() if "school" in columns else "")
+            rows.append([_float(rec[columns[pid]], f"{path}:{line} {pid}") if pid in columns else np.nan
+                         for pid in ids])
+            if len(rooms) == batch_size:
+                yield rooms, schools, np.array(rows).T
+                rooms, schools, rows = [], [], []
+        if rooms:
+            yield rooms, schools, np.array(rows).T
+
+
+def count_rooms(path):
+    with open(path, "rb") as f:
+        return max(0, sum(1 for line in f if line.strip()) - 1)
+
+
+def write_sample_csv(path, n, edition="booklet", seed=0):
+    """Synthetic rooms: readings spread over each span +/- 10% (not below 0), about 3% left blank."""
+    rng = np.random.default_rng(seed)
+    ids = registry.ids(edition)
+    span = registry.stacked(edition)["span"]
+    values = span[:, :1] - 0.1 * (span[:, 1:] - span[:, :1]) + \
+        rng.random((len(ids), n)) * 1.2 * (span[:, 1:] - span[:, :1])
+    values = np.maximum(values, 0.0)  # no negative lux, hours or percentages
+    blank = rng.random(values.shape) < 0.03
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        out = csv.writer(f)
+        out.writerow(["school", "room"] + ids)
+        for j in range(n):
+            out.writerow([f"School {j // 40 + 1:03d}", f"R{j + 1:05d}"] +
+                         ["" if blank[i, j] else f"{values[i, j]:.4g}" for i in range(len(ids))])
+    return path
+
+
+# -----------------------------------------------------------------------------
+# One report
+# -----------------------------------------------------------------------------
+ZONE_WORDS = {zones.GOOD: "Optimal", zones.WARN: "Caution", zones.DANGER: "Risk", zones.MISSING: "Not measured"}
+
+
+def write_report(job):
+    """Write one room's DOCX (runs in a worker process with --workers > 1). Returns the path."""
+    edition = job["edition"]
+    specs = registry.specs(edition)
+    edges = registry.band_edges(edition)
+    values, codes, dist = job["values"], job["zones"], job["dist"]
+
+    doc = instrument(StreamingDocument())
+    doc.add_heading(f"Lighting report — {job['room']}", 0)
+    if job["school"]:
+        doc.add_paragraph(job["school"])
+    counts = {z: sum(1 for c in codes if c == z) for z in ZONE_WORDS}
+    score = "n/a" if job["score"] != job["score"] else f"{job['score']:.0%}"
+    doc.add_paragraph(f"Overall score: {score}   |   {counts[zones.GOOD]} optimal, {counts[zones.WARN]} caution, "
+                      f"{counts[zones.DANGER]} risk, {counts[zones.MISSING]} not measured")
+
+    fractions = [(v - e[0]) / (e[5] - e[0]) for v, e in zip(values, edges)]
+    with stage("room chart"):
+        chart = room_chart(edition, fractions, codes, job["use_cache"])
+    add_figure(doc, chart, Inches(6.0))
+
+    table = doc.add_table(rows=1, cols=4, style="Table Grid")
+    for i, text in enumerate(("Parameter", "Measured", "Zone", "Optimal range")):
+        table.cell(0, i).text = text
+    for spec, v, c, e in zip(specs, values, codes, edges):
+        cells = table.add_row()
+        cells[0].text = _short_title(spec)
+        cells[1].text = "—" if v != v else f"{v:g}"
+        cells[2].text = ZONE_WORDS[c]
+        cells[3].text = f"{e[2]:g}–{e[3]:g}"
+
+    doc.add_heading("What to fix", level=1)
+    todo = [(s, v, d, e) for s, v, c, d, e in zip(specs, values, codes, dist, edges)
+            if c in (zones.WARN, zones.DANGER)]
+    for spec, v, d, e in todo:
+        side = "below" if v < e[2] else "above"
+        doc.add_paragraph(f"{_short_title(spec)}: {v:g} is {d:g} {side} the optimal range ({e[2]:g}–{e[3]:g}).",
+                          style="List Bullet")
+    if not todo:
+        doc.add_paragraph("All measured parameters are in their optimal range.")
+    doc.save(job["path"])
+    return job["path"]
+
+
+def _file_name(room, taken):
+    name = re.sub(r"[^\w.-]+", "_", room).strip("._") or "room"
+    stem, k = name, 1
+    while name in taken:
+        k += 1
+        name = f"{stem}_{k}"
+    taken.add(name)
+    return name + ".docx"
+
+
+# -----------------------------------------------------------------------------
+# Batch run
+# -----------------------------------------------------------------------------
+def generate(csv_path, outdir=OUT_DIR, edition="booklet", workers=1, use_cache=True,
+             batch_size=BATCH_SIZE, progress=True):
+    """Write one report per room of csv_path into outdir; returns {rooms, seconds, rate, outdir}."""
+    ids = registry.ids(edition)
+    edges = np.asarray(registry.band_edges(edition), dtype=float)
+    os.makedirs(outdir, exist_ok=True)
+    with stage("count rooms"):
+        total = count_rooms(csv_path)
+    with stage("background"):
+        background(edition, use_cache)  # render/load once here so forked workers share it
+
+    t0 = time.perf_counter()
+    done = 0
+    taken = set()
+    workers = resolve_workers(workers, total)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        with open(os.path.join(outdir, "summary.csv"), "w", newline="", encoding="utf-8") as f:
+            summary = csv.writer(f)
+            summary.writerow(["school", "room", "score"] + ids + ["report"])
+            for rooms, schools, values in read_batches(csv_path, ids, batch_size):
+                with stage("classify"):
+                    codes, dist = zones.classify(values, edges[:, None, :])
+                    scores = response.score_rooms(values, edition)
+                jobs = [{
+                    "edition": edition, "use_cache": use_cache,
+                    "room": room, "school": school, "score": float(scores[j]),
+                    "values": values[:, j].tolist(), "zones": codes[:, j].tolist(), "dist": dist[:, j].tolist(),
+                    "path": os.path.join(outdir, _file_name(room, taken)),
+                } for j, (room, school) in enumerate(zip(rooms, schools))]
+
+                with stage("write reports"):
+                    paths = pool.map(write_report, jobs, chunksize=8) if pool else map(write_report, jobs)
+                    for job, path in zip(jobs, paths):
+                        summary.writerow([job["school"], job["room"], f"{job['score']:.3f}"] +
+                                         [ZONE_WORDS[c] for c in job["zones"]] + [os.path.basename(path)])
+                done += len(jobs)
+                count("rooms", len(jobs))
+                if progress:
+                    rate = done / (time.perf_counter() - t0)
+                    print(f"\r⏳ {done:,}/{total:,} rooms   {rate:,.0f} rooms/s", end="", flush=True)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    seconds = time.perf_counter() - t0
+    if progress:
+        print()
+    return {"rooms": done, "seconds": seconds, "rate": done / seconds if seconds else 0.0, "outdir": outdir}
+
+
+def describe(stats):
+    return (f"📋 {stats['rooms']:,} room reports in {stats['seconds']:.1f} s "
+            f"({stats['rate']:,.0f} rooms/s) → {stats['outdir']}")
+
+
+def add_rooms_args(parser):
+    parser.add_argument("csv", help="room table: room, [school,] one column per parameter id")
+    parser.add_argument("-o", "--outdir", default=OUT_DIR, help="report folder (default: ./room_reports)")
+    parser.add_argument("--edition", default="booklet", choices=("booklet", "merged", "final"),
+                        help="whose parameters and bands to report against (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="rooms read and classified at a time (default: %(default)s)")
+    parser.add_argument("--sample", type=int, metavar="N",
+                        help="first write N synthetic rooms to the CSV path (for trying it out)")
+
+
+def build(csv, outdir=OUT_DIR, edition="booklet", workers=1, use_cache=True, batch_size=BATCH_SIZE, sample=None):
+    if sample:
+        write_sample_csv(csv, sample, edition)
+        print(f"🧪 Wrote {sample:,} synthetic rooms to {csv}")
+    stats = generate(csv, outdir, edition, workers, use_cache, batch_size)
+    print(describe(stats))
+    return os.path.join(outdir, "summary.csv")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write one lighting compliance report per classroom.")
+    add_rooms_args(parser)
+    add_workers_arg(parser)
+    add_cache_arg(parser)
+    add_timing_args(parser)
+    args = parser.parse_args()
+    with session(args.timings, args.profile, "room_reports"):
+        build(args.csv, args.outdir, args.edition, args.workers, args.use_cache, args.batch_size, args.sample)
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Full-text search over the lighting literature (the corpus.py text store).
+
+  python search.py update                              # ingest new/changed papers, index them
+  python search.py query melanopic
+  python search.py query '"ugr 19"'                    # phrase
+  python search.py query '"flicker 100 hz"'
+  python search.py query 'lux:300..500 NEAR/12 classroom'
+  python search.py query 'k:5000.. alertness' -n 5
+
+The index is an SQLite file next to the corpus store
+($LIGHTING_CORPUS_DIR/search.sqlite). Each indexed unit is a page: a PDF page
+(corpus.py separates them with "\\f") or, for DOCX studies, a block of
+DOCX_PAGE_LINES lines. Per page the index keeps the token positions of every
+term, every number that carries a unit, and the page text for snippets.
+Indexing is incremental by content hash: update() runs corpus.ingest() and
+then indexes only texts it has not seen, and drops texts no longer in the
+corpus, so adding a paper to `School/school Papers` costs one paper.
+
+Query syntax (every clause must match on the same page):
+  word            a term; case-insensitive, numbers are terms too ("19", "12.5")
+  "a b c"         consecutive terms
+  unit:LO..HI     a number with that unit in [LO, HI]; LO.. / ..HI / unit:N also work.
+                  Units follow the number ("500 lux", "100 Hz", "4000 K") or, for
+                  ugr/cri/ra, precede it ("UGR 19", "CRI ≥ 80"): see UNITS
+  NEAR/N          all clauses within a window of N terms (anywhere on the page without it)
+
+Pages are ranked by BM25 over the clauses (a phrase or a numeric range counts
+as one term) and shown with a snippet around the closest match.
+
+Standard library only (text extraction itself needs corpus.py's requirements).
+"""
+
+import re
+import sys
+import math
+import time
+import array
+import sqlite3
+import argparse
+from pathlib import Path
+from collections import namedtuple
+
+import corpus
+from timing import stage, count, session, add_timing_args
+
+INDEX_NAME = "search.sqlite"
+# Bump when tokenizing or the schema changes; a stale index is rebuilt
+INDEX_VERSION = 1
+DOCX_PAGE_LINES = 40
+
+TOKEN = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|[^\W\d_]+")
+# Unit words after a number ("500 lx") and before it ("UGR 19"), mapped to the query unit
+SUFFIX_UNITS = {"lux": "lux", "lx": "lux", "hz": "hz", "k": "k", "kelvin": "k", "medi": "medi",
+                "nm": "nm", "h": "h", "hours": "h", "min": "min", "db": "db"}
+PREFIX_UNITS = {"ugr": "ugr", "cri": "cri", "ra": "cri"}
+UNITS = sorted(set(SUFFIX_UNITS.values()) | set(PREFIX_UNITS.values()))
+BM25_K1, BM25_B = 1.2, 0.75
+SNIPPET_TOKENS = 14  # context on either side of the match
+
+Result = namedtuple("Result", "path copies page score snippet")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS texts (sha TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, sha TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pages (id INTEGER PRIMARY KEY, sha TEXT NOT NULL, page INTEGER NOT NULL,
+                                  length INTEGER NOT NULL, text TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS pages_sha ON pages (sha);
+CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, page INTEGER NOT NULL, positions BLOB NOT NULL,
+                                     PRIMARY KEY (term, page)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_page ON postings (page);
+CREATE TABLE IF NOT EXISTS numbers (unit TEXT NOT NULL, value REAL NOT NULL, page INTEGER NOT NULL,
+                                    pos INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS numbers_unit_value ON numbers (unit, value);
+CREATE INDEX IF NOT EXISTS numbers_page ON numbers (page);
+"""
+
+
+# ---------- Tokens ----------
+def tokens(text):
+    """Lowercased terms of text, in order."""
+    return TOKEN.findall(text.lower())
+
+def _number(tok):
+    return float(tok.replace(",", "")) if tok[0].isdigit() else None
+
+def numbers(toks):
+    """(unit, value, position) for every number with a unit next to it."""
+    out = []
+    for i, tok in enumerate(toks):
+        value = _number(tok)
+        if value is None:
+            continue
+        unit = SUFFIX_UNITS.get(toks[i + 1]) if i + 1 < len(toks) else None
+        if unit is None and i:
+            unit = PREFIX_UNITS.get(toks[i - 1])
+        if unit is not None:
+            out.append((unit, value, i))
+    return out
+
+def pages(text, docx=False):
+    """Split a stored corpus text into (page number, text), numbered from 1."""
+    if not docx:
+        return list(enumerate(text.split("\f"), 1))
+    lines = text.split("\n")
+    return [(i // DOCX_PAGE_LINES + 1, "\n".join(lines[i:i + DOCX_PAGE_LINES]))
+            for i in range(0, len(lines), DOCX_PAGE_LINES)]
+
+
+# ---------- Index ----------
+def connect(store_dir=None):
+    root = Path(store_dir or corpus.STORE_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(root / INDEX_NAME))
+    db.executescript(SCHEMA)
+    row = db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    if row is None or int(row[0]) != INDEX_VERSION:
+        with db:
+            for table in ("texts", "files", "pages", "postings", "numbers"):
+                db.execute(f"DELETE FROM {table}")
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+    return db
+
+def _index_text(db, sha, text, docx):
+    for page, page_text in pages(text, docx):
+        toks = tokens(page_text)
+        if not toks:
+            continue
+        page_id = db.execute("INSERT INTO pages (sha, page, length, text) VALUES (?, ?, ?, ?)",
+                             (sha, page, len(toks), page_text)).lastrowid
+        positions = {}
+        for i, tok in enumerate(toks):
+            positions.setdefault(tok, array.array("I")).append(i)
+        db.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                       ((term, page_id, pos.tobytes()) for term, pos in positions.items()))
+        db.executemany("INSERT INTO numbers VALUES (?, ?, ?, ?)",
+                       ((unit, value, page_id, i) for unit, value, i in numbers(toks)))
+        count("pages indexed")
+
+def _drop_text(db, sha):
+    ids = [r[0] for r in db.execute("SELECT id FROM pages WHERE sha = ?", (sha,))]
+    db.executemany("DELETE FROM postings WHERE page = ?", ((i,) for i in ids))
+    db.executemany("DELETE FROM numbers WHERE page = ?", ((i,) for i in ids))
+    db.execute("DELETE FROM pages WHERE sha = ?", (sha,))
+    db.execute("DELETE FROM texts WHERE sha = ?", (sha,))
+
+def update(store_dir=None, workers=0, ingest=True):
+    """Bring the index up to date with the corpus store; returns (texts added, texts dropped)."""
+    if ingest:
+        with stage("ingest corpus"):
+            corpus.ingest(workers=workers, store_dir=store_dir)
+    files = corpus.load_index(store_dir).get("files", {})
+    wanted = {}
+    for path, e in files.items():
+        wanted.setdefault(e["sha256"], path)
+
+    db = connect(store_dir)
+    with db, stage("index texts"):
+        have = {r[0] for r in db.execute("SELECT sha FROM texts")}
+        for sha in have - wanted.keys():
+            _drop_text(db, sha)
+        added = 0
+        for sha, path in wanted.items():
+            if sha in have:
+                continue
+            text = corpus.read_text(sha, store_dir)
+            if text is None:
+                continue
+            _index_text(db, sha, text, docx=path.lower().endswith(".docx"))
+            db.execute("INSERT INTO texts VALUES (?)", (sha,))
+            print(f"Indexed: {path}")
+            added += 1
+        db.execute("DELETE FROM files")
+        db.executemany("INSERT INTO files VALUES (?, ?)", ((p, e["sha256"]) for p, e in files.items()))
+    db.close()
+    count("texts indexed", added)
+    return added, len(have - wanted.keys())
+
+
+# ---------- Queries ----------
+Clause = namedtuple("Clause", "kind arg")  # ("term", str) | ("phrase", [str]) | ("number", (unit, lo, hi))
+
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+_NUM = r"(-?\d[\d,]*(?:\.\d+)?)?"
+_RANGE = re.compile(r"^([a-z]+):" + _NUM + r"(\.\.)?" + _NUM + "$")
+_NEAR = re.compile(r"^near/(\d+)$")
+
+def parse(query):
+    """Query string -> ([Clause], near window or None)."""
+    clauses, near = [], None
+    for phrase, word in _QUERY.findall(query.lower()):
+        if phrase:
+            toks = tokens(phrase)
+            if len(toks) == 1:
+                clauses.append(Clause("term", toks[0]))
+            elif toks:
+                clauses.append(Clause("phrase", toks))
+            continue
+        m = _NEAR.match(word)
+        if m:
+            near = int(m.group(1))
+            continue
+        m = _RANGE.match(word)
+        if m and (m.group(2) or m.group(4)):
+            unit = SUFFIX_UNITS.get(m.group(1)) or PREFIX_UNITS.get(m.group(1)) or m.group(1)
+            if unit not in UNITS:
+                raise ValueError(f"unknown unit {m.group(1)!r} (expected one of {', '.join(UNITS)})")
+            lo = float(m.group(2).replace(",", "")) if m.group(2) else -math.inf
+            hi = float(m.group(4).replace(",", "")) if m.group(4) else (math.inf if m.group(3) else lo)
+            clauses.append(Clause("number", (unit, lo, hi)))
+            continue
+        clauses.extend(Clause("term", t) for t in tokens(word))
+    return clauses, near
+
+def _postings(db, term):
+    return {page: array.array("I", blob) for page, blob in
+            db.execute("SELECT page, positions FROM postings WHERE term = ?", (term,))}
+
+def _matches(db, clause):
+    """{page id: sorted match positions} for one clause."""
+    if clause.kind == "term":
+        return {page: list(pos) for page, pos in _postings(db, clause.arg).items()}
+    if clause.kind == "number":
+        unit, lo, hi = clause.arg
+        out = {}
+        for page, pos in db.execute("SELECT page, pos FROM numbers WHERE unit = ? AND value BETWEEN ? AND ?",
+                                    (unit, lo, hi)):
+            out.setdefault(page, []).append(pos)
+        return {page: sorted(pos) for page, pos in out.items()}
+    lists = [_postings(db, t) for t in clause.arg]
+    pages_ = set.intersection(*(set(p) for p in lists))
+    out = {}
+    for page in pages_:
+        rest = [set(p[page]) for p in lists[1:]]
+        starts = [s for s in lists[0][page] if all(s + k + 1 in r for k, r in enumerate(rest))]
+        if starts:
+            out[page] = starts
+    return out
+
+def _window(lists, width):
+    """Smallest span holding one position from every list: (start, end), or None if wider than width."""
+    heads = [(lst[0], i, 0) for i, lst in enumerate(lists)]
+    best = None
+    while True:
+        lo = min(heads)
+        hi = max(h[0] for h in heads)
+        if best is None or hi - lo[0] < best[1] - best[0]:
+            best = (lo[0], hi)
+        _, i, j = lo
+        if j + 1 == len(lists[i]):
+            break
+        heads[heads.index(lo)] = (lists[i][j + 1], i, j + 1)
+    if width is not None and best[1] - best[0] > width:
+        return None
+    return best
+
+def _snippet(text, start, end, marks):
+    spans = [m.span() for m in TOKEN.finditer(text.lower())]
+    a = spans[max(start - SNIPPET_TOKENS, 0)][0]
+    b = spans[min(end + SNIPPET_TOKENS, len(spans) - 1)][1]
+    out, last = [], a
+    for k in range(max(start - SNIPPET_TOKENS, 0), min(end + SNIPPET_TOKENS, len(spans) - 1) + 1):
+        if k in marks:
+            s, e = spans[k]
+            out.append(text[last:s] + "«" + text[s:e] + "»")
+            last = e
+    out.append(text[last:b])
+    snippet = " ".join("".join(out).split())
+    return ("… " if a else "") + snippet + (" …" if b < len(text) else "")
+
+def search(query, limit=10, store_dir=None, db=None):
+    """Ranked Results for query (see the module docstring for the syntax)."""
+    clauses, near = parse(query)
+    if not clauses:
+        return []
+    own = db is None
+    db = db or connect(store_dir)
+    try:
+        matches = [_matches(db, c) for c in clauses]
+        candidates = set.intersection(*(set(m) for m in matches))
+        if not candidates:
+            return []
+        n_pages, avg_len = db.execute("SELECT COUNT(*), AVG(length) FROM pages").fetchone()
+        idf = [math.log(1 + (n_pages - len(m) + 0.5) / (len(m) + 0.5)) for m in matches]
+
+        q = ",".join("?" * len(candidates))
+        info = {r[0]: r[1:] for r in db.execute(
+            f"SELECT id, sha, page, length FROM pages WHERE id IN ({q})", tuple(candidates))}
+        scored = []
+        for page in candidates:
+            lists = [m[page] for m in matches]
+            span = _window(lists, near)
+            if span is None:
+                continue
+            length = info[page][2]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+            score = sum(w * len(lst) * (BM25_K1 + 1) / (len(lst) + norm) for w, lst in zip(idf, lists))
+            if near is not None:
+                score *= 1 + 1 / (1 + span[1] - span[0])  # tighter matches first
+            scored.append((score, page, span, lists))
+        scored.sort(key=lambda s: -s[0])
+
+        results = []
+        for score, page, span, lists in scored[:limit]:
+            sha, page_no, _ = info[page]
+            paths = [r[0] for r in db.execute("SELECT path FROM files WHERE sha = ? ORDER BY path", (sha,))]
+            text = db.execute("SELECT text FROM pages WHERE id = ?", (page,)).fetchone()[0]
+            marks = set()
+            for clause, lst in zip(clauses, lists):
+                width = len(clause.arg) if clause.kind == "phrase" else 1
+                marks.update(p + k for p in lst if span[0] - SNIPPET_TOKENS <= p <= span[1] + SNIPPET_TOKENS
+                             for k in range(width))
+            results.append(Result(paths[0] if paths else sha, paths[1:], page_no, round(score, 3),
+                                  _snippet(text, span[0], span[1], marks)))
+        return results
+    finally:
+        if own:
+            db.close()
+
+
+# ---------- CLI ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index and search the text of the research-paper corpus.")
+    parser.add_argument("command", choices=["update", "query", "info"])
+    parser.add_argument("query", nargs="*", help="query for 'query' (see search.py's docstring)")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="results to show (default: 10)")
+    parser.add_argument("--dir", type=Path, default=None, help=f"corpus store (default: {corpus.STORE_DIR})")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="extraction processes for 'update'")
+    add_timing_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.command == "update":
+        with session(args.timings, args.profile, "search"):
+            added, dropped = update(args.dir, args.workers)
+        print(f"✅ Index up to date: {added} texts added, {dropped} dropped.")
+        return 0
+    if args.command == "info":
+        db = connect(args.dir)
+        texts, files = (db.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("texts", "files"))
+        n_pages, terms = db.execute("SELECT COUNT(*), (SELECT COUNT(DISTINCT term) FROM postings) FROM pages").fetchone()
+        n_numbers = db.execute("SELECT COUNT(*) FROM numbers").fetchone()[0]
+        db.close()
+        print("Search index:", Path(args.dir or corpus.STORE_DIR) / INDEX_NAME)
+        print(f"  files: {files} ({texts} distinct texts), pages: {n_pages}")
+        print(f"  terms: {terms}, numbers with units: {n_numbers}")
+        return 0
+
+    if not args.query:
+        parser.error("query needs search terms")
+    t0 = time.perf_counter()
+    try:
+        results = search(" ".join(args.query), args.limit, args.dir)
+    except ValueError as e:
+        parser.error(str(e))
+    ms = (time.perf_counter() - t0) * 1000
+    for r in results:
+        copies = f" (+{len(r.copies)} copy)" if r.copies else ""
+        print(f"{r.score:7.2f}  {r.path}{copies}, page {r.page}")
+        print(f"         {r.snippet}")
+    print(f"{len(results)} result(s) in {ms:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,16 +6,30 @@ Creates a single DOCX booklet with:
 - One combined figure per chapter (curve + green/yellow/red zones)
 - Live URLs for every reference
 
+With --backend pdf the same booklet is written directly as PDF (pdf_writer.py).
+
 Requirements:
-  pip install python-docx matplotlib numpy
+  pip install python-docx matplotlib numpy pillow
 """
 
 import os
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from docx import Document
 from docx.shared import Inches
 
+import params
+import registry
+import figcache
+import imgopt
+from docx_stream import StreamingDocument, add_stream_arg
+from pdf_writer import PdfDocument, add_backend_arg
+from timing import stage, count, instrument, session, add_timing_args
+from figures import (render_chapter_figures, iter_chapter_figures, band_canvas, CANVAS_CODE, add_figure,
+                     write_images, add_workers_arg, add_cache_arg, add_save_images_arg, add_optimize_arg,
+                     add_format_arg, add_pipeline_arg)
+
 # -----------------------------------------------------------------------------
 # 0) Matplotlib Style Switch (change this to any installed style you like)
 #    Examples: "default", "classic", "seaborn-v0_8", "ggplot", "bmh", "dark_background"
@@ -30,6 +44,9 @@ COLOR_WARN  = "#ffbf00"  # yellow/amber band
 COLOR_BAD   = "#d62728"  # red band
 COLOR_MARK  = "#555555"  # vertical guideline markers
 
+FIG_SIZE = (7.0, 3.0)
+FIG_DPI  = 200
+
 # -----------------------------------------------------------------------------
 # 1) Utility helpers
 # -----------------------------------------------------------------------------
@@ -37,20 +54,15 @@ def ensure_dir(path):
     if not os.path.isdir(path):
         os.makedirs(path, exist_ok=True)
 
-def add_bands(ax, xlim, good, warn, danger):
-    """Draw green/yellow/red bands along the x-axis."""
+def add_bands(xlim, good, warn, danger):
+    """
+    Return (canvas, ax) with green/yellow/red bands along the x-axis.
+    The band figure is built once per process and reused for every chart.
+    """
     # danger is the full span; warn is inner band; good is core
-    ax.axvspan(danger[0], warn[0], color=COLOR_BAD, alpha=0.25, label="Risk")
-    ax.axvspan(warn[0],   good[0], color=COLOR_WARN, alpha=0.30, label="Caution")
-    ax.axvspan(good[0],   good[1], color=COLOR_GOOD, alpha=0.30, label="Optimal")
-    ax.axvspan(good[1],   warn[1], color=COLOR_WARN, alpha=0.30)
-    ax.axvspan(warn[1],   danger[1], color=COLOR_BAD, alpha=0.25)
-
-    ax.set_xlim(*xlim)
-
-def smooth_curve(x, anchors_x, anchors_y):
-    """Return smooth y by interpolating anchor points across x."""
-    return np.interp(x, anchors_x, anchors_y)
+    canvas = band_canvas(FIG_SIZE, colors=(COLOR_BAD, COLOR_WARN, COLOR_GOOD), alphas=(0.25, 0.30, 0.30),
+                         labels=("Risk", "Caution", "Optimal"), style=MATPLOTLIB_STYLE)
+    return canvas, canvas.start(xlim, good, warn, danger)
 
 def clean_ticks(ax, x_min, x_max, n=6, as_int=False):
     ticks = np.linspace(x_min, x_max, n)
@@ -58,211 +70,16 @@ def clean_ticks(ax, x_min, x_max, n=6, as_int=False):
         ticks = np.round(ticks).astype(int)
     ax.set_xticks(ticks)
 
-def save_fig(fig, out_path):
-    fig.tight_layout()
-    fig.savefig(out_path, dpi=200, bbox_inches="tight")
-    plt.close(fig)
+def save_fig(canvas, fmt="png", dpi=FIG_DPI):
+    """Finish a chart and return it as PNG (or SVG) bytes (nothing is written to disk)."""
+    return canvas.finish(dpi=dpi, bbox_inches="tight", fmt=fmt)
 
 # -----------------------------------------------------------------------------
-# 2) Parameter specifications
-#    Each entry defines:
-#      - x-range (min, max)
-#      - safe/caution/danger bands
-#      - anchor points -> interpolated biological curve
-#      - labels and references (title + url)
+# 2) Parameter specifications (params.BOOKLET; curves compiled by registry.py)
 # -----------------------------------------------------------------------------
 
-PARAMS = [
-    # 1) CCT
-    {
-        "title": "CCT (Correlated Color Temperature, K)",
-        "xspan": (2000, 7000),
-        "bands": { "good": (4000, 5000), "warn": (3000, 6500), "danger": (2000, 7000) },
-        # Biological proxy: daytime alerting potential / melatonin suppression tendency (relative %)
-        # Anchors inspired by lab studies showing higher arousal with cooler CCT in day.
-        "anchors": {
-            "x":  [2000, 2700, 3000, 3500, 4000, 5000, 6500, 7000],
-            "y":  [10,   18,   25,   45,   65,   70,   60,   55],  # %
-        },
-        "y_label": "Estimated Alerting Potential (%)",
-        "x_label": "CCT (Kelvin)",
-        "notes": (
-            "Daytime 4000–5000 K generally supports alertness and visual comfort; "
-            "short task-specific use of 6500 K may boost performance but can increase discomfort if overused."
-        ),
-        "refs": [
-            ("EN 12464-1 overview (indoor workplaces: illuminance, UGR, CRI)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
-            ("Park et al., 2015: CCT, EEG & task performance", "https://pmc.ncbi.nlm.nih.gov/articles/PMC4668153/"),
-            ("Chen et al., 2022: CCT × illuminance effects", "https://www.mdpi.com/1996-1073/15/12/4477"),
-        ],
-        "markers": [
-            (4000, "Typical classroom"),
-            (5000, "Upper preferred")
-        ],
-    },
-
-    # 2) CRI
-    {
-        "title": "CRI (Color Rendering Index, Ra)",
-        "xspan": (60, 100),
-        "bands": { "good": (80, 100), "warn": (70, 80), "danger": (60, 100) },
-        # Biological/visual performance proxy (% correct color/visual recognition)
-        "anchors": {
-            "x": [60, 70, 75, 80, 85, 90, 95, 100],
-            "y": [50, 60, 70, 82, 90, 96, 99, 100],  # %
-        },
-        "y_label": "Visual Color Fidelity / Recognition (%)",
-        "x_label": "CRI (Ra)",
-        "notes": "CRI ≥80 is generally recommended for classrooms; ≥90 for art/graphics where color evaluation matters.",
-        "refs": [
-            ("EN 12464-1 overview (Ra requirements)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
-        ],
-        "markers": [
-            (80, "Baseline classroom"),
-            (90, "Art / graphics")
-        ],
-    },
-
-    # 3) Flicker
-    {
-        "title": "Flicker (Percent Modulation, typical LED)",
-        "xspan": (0, 50),
-        "bands": { "good": (0, 5), "warn": (5, 20), "danger": (0, 50) },
-        # Biological risk proxy: headache/eyestrain risk index (%) – increases with modulation depth
-        "anchors": {
-            "x": [0, 2, 5, 10, 20, 30, 40, 50],
-            "y": [0, 5, 10, 25, 50, 70, 85, 95],  # %
-        },
-        "y_label": "Estimated Adverse Effect Risk (%)",
-        "x_label": "Percent Flicker (%)",
-        "notes": "Keep percent flicker as low as practical (<5%). Avoid low-frequency PWM; follow IEEE 1789 guidance.",
-        "refs": [
-            ("IEEE 1789-2015: Flicker Recommended Practice (PDF)", "https://www.lisungroup.com/wp-content/uploads/2020/02/IEEE-2015-STANDARDS-1789-Standard-Free-Download.pdf"),
-            ("DOE/LightFair: Understanding IEEE Flicker Practice (PDF)", "https://www.energy.gov/sites/default/files/2022-11/ssl-miller-lehman_flicker_lightfair2015.pdf"),
-            ("Miller et al., 2022 review (PDF)", "https://www.energy.gov/sites/default/files/2022-08/ssl-miller-etal-2022-LRT-flicker-review-tlm-stimulus-response.pdf"),
-        ],
-        "markers": [
-            (5, "Preferred max"),
-            (20, "High risk")
-        ],
-    },
-
-    # 4) Glare (UGR)
-    {
-        "title": "Glare (Unified Glare Rating, UGR)",
-        "xspan": (10, 30),
-        "bands": { "good": (10, 19), "warn": (19, 22), "danger": (10, 30) },
-        # Biological/comfort proxy: discomfort probability (%). Higher UGR -> higher discomfort.
-        "anchors": {
-            "x": [10, 13, 16, 19, 22, 25, 28, 30],
-            "y": [5, 8, 15, 30, 55, 75, 90, 95],  # %
-        },
-        "y_label": "Estimated Discomfort Probability (%)",
-        "x_label": "UGR",
-        "notes": "Aim UGR <19 for classrooms; even lower (≈16–18) near screens/IBs to minimize discomfort and distraction.",
-        "refs": [
-            ("CIBSE Factfile: Importance of glare & calculating UGR (PDF)", "https://www.cibse.org/media/polbabib/factfile-15-the-importance-of-glare-and-calculating-ugr-jul2019.pdf"),
-            ("EN 12464-1 overview (UGR contexts)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
-        ],
-        "markers": [
-            (19, "Classroom max"),
-            (16, "Screen work")
-        ],
-    },
-
-    # 5) Melanopic EDI
-    {
-        "title": "Melanopic EDI (melanopic lux at eye, vertical)",
-        "xspan": (0, 800),
-        "bands": { "good": (250, 500), "warn": (100, 250), "danger": (0, 800) },
-        # Biological effect: melatonin suppression (%) under daytime conditions (saturating response)
-        "anchors": {
-            "x": [0, 20, 50, 100, 250, 500, 800],
-            "y": [0, 5, 15, 35, 65, 80, 90],  # %
-        },
-        "y_label": "Estimated Melatonin Suppression (%)",
-        "x_label": "Melanopic EDI (lux)",
-        "notes": "Provide ≥250 melanopic EDI during the day for circadian entrainment and alertness (measured vertically at ~1.2 m).",
-        "refs": [
-            ("Brown et al., 2022 (PLOS Biology): Consensus recommendations", "https://journals.plos.org/plosbiology/article?id=10.1371/journal.pbio.3001571"),
-            ("Brown et al., 2022 (PMC)", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/"),
-            ("WELL v2 – Circadian Lighting context (Article)", "https://resources.wellcertified.com/articles/circadian-rhythms/"),
-        ],
-        "markers": [
-            (250, "Daytime target (min)"),
-            (500, "Robust daytime")
-        ],
-    },
-
-    # 6) Vertical Illuminance
-    {
-        "title": "Vertical Illuminance (lux at eye/face)",
-        "xspan": (50, 1000),
-        "bands": { "good": (300, 500), "warn": (200, 800), "danger": (50, 1000) },
-        # Biological effect: Circadian Stimulus (CS, 0-0.7+) proxy (increases with vertical lx; saturates)
-        "anchors": {
-            "x": [50, 100, 150, 300, 500, 800, 1000],
-            "y": [0.05, 0.12, 0.22, 0.40, 0.55, 0.65, 0.70],  # CS (unitless)
-        },
-        "y_label": "Circadian Stimulus (CS, unitless)",
-        "x_label": "Vertical Illuminance (lux)",
-        "notes": "Aim ~300–500 lx vertical on faces/eye for daytime non-visual benefits; much lower levels are advisable in evening school events.",
-        "refs": [
-            ("EN 12464-1 overview; vertical/ambient aspects", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
-            ("WELL v2 circadian context (Article)", "https://resources.wellcertified.com/articles/circadian-rhythms/"),
-        ],
-        "markers": [
-            (300, "Daytime min"),
-            (500, "Strong CS")
-        ],
-    },
-
-    # 7) Exposure Duration
-    {
-        "title": "Exposure Duration (hours of daytime light meeting target)",
-        "xspan": (0, 8),
-        "bands": { "good": (2, 4), "warn": (1, 6), "danger": (0, 8) },
-        # Biological effect: cumulative melatonin suppression (%) at moderate melanopic stimulus
-        "anchors": {
-            "x": [0, 0.5, 1, 2, 3, 4, 6, 8],
-            "y": [0, 10, 20, 40, 60, 75, 90, 95],  # %
-        },
-        "y_label": "Estimated Cumulative Melatonin Suppression (%)",
-        "x_label": "Exposure Duration (hours)",
-        "notes": "Sustained daytime exposure (~2–4 h at adequate spectrum/levels) supports alertness and entrainment; avoid excessive high-intensity late-day exposure.",
-        "refs": [
-            ("Brown et al., 2022 (PMC): Day vs evening guidance", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/"),
-        ],
-        "markers": [
-            (2, "Effective"),
-            (4, "Robust")
-        ],
-    },
-
-    # 8) Horizontal Illuminance
-    {
-        "title": "Horizontal Illuminance (desk/task, lux)",
-        "xspan": (100, 1500),
-        "bands": { "good": (300, 500), "warn": (200, 1000), "danger": (100, 1500) },
-        # Biological/visual performance: % task speed/accuracy vs lx (saturating)
-        "anchors": {
-            "x": [100, 200, 300, 500, 750, 1000, 1500],
-            "y": [60, 75, 85, 95, 98, 99, 99],  # %
-        },
-        "y_label": "Visual Task Performance (%)",
-        "x_label": "Horizontal Illuminance (lux)",
-        "notes": "Provide 300–500 lx at desks for general classrooms; 500–750+ lx for labs/graphics. Short-term 800–1000 lx can be used for exam focus.",
-        "refs": [
-            ("EN 12464-1 overview (classroom/task lx)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
-            ("MDPI (2025) review referencing EN 12464-1 classroom levels", "https://www.mdpi.com/2075-5309/15/8/1233"),
-        ],
-        "markers": [
-            (300, "General min"),
-            (500, "Classroom target"),
-            (750, "Lab/graphics")
-        ],
-    },
-]
+EDITION = "booklet"
+PARAMS = params.BOOKLET
 
 # -----------------------------------------------------------------------------
 # 3) Front-matter text blocks (Problem • Idea • Study • Solution)
@@ -337,49 +154,31 @@ RECS = [
 # -----------------------------------------------------------------------------
 OUT_DIR = os.path.join(os.getcwd(), "school_lighting_booklet_output")
 IMG_DIR = os.path.join(OUT_DIR, "images")
-ensure_dir(OUT_DIR)
-ensure_dir(IMG_DIR)
-
-doc = Document()
-doc.add_heading("Lighting in Schools: Biological & Cognitive Effects", 0)
-doc.add_paragraph("A referenced booklet on eight lighting parameters and their effects on student concentration, biology, and psychology.")
-
-# Front-matter sections
-doc.add_heading("The Problem", level=1)
-doc.add_paragraph(PROBLEM_TXT)
-
-doc.add_heading("The Idea", level=1)
-doc.add_paragraph(IDEA_TXT)
-
-doc.add_heading("The Study (What We Compare)", level=1)
-doc.add_paragraph(STUDY_TXT)
-
-doc.add_heading("Solution (Targets by Age & Environment)", level=1)
-doc.add_paragraph(SOLUTION_INTRO)
 
-for (who_where, lx, ugr, cri, medi, cct, note, refs) in RECS:
-    doc.add_paragraph(f"• {who_where}")
-    doc.add_paragraph(f"  - {lx}   |   {ugr}   |   {cri}")
-    doc.add_paragraph(f"  - {medi}   |   {cct}")
-    doc.add_paragraph(f"  - Notes: {note}")
-    doc.add_paragraph("  - References:")
-    for title, url in refs:
-        doc.add_paragraph(f"    • {title} — {url}")
-
-# Chapters
-doc.add_heading("Chapters: Parameter-by-Parameter", level=1)
+# Master References section
+ALL_REFS = [
+    ("EN 12464-1 overview (indoor workplaces: illuminance, UGR, CRI)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
+    ("CIBSE Factfile: Importance of glare & calculating UGR (PDF)", "https://www.cibse.org/media/polbabib/factfile-15-the-importance-of-glare-and-calculating-ugr-jul2019.pdf"),
+    ("Brown et al., 2022 (PLOS Biology): Consensus recommendations", "https://journals.plos.org/plosbiology/article?id=10.1371/journal.pbio.3001571"),
+    ("Brown et al., 2022 (PMC mirror)", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/"),
+    ("WELL v2 Circadian context article (IWBI)", "https://resources.wellcertified.com/articles/circadian-rhythms/"),
+    ("IEEE 1789-2015 (PDF copy)", "https://www.lisungroup.com/wp-content/uploads/2020/02/IEEE-2015-STANDARDS-1789-Standard-Free-Download.pdf"),
+    ("DOE/LightFair deck on IEEE 1789 (PDF)", "https://www.energy.gov/sites/default/files/2022-11/ssl-miller-lehman_flicker_lightfair2015.pdf"),
+    ("Miller et al., 2022 flicker review (PDF)", "https://www.energy.gov/sites/default/files/2022-08/ssl-miller-etal-2022-LRT-flicker-review-tlm-stimulus-response.pdf"),
+    ("Park et al., 2015: CCT, EEG & task performance (PMC)", "https://pmc.ncbi.nlm.nih.gov/articles/PMC4668153/"),
+    ("Chen et al., 2022: CCT × illuminance (MDPI)", "https://www.mdpi.com/1996-1073/15/12/4477"),
+    ("MDPI 2025 review referencing EN 12464-1 classroom levels", "https://www.mdpi.com/2075-5309/15/8/1233"),
+]
 
-for p in PARAMS:
+def render_param(p, fmt="png", dpi=FIG_DPI):
+    """Render one chapter figure to PNG/SVG bytes (runs in a worker process when --workers > 1)."""
     title = p["title"]
     x0, x1 = p["xspan"]
-    x = np.linspace(x0, x1, 400)
-
-    # Interpolate biological curve
-    y = smooth_curve(x, p["anchors"]["x"], p["anchors"]["y"])
+    # Interpolated biological curve, precompiled by the registry
+    x, y = registry.curve(EDITION, p["id"])
 
     # Plot
-    fig, ax = plt.subplots(figsize=(7.0, 3.0))
-    add_bands(ax, (x0, x1), p["bands"]["good"], p["bands"]["warn"], p["bands"]["danger"])
+    canvas, ax = add_bands((x0, x1), p["bands"]["good"], p["bands"]["warn"], p["bands"]["danger"])
 
     ax.plot(x, y, color=COLOR_CURVE, linewidth=2.2, label="Biological Response")
     # Vertical markers (e.g., recommended values)
@@ -394,43 +193,117 @@ for p in PARAMS:
     as_int = isinstance(x0, (int, np.integer)) and isinstance(x1, (int, np.integer))
     clean_ticks(ax, x0, x1, n=6, as_int=as_int)
 
-    # Save
-    safe_name = title.replace(" ", "_").replace("/", "_").replace("(", "").replace(")", "").replace(":", "")
-    img_path = os.path.join(IMG_DIR, f"{safe_name}.png")
-    save_fig(fig, img_path)
-
-    # Add to DOCX
-    doc.add_heading(title, level=2)
-    doc.add_paragraph(p["notes"])
-    bands = p["bands"]
-    doc.add_paragraph(f"Optimal: {bands['good'][0]}–{bands['good'][1]}   |   Caution: {bands['warn'][0]}–{bands['warn'][1]} (context dependent)")
-    doc.add_picture(img_path, width=Inches(6.0))
-    doc.add_paragraph("References:")
-    for (t, u) in p["refs"]:
+    return save_fig(canvas, fmt, dpi)
+
+def image_path(p, ext=".png"):
+    safe_name = p["title"].replace(" ", "_").replace("/", "_").replace("(", "").replace(")", "").replace(":", "")
+    return os.path.join(IMG_DIR, f"{safe_name}{ext}")
+
+def figure_key(p, fmt="png", dpi=FIG_DPI):
+    """Figure cache key: everything that changes the pixels of render_param's output."""
+    return figcache.figure_key(
+        p, code=(render_param, add_bands, registry.compile_curve, registry.interpolate_curve,
+                 clean_ticks, save_fig, *CANVAS_CODE),
+        style=MATPLOTLIB_STYLE, fmt=fmt, dpi=dpi, figsize=FIG_SIZE,
+        colors=(COLOR_CURVE, COLOR_GOOD, COLOR_WARN, COLOR_BAD, COLOR_MARK),
+    )
+
+def build(workers=1, use_cache=True, save_images=False, optimize_images=True, figure_format="png",
+          stream=False, backend="docx", pipeline=False, lossy_images=False):
+    ensure_dir(OUT_DIR)
+
+    if backend == "pdf":  # same content, written straight to PDF with vector figures
+        doc, figure_format = instrument(PdfDocument()), "pdf"
+    else:
+        doc = instrument(StreamingDocument() if stream else Document())
+    doc.add_heading("Lighting in Schools: Biological & Cognitive Effects", 0)
+    doc.add_paragraph("A referenced booklet on eight lighting parameters and their effects on student concentration, biology, and psychology.")
+
+    # Front-matter sections
+    doc.add_heading("The Problem", level=1)
+    doc.add_paragraph(PROBLEM_TXT)
+
+    doc.add_heading("The Idea", level=1)
+    doc.add_paragraph(IDEA_TXT)
+
+    doc.add_heading("The Study (What We Compare)", level=1)
+    doc.add_paragraph(STUDY_TXT)
+
+    doc.add_heading("Solution (Targets by Age & Environment)", level=1)
+    doc.add_paragraph(SOLUTION_INTRO)
+
+    for (who_where, lx, ugr, cri, medi, cct, note, refs) in RECS:
+        doc.add_paragraph(f"• {who_where}")
+        doc.add_paragraph(f"  - {lx}   |   {ugr}   |   {cri}")
+        doc.add_paragraph(f"  - {medi}   |   {cct}")
+        doc.add_paragraph(f"  - Notes: {note}")
+        doc.add_paragraph("  - References:")
+        for title, url in refs:
+            doc.add_paragraph(f"    • {title} — {url}")
+
+    # Chapters: render every figure first (in parallel if requested), then assemble in order;
+    # with --pipeline the figures are rendered in the background as the chapters are assembled
+    doc.add_heading("Chapters: Parameter-by-Parameter", level=1)
+    if pipeline:
+        figs = iter_chapter_figures(render_param, PARAMS, figure_format, FIG_DPI, workers=workers,
+                                    cache_key=figure_key if use_cache else None)
+    else:
+        with stage("render figures"):
+            figs = render_chapter_figures(render_param, PARAMS, figure_format, FIG_DPI, workers=workers,
+                                          cache_key=figure_key if use_cache else None)
+    rendered = []
+    for p, (png, svg) in zip(PARAMS, figs):
+        rendered.append((png, svg))
+        doc.add_heading(p["title"], level=2)
+        doc.add_paragraph(p["notes"])
+        bands = p["bands"]
+        doc.add_paragraph(f"Optimal: {bands['good'][0]}–{bands['good'][1]}   |   Caution: {bands['warn'][0]}–{bands['warn'][1]} (context dependent)")
+        add_figure(doc, png, Inches(6.0), svg=svg)
+        doc.add_paragraph("References:")
+        for (t, u) in p["refs"]:
+            doc.add_paragraph(f"• {t} — {u}")
+
+    count("figures", len(rendered))
+    if save_images:
+        with stage("write images"):
+            write_images([png for png, _ in rendered], [image_path(p, ".pdf" if figure_format == "pdf" else ".png")
+                                                        for p in PARAMS])
+            if figure_format == "svg":
+                write_images([svg for _, svg in rendered], [image_path(p, ".svg") for p in PARAMS])
+
+    doc.add_heading("Master Reference List (Live URLs)", level=1)
+    for t, u in ALL_REFS:
         doc.add_paragraph(f"• {t} — {u}")
 
-# Master References section
-doc.add_heading("Master Reference List (Live URLs)", level=1)
-ALL_REFS = [
-    ("EN 12464-1 overview (indoor workplaces: illuminance, UGR, CRI)", "https://www.performanceinlighting.com/mo/en/en-12464-1"),
-    ("CIBSE Factfile: Importance of glare & calculating UGR (PDF)", "https://www.cibse.org/media/polbabib/factfile-15-the-importance-of-glare-and-calculating-ugr-jul2019.pdf"),
-    ("Brown et al., 2022 (PLOS Biology): Consensus recommendations", "https://journals.plos.org/plosbiology/article?id=10.1371/journal.pbio.3001571"),
-    ("Brown et al., 2022 (PMC mirror)", "https://pmc.ncbi.nlm.nih.gov/articles/PMC8929548/"),
-    ("WELL v2 Circadian context article (IWBI)", "https://resources.wellcertified.com/articles/circadian-rhythms/"),
-    ("IEEE 1789-2015 (PDF copy)", "https://www.lisungroup.com/wp-content/uploads/2020/02/IEEE-2015-STANDARDS-1789-Standard-Free-Download.pdf"),
-    ("DOE/LightFair deck on IEEE 1789 (PDF)", "https://www.energy.gov/sites/default/files/2022-11/ssl-miller-lehman_flicker_lightfair2015.pdf"),
-    ("Miller et al., 2022 flicker review (PDF)", "https://www.energy.gov/sites/default/files/2022-08/ssl-miller-etal-2022-LRT-flicker-review-tlm-stimulus-response.pdf"),
-    ("Park et al., 2015: CCT, EEG & task performance (PMC)", "https://pmc.ncbi.nlm.nih.gov/articles/PMC4668153/"),
-    ("Chen et al., 2022: CCT × illuminance (MDPI)", "https://www.mdpi.com/1996-1073/15/12/4477"),
-    ("MDPI 2025 review referencing EN 12464-1 classroom levels", "https://www.mdpi.com/2075-5309/15/8/1233"),
-]
-for t, u in ALL_REFS:
-    doc.add_paragraph(f"• {t} — {u}")
-
-# Save DOCX
-OUT_DOCX = os.path.join(OUT_DIR, "School_Lighting_Booklet_FULL.docx")
-doc.save(OUT_DOCX)
-
-print("✅ DOCX created at:", OUT_DOCX)
-print("🖼️ Figures saved in:", IMG_DIR)
-print("ℹ️ Change the Matplotlib style via MATPLOTLIB_STYLE near the top if you want a different look.")
+    # Save DOCX (or PDF)
+    out_docx = os.path.join(OUT_DIR, "School_Lighting_Booklet_FULL." + backend)
+    doc.save(out_docx)
+    if optimize_images and backend == "docx":
+        with stage("optimize images"):
+            stats = imgopt.optimize_docx(out_docx, imgopt.MIN_PSNR if lossy_images else None)
+        print(imgopt.describe(stats))
+    return out_docx
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the school lighting booklet (DOCX or PDF).")
+    add_workers_arg(parser)
+    add_cache_arg(parser)
+    add_save_images_arg(parser)
+    add_optimize_arg(parser)
+    add_format_arg(parser)
+    add_pipeline_arg(parser)
+    add_stream_arg(parser)
+    add_backend_arg(parser)
+    add_timing_args(parser)
+    args = parser.parse_args()
+
+    with session(args.timings, args.profile, "st"):
+        OUT_DOCX = build(workers=args.workers, use_cache=args.use_cache, save_images=args.save_images,
+                         optimize_images=args.optimize_images, figure_format=args.figure_format,
+                         stream=args.stream, backend=args.backend, pipeline=args.pipeline,
+                         lossy_images=args.lossy_images)
+
+    print(f"✅ {args.backend.upper()} created at:", OUT_DOCX)
+    if args.save_images:
+        print("🖼️ Figures saved in:", IMG_DIR)
+    print("ℹ️ Change the Matplotlib style via MATPLOTLIB_STYLE near the top if you want a different look.")
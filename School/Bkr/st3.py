@@ -2,15 +2,35 @@
 # Creates 9 separate DOCX files (one per parameter) with full detail:
 # Definition, Ranges, Biological Effects (Hormones, Skin, Nervous system),
 # Biochemical Pathways, Recommendations, Checklist, and Parameter-Specific References.
+#
+# Rebuilds are incremental: school_lighting_chapters/.build_manifest.json records
+# a hash of each chapter dict, of the chapter-writing code, doctemplate.py and
+# the generator version, and only chapters whose inputs (or output file)
+# changed are written again.
+# --force rewrites everything; --bundle also keeps school_lighting_chapters.zip
+# (chapters plus Intro_School_Lighting.docx, under one school_lighting_chapters/ folder).
+# -j N writes the stale chapters in N processes; a chapter that fails is
+# reported by name and retried on the next run, the others are still written.
 
-from docx import Document
+import json
+import inspect
+import hashlib
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import docx
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
 from pathlib import Path
 
+from figures import resolve_workers
+import doctemplate
+from doctemplate import new_document
+from timing import stage, count, instrument, session, add_timing_args
+
 OUTDIR = Path("./school_lighting_chapters")
-OUTDIR.mkdir(parents=True, exist_ok=True)
 
 # ---------- Style helpers ----------
 def set_styles(doc):
@@ -64,9 +84,9 @@ def table2(doc, left, right):
         for r in range(2):
             t.cell(r,c).width = Inches(w)
 
-def write_chapter(filename, chapter):
-    doc = Document()
-    set_styles(doc)
+def write_chapter(filename, chapter, outdir=OUTDIR, verbose=True):
+    with stage("new document"):
+        doc = instrument(new_document(set_styles))
     add_title(doc, chapter["title"], chapter.get("subtitle"))
     add_h1(doc, "Definition");              p(doc, chapter["definition"])
     add_h1(doc, "Recommended Ranges");      table2(doc, chapter["ranges"]["optimal"], chapter["ranges"]["caution"])
@@ -93,9 +113,11 @@ def write_chapter(filename, chapter):
     add_h1(doc, "References")
     bullets(doc, chapter["refs"])
 
-    out = OUTDIR / filename
+    out = Path(outdir) / filename
     doc.save(out)
-    print(f"Saved: {out.resolve()}")
+    if verbose:
+        print(f"Saved: {out.resolve()}")
+    return out
 
 # ---------- Content for each chapter ----------
 chapters = [
@@ -432,8 +454,178 @@ chapters = [
 },
 ]
 
+# ---------- Build manifest ----------
+# Bump to rewrite every chapter for a reason the fingerprint cannot see
+GENERATOR_VERSION = 1
+# The code that turns a chapter dict into a DOCX; doctemplate.py is hashed whole
+CHAPTER_CODE = (set_styles, add_title, add_h1, add_h2, p, bullets, table2, write_chapter)
+MANIFEST_NAME = ".build_manifest.json"
+INTRO_NAME = "Intro_School_Lighting.docx"  # int.py's output, bundled with the chapters
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def fingerprint():
+    """Inputs shared by every chapter: generator version, chapter-writing code, doctemplate.py and python-docx."""
+    with open(doctemplate.__file__, "rb") as f:
+        template = hashlib.sha256(f.read()).hexdigest()
+    return {
+        "generator": GENERATOR_VERSION,
+        "writer": _sha256("".join(inspect.getsource(fn) for fn in CHAPTER_CODE)),
+        "doctemplate": template,
+        "python-docx": docx.__version__,
+    }
+
+def chapter_hash(chapter):
+    return _sha256(json.dumps(chapter, sort_keys=True, ensure_ascii=False))
+
+def _stamp(path):
+    """(size, mtime) of a built file, so hand-edited or deleted outputs count as stale."""
+    if path is None:
+        return None
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+class ChapterPaths(list):
+    """The chapter paths build() returns, with how many it rebuilt and how many were up to date."""
+
+    def __init__(self, paths, rebuilt=0, up_to_date=0):
+        super().__init__(paths)
+        self.rebuilt = rebuilt
+        self.up_to_date = up_to_date
+
+def load_manifest(outdir=OUTDIR):
+    try:
+        return json.loads((Path(outdir) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def stale_chapters(outdir=OUTDIR, manifest=None):
+    """Chapters whose dict, shared inputs or output file changed since the last build."""
+    outdir = Path(outdir)
+    manifest = load_manifest(outdir) if manifest is None else manifest
+    if manifest.get("fingerprint") != fingerprint():
+        return list(chapters)
+    built = manifest.get("chapters", {})
+    stale = []
+    for ch in chapters:
+        entry = built.get(ch["filename"])
+        if (entry is None or entry.get("spec") != chapter_hash(ch)
+                or entry.get("file") != _stamp(outdir / ch["filename"])):
+            stale.append(ch)
+    return stale
+
+def intro_path(outdir=OUTDIR):
+    """The intro that goes into the bundle: the copy in outdir, else int.py's own output (None if neither)."""
+    for path in (Path(outdir) / INTRO_NAME, Path(INTRO_NAME)):
+        if path.is_file():
+            return path
+    return None
+
+def write_bundle(paths, bundle):
+    """
+    Zip the chapters (and the intro) under one folder named after the bundle,
+    the layout of the school_lighting_chapters.zip that ships with the repo.
+    """
+    folder = Path(bundle).stem
+    with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{folder}/", "", zipfile.ZIP_STORED)
+        for path in sorted(paths, key=lambda p: Path(p).name):
+            zf.write(path, f"{folder}/{Path(path).name}")
+    print(f"Saved: {Path(bundle).resolve()}")
+    return bundle
+
+# ---------- Parallel writer ----------
+def _write_job(filename, chapter, outdir):
+    """Pool entry point: (filename, None) on success, (filename, error text) on failure."""
+    try:
+        write_chapter(filename, chapter, outdir, verbose=False)
+    except Exception as e:
+        return filename, f"{type(e).__name__}: {e}"
+    return filename, None
+
+def write_chapters(chs, outdir=OUTDIR, workers=1):
+    """
+    Write chapter dicts, over a process pool when workers > 1 (0 = one per
+    core). Each chapter is its own copy of the styled template, so the files
+    do not depend on the worker count; results are reported in chapter order.
+    Returns {filename: error text} for the chapters that failed.
+    """
+    jobs = [(ch["filename"], ch, outdir) for ch in chs]
+    workers = resolve_workers(workers, len(jobs))
+    if workers == 1:
+        results = [_write_job(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_write_job, *zip(*jobs)))
+
+    errors = {}
+    for filename, error in results:
+        if error is None:
+            print(f"Saved: {(Path(outdir) / filename).resolve()}")
+        else:
+            print(f"❌ Failed: {filename}: {error}")
+            errors[filename] = error
+    return errors
+
 # ---------- Generate all ----------
-for ch in chapters:
-    write_chapter(ch["filename"], ch)
+def build(outdir=OUTDIR, force=False, bundle=False, workers=1):
+    """
+    Write the missing or out-of-date chapters (all of them with force=True).
+    Raises RuntimeError naming the failed chapters once the rest are written.
+    """
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    with stage("check manifest"):
+        manifest = {} if force else load_manifest(outdir)
+        stale = stale_chapters(outdir, manifest)
+    with stage("write chapters"):
+        errors = write_chapters(stale, outdir, workers)
+    count("chapters written", len(stale) - len(errors))
+    count("chapters up to date", len(chapters) - len(stale))
+    paths = [outdir / ch["filename"] for ch in chapters]
+
+    # The bundle is rebuilt when a chapter, the intro or the zip itself changed (never with a chapter missing)
+    zip_path = outdir.with_suffix(".zip")
+    intro = intro_path(outdir)
+    bundle_stamp = manifest.get("bundle") if not stale else None
+    if bundle and not errors and (bundle_stamp is None or bundle_stamp != [_stamp(zip_path), _stamp(intro)]):
+        if intro is None:
+            print(f"ℹ️ {INTRO_NAME} not found (run int.py); bundling the chapters only.")
+        with stage("bundle"):
+            write_bundle(paths + ([intro] if intro else []), zip_path)
+        bundle_stamp = [_stamp(zip_path), _stamp(intro)]
+
+    if stale or bundle_stamp != manifest.get("bundle"):
+        new = {
+            "fingerprint": fingerprint(),
+            # Failed chapters get no entry, so the next run retries them
+            "chapters": {ch["filename"]: {"spec": chapter_hash(ch), "file": _stamp(path)}
+                         for ch, path in zip(chapters, paths) if ch["filename"] not in errors},
+            "bundle": bundle_stamp,
+        }
+        (outdir / MANIFEST_NAME).write_text(json.dumps(new, indent=1), encoding="utf-8")
+    if errors:
+        raise RuntimeError(f"{len(errors)} chapter(s) failed: {', '.join(errors)}")
+    return ChapterPaths(paths, rebuilt=len(stale), up_to_date=len(chapters) - len(stale))
+
+def add_rebuild_args(parser):
+    parser.add_argument("--force", action="store_true",
+                        help="rewrite every chapter even if the build manifest says it is up to date")
+    parser.add_argument("--bundle", action="store_true",
+                        help="also write school_lighting_chapters.zip with the intro (rebuilt only when an input changes)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="chapter writer processes (1 = serial, 0 = one per CPU core)")
 
-print("\nAll chapters generated in:", OUTDIR.resolve())
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build one DOCX per lighting parameter.")
+    add_rebuild_args(parser)
+    add_timing_args(parser)
+    args = parser.parse_args()
+    with session(args.timings, args.profile, "st3"):
+        paths = build(force=args.force, bundle=args.bundle, workers=args.workers)
+    print(f"{paths.rebuilt} of {len(paths)} chapters rebuilt, {paths.up_to_date} up to date.")
+    print("\nAll chapters generated in:", OUTDIR.resolve())
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+The shared BandCanvas must not leak state between charts: every chart of
+st.py, st2.py and file.py drawn in sequence on one canvas has to give the
+same bytes as the same chart drawn on a fresh canvas, and the PNGs the
+bytes the builders wrote before the canvas existed (a new pyplot figure
+per chart, axvspan bands, tight_layout() and savefig(bbox_inches="tight")).
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+import importlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("numpy")
+matplotlib = pytest.importorskip("matplotlib")
+pytest.importorskip("docx")
+pytest.importorskip("PIL")
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+import figures  # noqa: E402
+
+# builder module -> (render function, parameter list attribute)
+BUILDERS = {"st": ("render_param", "PARAMS"), "st2": ("render_param", "PARAMS"),
+            "file": ("render_parameter", "PARAMETERS")}
+
+
+def _builder(name):
+    module = importlib.import_module(name)
+    render, specs = BUILDERS[name]
+    return getattr(module, render), getattr(module, specs)
+
+
+@pytest.mark.parametrize("fmt", ["png", "svg"])
+@pytest.mark.parametrize("name", sorted(BUILDERS))
+def test_shared_canvas_matches_fresh_canvas(name, fmt):
+    render, specs = _builder(name)
+    figures._CANVASES.clear()
+    shared = [render(p, fmt=fmt) for p in specs]
+    for p, got in zip(specs, shared):
+        figures._CANVASES.clear()
+        assert render(p, fmt=fmt) == got, f"{name}: {p['id']} depends on the chart drawn before it"
+
+
+@pytest.mark.parametrize("name", sorted(BUILDERS))
+def test_mixed_formats_match_fresh_canvas(name):
+    # SVG mode renders a FALLBACK_DPI PNG and an SVG per chart, in either order
+    render, specs = _builder(name)
+    variants = [("png", figures.FALLBACK_DPI), ("svg", None), ("png", None)]
+    figures._CANVASES.clear()
+    shared = [[render(p, fmt=fmt, dpi=dpi) if dpi else render(p, fmt=fmt) for fmt, dpi in variants]
+              for p in specs]
+    for p, got in zip(specs, shared):
+        for (fmt, dpi), data in zip(variants, got):
+            figures._CANVASES.clear()
+            fresh = render(p, fmt=fmt, dpi=dpi) if dpi else render(p, fmt=fmt)
+            assert fresh == data, f"{name}: {p['id']} ({fmt}) depends on the chart drawn before it"
+
+
+class FreshFigure:
+    """The pre-canvas way of drawing a chart, behind the BandCanvas interface."""
+
+    def __init__(self, figsize, colors, alphas, labels=(None, None, None),
+                 hide_yticks=False, band_legend=False, style=None):
+        self.figsize, self.colors, self.alphas, self.labels = figsize, colors, alphas, labels
+        self.hide_yticks, self.band_legend = hide_yticks, band_legend
+
+    def start(self, xlim, good, warn, danger):
+        (bad, warn_c, good_c), (a_bad, a_warn, a_good), (l_bad, l_warn, l_good) = \
+            self.colors, self.alphas, self.labels
+        self.fig, ax = plt.subplots(figsize=self.figsize)
+        ax.axvspan(danger[0], warn[0], color=bad, alpha=a_bad, label=l_bad)
+        ax.axvspan(warn[0], good[0], color=warn_c, alpha=a_warn, label=l_warn)
+        ax.axvspan(good[0], good[1], color=good_c, alpha=a_good, label=l_good)
+        ax.axvspan(good[1], warn[1], color=warn_c, alpha=a_warn)
+        ax.axvspan(warn[1], danger[1], color=bad, alpha=a_bad)
+        ax.set_xlim(*xlim)
+        if self.hide_yticks:
+            ax.set_yticks([])
+        if self.band_legend:
+            ax.legend(loc="upper right")
+        return ax
+
+    def finish(self, dpi=None, bbox_inches=None, pad_inches=None, fmt="png"):
+        self.fig.tight_layout()
+        if fmt == "svg":
+            data = figures.fig_to_svg(self.fig, bbox_inches=bbox_inches, pad_inches=pad_inches)
+        else:
+            data = figures.fig_to_png(self.fig, dpi=dpi, bbox_inches=bbox_inches, pad_inches=pad_inches)
+        plt.close(self.fig)
+        return data
+
+
+@pytest.mark.parametrize("dpi", [None, figures.FALLBACK_DPI, 180])
+@pytest.mark.parametrize("name", sorted(BUILDERS))
+def test_png_matches_pre_canvas_rendering(name, dpi, monkeypatch):
+    module = importlib.import_module(name)
+    render, specs = _builder(name)
+    figures._CANVASES.clear()
+    shared = [render(p, fmt="png", dpi=dpi) if dpi else render(p, fmt="png") for p in specs]
+    monkeypatch.setattr(module, "band_canvas", FreshFigure)
+    for p, got in zip(specs, shared):
+        want = render(p, fmt="png", dpi=dpi) if dpi else render(p, fmt="png")
+        assert got == want, f"{name}: {p['id']} differs from the chart drawn on its own figure"
+
+
+@pytest.mark.parametrize("name", sorted(BUILDERS))
+def test_svg_matches_pre_canvas_rendering(name, monkeypatch):
+    module = importlib.import_module(name)
+    render, specs = _builder(name)
+    figures._CANVASES.clear()
+    shared = [render(p, fmt="svg") for p in specs]
+    monkeypatch.setattr(module, "band_canvas", FreshFigure)
+    for p, got in zip(specs, shared):
+        assert got == render(p, fmt="svg"), f"{name}: {p['id']} differs from the chart drawn on its own figure"
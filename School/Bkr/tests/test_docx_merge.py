@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+docx_merge.py: an appended part keeps its look and its links. A style that
+clashes with the base's is copied under a new id, list numbering is
+remapped onto the base numbering.xml, and images and hyperlinks get new
+relationships in the base.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+docx = pytest.importorskip("docx")
+Image = pytest.importorskip("PIL.Image")
+from docx.shared import Pt  # noqa: E402
+from docx.enum.style import WD_STYLE_TYPE  # noqa: E402
+from lxml import etree  # noqa: E402
+
+import docx_merge  # noqa: E402
+from docx_merge import R, PKG_RELS, _w, _wval  # noqa: E402
+
+URL = "https://example.org/lighting"
+
+
+def _doc(h1_size):
+    doc = docx.Document()
+    s = doc.styles.add_style("H1", WD_STYLE_TYPE.PARAGRAPH)
+    s.base_style = doc.styles["Heading 1"]
+    s.font.size = Pt(h1_size)
+    return doc
+
+
+def _png():
+    buf = io.BytesIO()
+    Image.new("RGB", (4, 3), (200, 40, 40)).save(buf, format="png")
+    return buf.getvalue()
+
+
+def _rewrite(path, part, edit):
+    """Apply edit(root) to one XML part of the DOCX at path."""
+    with zipfile.ZipFile(path) as z:
+        items = [(i, z.read(i.filename)) for i in z.infolist()]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for info, data in items:
+            if info.filename == part:
+                root = etree.fromstring(data)
+                edit(root)
+                data = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+            z.writestr(info, data)
+
+
+@pytest.fixture
+def parts(tmp_path):
+    base = _doc(18)
+    base.add_paragraph("Base heading", style="H1")
+    base.add_paragraph("Base step", style="List Number")
+    base_path = tmp_path / "base.docx"
+    base.save(base_path)
+
+    png = _png()
+    part = _doc(24)  # same style id, different definition
+    part.add_paragraph("Part heading", style="H1")
+    part.add_paragraph("Part step", style="List Number")
+    part.add_paragraph("Custom step")
+    part.add_picture(io.BytesIO(png))
+    link = part.add_paragraph()
+    r_id = part.part.relate_to(URL, docx.opc.constants.RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+    h = etree.SubElement(link._p, _w("hyperlink"))
+    h.set(f"{{{R}}}id", r_id)
+    etree.SubElement(etree.SubElement(h, _w("r")), _w("t")).text = "source"
+    part_path = tmp_path / "part.docx"
+    part.save(part_path)
+
+    # A list definition the base does not have, used by "Custom step"
+    def add_list(numbering):
+        abstract = etree.SubElement(numbering, _w("abstractNum"))
+        abstract.set(_w("abstractNumId"), "77")
+        lvl = etree.SubElement(abstract, _w("lvl"))
+        lvl.set(_w("ilvl"), "0")
+        etree.SubElement(lvl, _w("numFmt")).set(_w("val"), "decimal")
+        etree.SubElement(lvl, _w("lvlText")).set(_w("val"), "Step %1.")
+        first_num = numbering.find(_w("num"))
+        first_num.addprevious(abstract)
+        num = etree.SubElement(numbering, _w("num"))
+        num.set(_w("numId"), "42")
+        etree.SubElement(num, _w("abstractNumId")).set(_w("val"), "77")
+
+    def number_custom_step(document):
+        p = next(p for p in document.iter(_w("p")) if "".join(p.itertext()) == "Custom step")
+        num_pr = etree.SubElement(etree.SubElement(p, _w("pPr")), _w("numPr"))
+        p.insert(0, num_pr.getparent())
+        etree.SubElement(num_pr, _w("ilvl")).set(_w("val"), "0")
+        etree.SubElement(num_pr, _w("numId")).set(_w("val"), "42")
+
+    _rewrite(part_path, "word/numbering.xml", add_list)
+    _rewrite(part_path, "word/document.xml", number_custom_step)
+    return base_path, part_path, png
+
+
+def _merged(path):
+    z = zipfile.ZipFile(path)
+    parse = lambda name: etree.fromstring(z.read(name))  # noqa: E731
+    return z, parse("word/document.xml"), parse("word/styles.xml"), parse("word/numbering.xml"), \
+        parse("word/_rels/document.xml.rels")
+
+
+def _paragraph(document, text):
+    return next(p for p in document.iter(_w("p")) if "".join(p.itertext()) == text)
+
+
+def _p_style(p):
+    style = p.find(f"{_w('pPr')}/{_w('pStyle')}")
+    return _wval(style) if style is not None else None
+
+
+def test_merge_remaps_styles_numbering_and_relationships(parts, tmp_path):
+    base_path, part_path, png = parts
+    out = docx_merge.merge(tmp_path / "merged.docx", [base_path, part_path])
+    z, document, styles, numbering, rels = _merged(out)
+
+    # Styles: the base keeps H1, the part's clashing H1 comes over as H12 / "H1 (2)"
+    by_id = {s.get(_w("styleId")): s for s in styles.iter(_w("style"))}
+    assert _p_style(_paragraph(document, "Base heading")) == "H1"
+    assert _p_style(_paragraph(document, "Part heading")) == "H12"
+    assert _wval(by_id["H12"].find(_w("name"))) == "H1 (2)"
+    assert _wval(by_id["H12"].find(f"{_w('rPr')}/{_w('sz')}")) == "48"  # 24 pt
+    # An identical style is shared, not copied
+    assert _p_style(_paragraph(document, "Part step")) == "ListNumber"
+    for kind in ("paragraph", "character", "table", "numbering"):
+        defaults = [s for s in by_id.values() if s.get(_w("type")) == kind and s.get(_w("default")) == "1"]
+        assert len(defaults) <= 1, kind
+
+    # Numbering: numId 42 is remapped onto a new base definition with the same levels
+    num_id = _wval(_paragraph(document, "Custom step").find(f"{_w('pPr')}/{_w('numPr')}/{_w('numId')}"))
+    nums = {n.get(_w("numId")): _wval(n.find(_w("abstractNumId"))) for n in numbering.findall(_w("num"))}
+    abstracts = {a.get(_w("abstractNumId")): a for a in numbering.findall(_w("abstractNum"))}
+    assert num_id in nums
+    lvl_text = abstracts[nums[num_id]].find(f"{_w('lvl')}/{_w('lvlText')}")
+    assert _wval(lvl_text) == "Step %1."
+    assert all(numbering.index(a) < numbering.index(n)
+               for a in numbering.findall(_w("abstractNum")) for n in numbering.findall(_w("num")))
+
+    # Relationships: every r:* reference resolves; the image is the part's bytes, the link its URL
+    by_rid = {rel.get("Id"): rel for rel in rels.iter(f"{{{PKG_RELS}}}Relationship")}
+    refs = [v for el in document.iter() for k, v in el.attrib.items() if k.startswith(f"{{{R}}}")]
+    assert refs and all(r in by_rid for r in refs)
+    (blip,) = document.iter("{http://schemas.openxmlformats.org/drawingml/2006/main}blip")
+    image = by_rid[blip.get(f"{{{R}}}embed")]
+    assert z.read("word/" + image.get("Target")) == png
+    (link,) = document.iter(_w("hyperlink"))
+    hyperlink = by_rid[link.get(f"{{{R}}}id")]
+    assert (hyperlink.get("Target"), hyperlink.get("TargetMode")) == (URL, "External")
+
+    # And python-docx reads it back in order
+    texts = [p.text for p in docx.Document(str(out)).paragraphs if p.text]
+    assert texts == ["Base heading", "Base step", "Part heading", "Part step", "Custom step", "source"]
+
+
+def test_default_parts_skip_the_intro_copy(tmp_path):
+    intro = tmp_path / "Intro_School_Lighting.docx"
+    chapters = tmp_path / "chapters"
+    chapters.mkdir()
+    for name in ("02_CRI.docx", "01_CCT.docx", intro.name, "~$01_CCT.docx"):
+        (chapters / name).write_bytes(b"")
+    intro.write_bytes(b"")
+    assert docx_merge.default_parts(intro, chapters) == [intro, chapters / "01_CCT.docx", chapters / "02_CRI.docx"]
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+evidence.py: text_rows() reads grouped numbers whole, assigns lux to eh, ev
+or medi by its qualifier, and drops values off their parameter's scale.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("numpy")
+
+import evidence  # noqa: E402
+
+PAGES = (
+    "Primary classrooms were lit at 2,700K and 3,500K with 1,000lx on the desk.\f"
+    "A second school used 3,000K and 5,000K, 300 lx vertical at the eye,\n"
+    "CRI 1000 and UGR 19. Misreads: 500 K lamps, 00 lux, 1,0000 lux.\n"
+)
+
+
+def _rows(text):
+    return [(page, param, value) for page, param, value, *_ in evidence.text_rows(text)]
+
+
+def test_grouped_numbers_and_scales():
+    assert _rows(PAGES) == [
+        (1, "cct", 2700.0), (1, "cct", 3500.0), (1, "eh", 1000.0),
+        (2, "cct", 3000.0), (2, "cct", 5000.0), (2, "ev", 300.0), (2, "ugr", 19.0),
+    ]
+
+
+def test_every_lux_param_has_a_scale():
+    for param, unit in evidence.PARAM_UNITS.items():
+        if unit in ("K", "lx"):
+            assert param in evidence.VALID, param
+
+
+def test_age_range_follows_the_values():
+    rows = list(evidence.text_rows(PAGES))
+    assert {age for *_, age, _start, _context in rows} == {(6, 12)}
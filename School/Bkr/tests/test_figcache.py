@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+figcache.py: store/fetch round trip, and a hit whose file another process
+trims between the read and the mtime refresh.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import figcache  # noqa: E402
+
+KEY = "ab" + "0" * 62
+
+
+def test_store_then_fetch(tmp_path):
+    assert figcache.fetch(KEY, str(tmp_path)) is None
+    figcache.store(KEY, b"png bytes", str(tmp_path))
+    assert figcache.fetch(KEY, str(tmp_path)) == b"png bytes"
+    assert figcache.fetch(KEY, str(tmp_path), ext=".svg") is None
+
+
+def test_fetch_survives_concurrent_trim(tmp_path, monkeypatch):
+    figcache.store(KEY, b"png bytes", str(tmp_path))
+
+    def trimmed(path, *args, **kwargs):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(figcache.os, "utime", trimmed)
+    assert figcache.fetch(KEY, str(tmp_path)) == b"png bytes"
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+imgopt.py: exact palettes give back the very same pixels (alpha included),
+busy images are left alone unless a PSNR floor is given, and images that
+become identical are stored once with every relationship retargeted.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import io
+import os
+import stat
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+from PIL import PngImagePlugin  # noqa: E402
+
+import imgopt  # noqa: E402
+
+COLORS = [(255, 255, 255, 255), (44, 160, 44, 255), (214, 39, 40, 128), (31, 119, 180, 0)]
+
+
+def _png(img, **info):
+    buf = io.BytesIO()
+    text = PngImagePlugin.PngInfo()
+    for k, v in info.items():
+        text.add_text(k, v)
+    img.save(buf, format="png", pnginfo=text)
+    return buf.getvalue()
+
+
+def _stripes(mode="RGBA", size=(240, 120)):
+    arr = np.zeros(size[::-1] + (4,), dtype=np.uint8)
+    for i in range(size[0]):
+        arr[:, i] = COLORS[(i // 7) % len(COLORS)]
+    return Image.fromarray(arr, "RGBA").convert(mode)
+
+
+def _noisy(size=(240, 120)):
+    """Stripes with a little noise: well over 256 colors, like antialiased edges."""
+    rng = np.random.default_rng(0)
+    arr = np.asarray(_stripes("RGB", size)).astype(np.int16) + rng.integers(-3, 4, size[::-1] + (3,))
+    return Image.fromarray(arr.clip(0, 255).astype(np.uint8), "RGB")
+
+
+def _pixels(data, mode):
+    return np.asarray(Image.open(io.BytesIO(data)).convert(mode))
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "RGB"])
+def test_exact_palette_round_trip(mode):
+    img = _stripes(mode)
+    data = _png(img)
+    out = imgopt.optimize_png(data)
+    assert len(out) < len(data)
+    assert Image.open(io.BytesIO(out)).mode == "P"
+    assert np.array_equal(_pixels(out, mode), np.asarray(img))
+
+
+def test_busy_image_is_left_alone_unless_lossy():
+    data = _png(_noisy())
+    assert imgopt.optimize_png(data) is data
+    lossy = imgopt.optimize_png(data, min_psnr=30)
+    assert lossy is not data and Image.open(io.BytesIO(lossy)).mode == "P"
+    assert imgopt._psnr(_pixels(data, "RGB"), _pixels(lossy, "RGB")) >= 30
+
+
+@pytest.mark.parametrize("rels_name, target, expected", [
+    ("word/_rels/document.xml.rels", "media/image2.png", "media/image1.png"),
+    ("word/_rels/header1.xml.rels", "media/image2.png", "media/image1.png"),
+    ("word/glossary/_rels/document.xml.rels", "../media/image2.png", "../media/image1.png"),
+    ("word/_rels/document.xml.rels", "/word/media/image2.png", "media/image1.png"),
+    ("word/_rels/document.xml.rels", "media/image3.png", "media/image3.png"),
+    ("word/_rels/document.xml.rels", "https://example.org/media/image2.png", "https://example.org/media/image2.png"),
+])
+def test_retarget(rels_name, target, expected):
+    moved = {"word/media/image2.png": "word/media/image1.png"}
+    xml = f'<Relationship Id="rId9" Target="{target}"/>'
+    assert imgopt._retarget(xml, rels_name, moved) == f'<Relationship Id="rId9" Target="{expected}"/>'
+
+
+def test_optimize_docx_dedups_and_retargets(tmp_path):
+    docx = pytest.importorskip("docx")
+    img = _stripes()
+    doc = docx.Document()
+    # Same pixels, different text chunks: distinct parts until optimization
+    doc.add_picture(io.BytesIO(_png(img, Software="matplotlib")))
+    doc.add_picture(io.BytesIO(_png(img, Title="chart")))
+    path = tmp_path / "booklet.docx"
+    doc.save(path)
+    os.chmod(path, 0o640)
+    with zipfile.ZipFile(path) as z:
+        assert len([n for n in z.namelist() if "/media/" in n]) == 2
+
+    stats = imgopt.optimize_docx(str(path))
+    assert (stats["images"], stats["optimized"], stats["duplicates"]) == (2, 2, 1)
+    assert stats["after"] == os.path.getsize(path) < stats["before"]
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+    with zipfile.ZipFile(path) as z:
+        assert z.testzip() is None
+        (media,) = [n for n in z.namelist() if "/media/" in n]
+    reread = docx.Document(str(path))
+    shapes = reread.inline_shapes
+    assert len(shapes) == 2
+    blobs = []
+    for shape in shapes:
+        r_id = shape._inline.graphic.graphicData.pic.blipFill.blip.embed
+        part = reread.part.related_parts[r_id]
+        assert part.partname == "/" + media
+        blobs.append(part.blob)
+    assert np.array_equal(_pixels(blobs[0], "RGBA"), np.asarray(img))
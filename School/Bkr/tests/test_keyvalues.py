@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+keyvalues.py: values, offsets and kinds from scan(), the same hits whatever
+the chunking given to Scanner, CRI/UGR taking the next number on their line
+only, and thousands separators read as one number.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keyvalues  # noqa: E402
+from keyvalues import Hit, Scanner, scan, scan_stream  # noqa: E402
+
+TEXT = (
+    "Kindergarten rooms at 2,700K and 500 lux were compared with 4000 K at 1,000 lx.\n"
+    "Children aged 6-12 read faster; CRI ≥ 80 and UGR < 19 were kept.\n"
+    "LEDs flickering at 120 Hz gave a 12.5% improvement in task time.\n"
+    "The CRI was not reported\n"
+    "for 90 pupils, and ugr of 1,000 is no value.\n"
+)
+
+
+def _values(text):
+    return [(h.kind, h.value) for h in scan(text)]
+
+
+def test_scan_values_and_offsets():
+    hits = scan(TEXT)
+    assert [(h.kind, h.value) for h in hits] == [
+        ("age", "kindergarten"), ("cct", 2700), ("lux", 500), ("cct", 4000), ("lux", 1000),
+        ("age", "children"), ("age_range", (6, 12)), ("cri", 80), ("ugr", 19),
+        ("hz", 120), ("percent", "12.5"),
+    ]
+    spans = [TEXT[h.start:h.end] for h in hits]
+    assert spans[:5] == ["Kindergarten", "2,700K", "500 lux", "4000 K", "1,000 lx"]
+    assert spans[7:9] == ["80", "19"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2,700K at 1,000 lx", [("cct", 2700), ("lux", 1000)]),
+    ("3,000K and 5,000 K", [("cct", 3000), ("cct", 5000)]),
+    ("1,000.5 lux", []),          # kelvin, lux and Hz are whole numbers
+    ("1,0000 lux", []),           # malformed grouping: not 1 and not 0
+    ("12345,678 lux", []),
+    ("27,00K", []),
+    ("at 300,500 lux", []),       # one number, as search.py reads it, too big for lux
+    ("2,700 K, 4000K", [("cct", 2700), ("cct", 4000)]),
+])
+def test_grouped_numbers(text, expected):
+    assert _values(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("CRI of 90", [("cri", 90)]),
+    ("CRI 80, 90", [("cri", 80)]),                   # only the first number
+    ("CRI ≥ 1,000 then 85", [("cri", 85)]),          # too long: the keyword waits for the next one
+    ("CRI\n85", []),                                 # disarmed at the end of its line
+    ("UGR of 16", [("ugr", 16)]),
+    ("UGR 190 ", []),
+    ("UGR < 19 at 300 lux", [("ugr", 19), ("lux", 300)]),
+    ("scrip 90", []),                                # keyword inside a word
+])
+def test_cri_ugr_arming(text, expected):
+    assert _values(text) == expected
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64, 65, 1000])
+def test_chunking_does_not_change_hits(size):
+    text = TEXT * 3
+    chunks = [text[i:i + size] for i in range(0, len(text), size)]
+    assert list(scan_stream(chunks)) == scan(text)
+
+
+def test_every_single_cut_point():
+    text = "at 2,700K and CRI of 90; " + "." * keyvalues.HOLD + " 1,0000 lux; 3,000K; aged 8 to 11"
+    whole = scan(text)
+    for cut in range(len(text) + 1):
+        s = Scanner()
+        assert s.feed(text[:cut]) + s.feed(text[cut:]) + s.close() == whole, cut
+
+
+def test_cri_waits_across_chunks():
+    s = Scanner()
+    assert s.feed("The CRI" + " " * 100) == []
+    assert s.feed("was 92 in every room" + " " * 100) == [Hit("cri", 92, 111, 113)]
+    assert s.close() == []
+
+
+def test_summarize():
+    res = keyvalues.summarize(scan(TEXT))
+    assert res == {
+        "CCT_values": [2700, 4000],
+        "Lux_values": [500, 1000],
+        "CRI_values": [80],
+        "Flicker_freqs_Hz": [120],
+        "age_mentions": ["kindergarten", "children"],
+        "percent_changes": ["12.5"],
+    }
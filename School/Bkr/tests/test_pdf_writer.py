@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+pdf_writer.py: PdfDocument output opens in pypdf's strict parser with the
+expected pages, one form XObject per vector figure (an image XObject per
+PNG, stored once however often it is added) and extractable text.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pypdf = pytest.importorskip("pypdf")
+pytest.importorskip("matplotlib")
+Image = pytest.importorskip("PIL.Image")
+
+from pdf_writer import PdfDocument, EMU_PER_PT  # noqa: E402
+import figures  # noqa: E402
+
+WIDTH = int(6.0 * 72 * EMU_PER_PT)  # Inches(6.0)
+
+
+def _chart(n):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(4, 2))
+    fig.add_subplot().plot(range(n + 2))
+    return figures.fig_to_pdf(fig)
+
+
+def _png():
+    buf = io.BytesIO()
+    Image.new("RGB", (40, 20), (44, 160, 44)).save(buf, format="png")
+    return buf.getvalue()
+
+
+def _xobjects(reader):
+    kinds = {}
+    for page in reader.pages:
+        for ref in (page["/Resources"].get("/XObject") or {}).values():
+            kinds[ref.idnum] = ref.get_object()["/Subtype"]
+    return sorted(kinds.values())
+
+
+def test_pdf_document_opens_strict():
+    doc = PdfDocument()
+    doc.add_heading("Lighting Booklet", 0)
+    doc.add_paragraph("Keep classroom illuminance ≥ 500 lx at the desk.")
+    for n in range(3):
+        doc.add_heading(f"Chapter {n + 1}", 1)
+        doc.add_paragraph("Recommended range", style="List Bullet")
+        doc.add_picture(io.BytesIO(_chart(n)), width=WIDTH)
+        doc.add_page_break()
+    png = _png()
+    doc.add_picture(io.BytesIO(png), width=WIDTH)
+    doc.add_picture(io.BytesIO(png), width=WIDTH)
+    out = io.BytesIO()
+    doc.save(out)
+
+    reader = pypdf.PdfReader(io.BytesIO(out.getvalue()), strict=True)
+    assert len(reader.pages) == 4
+    assert _xobjects(reader) == ["/Form", "/Form", "/Form", "/Image"]
+    text = "".join(page.extract_text() for page in reader.pages)
+    for words in ("Lighting Booklet", "Chapter 3", "Recommended range", "500 lx at the desk"):
+        assert words in text
+
+
+def test_booklet_pdf_has_one_form_per_chart(tmp_path, monkeypatch):
+    pytest.importorskip("docx")
+    import file as final
+    monkeypatch.setattr(final, "out_dir", str(tmp_path))
+    out = final.build(use_cache=False, backend="pdf")
+    reader = pypdf.PdfReader(str(out), strict=True)
+    assert len(reader.pages) == 7
+    assert _xobjects(reader) == ["/Form"] * len(final.PARAMETERS)
+    assert all(page.extract_text().strip() for page in reader.pages)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Serial, pooled (-j) and pipelined (--pipeline) figure rendering must hand
+the builders the same bytes for every chapter figure.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+import importlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("numpy")
+pytest.importorskip("matplotlib")
+pytest.importorskip("docx")
+pytest.importorskip("PIL")
+
+import figures  # noqa: E402
+
+BUILDERS = {"st": ("render_param", "PARAMS"), "st2": ("render_param", "PARAMS"),
+            "file": ("render_parameter", "PARAMETERS")}
+
+
+@pytest.mark.parametrize("fmt", ["png", "svg"])
+@pytest.mark.parametrize("name", sorted(BUILDERS))
+def test_pool_and_pipeline_match_serial(name, fmt):
+    module = importlib.import_module(name)
+    render, specs = getattr(module, BUILDERS[name][0]), getattr(module, BUILDERS[name][1])
+    dpi = getattr(module, "FIG_DPI", None)  # as the builder passes it
+    serial = figures.render_chapter_figures(render, specs, fmt, dpi, workers=1)
+    pooled = figures.render_chapter_figures(render, specs, fmt, dpi, workers=3)
+    piped = list(figures.iter_chapter_figures(render, specs, fmt, dpi, workers=3))
+    assert pooled == serial
+    assert piped == serial
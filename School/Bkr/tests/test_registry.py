@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+registry.py: a damaged on-disk cache (data file missing, truncated or
+overwritten) is a cache miss that is compiled again, never an error.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+
+import registry  # noqa: E402
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(registry, "_ARRAYS", None)
+    path = registry.build()
+    expected = registry.compile_all()
+    return path, expected
+
+
+def _reload():
+    registry._ARRAYS = None
+    return registry.arrays()
+
+
+def _assert_complete(arrays, expected):
+    assert set(arrays) == set(expected)
+    for name, arr in expected.items():
+        assert np.array_equal(arrays[name], arr, equal_nan=arr.dtype.kind == "f"), name
+
+
+def test_missing_data_file_is_rebuilt(cache):
+    path, expected = cache
+    os.remove(path)
+    _assert_complete(_reload(), expected)
+    assert os.path.exists(path)
+
+
+@pytest.mark.parametrize("keep", [0, 64, 0.5])
+def test_truncated_data_file_is_rebuilt(cache, keep):
+    path, expected = cache
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(int(size * keep) if isinstance(keep, float) else keep)
+    _assert_complete(_reload(), expected)
+
+
+def test_unreadable_index_is_rebuilt(cache):
+    path, expected = cache
+    with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as f:
+        f.write('{"ids": {')
+    _assert_complete(_reload(), expected)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+response.py: risk curves (flicker and glare discomfort in the BOOKLET and
+MERGED editions) count against a room, so a room whose readings sit in the
+Risk zone scores lower than the same room in the Optimal zone.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+
+import registry  # noqa: E402
+import response  # noqa: E402
+import zones  # noqa: E402
+
+RISKY = ("flicker", "ugr")
+
+
+def _rooms(edition):
+    """(P, 2) readings: an all-Optimal room, then the same room with flicker and UGR in the Risk zone."""
+    ids = registry.ids(edition)
+    edges = registry.band_edges(edition)
+    optimal = (edges[:, 2] + edges[:, 3]) / 2
+    risky = optimal.copy()
+    for pid in RISKY:
+        i = ids.index(pid)
+        risky[i] = (edges[i, 4] + edges[i, 5]) / 2 if edges[i, 5] > edges[i, 4] else edges[i, 5] * 1.5
+    return ids, np.stack([optimal, risky], axis=1)
+
+
+@pytest.mark.parametrize("edition", registry.SPECS)
+def test_risk_zone_scores_lower_than_optimal(edition):
+    ids, values = _rooms(edition)
+    for pid in RISKY:
+        z, _ = zones.classify_param(values[ids.index(pid)], pid, edition)
+        assert list(z) == [zones.GOOD, zones.DANGER], pid
+    optimal, risky = response.score_rooms(values, edition)
+    assert 0 <= risky < optimal <= 1
+
+
+def test_booklet_flicker_and_glare_are_risk_curves():
+    ideal = {"cct": 4500, "cri": 90, "flicker": 0, "ugr": 16, "medi": 250, "ev": 400, "exposure": 3, "eh": 500}
+    worse = dict(ideal, flicker=50, ugr=30)
+    rooms = {pid: [ideal[pid], worse[pid]] for pid in ideal}
+    ideal_score, worse_score = response.score_rooms(rooms, "booklet")
+    assert ideal_score > 0.8 > 0.65 > worse_score
+    # One parameter alone: no risk is a full score, the top of the risk curve none
+    assert list(response.score_rooms({"flicker": [0, 50]}, "booklet")) == [1.0, pytest.approx(0.0, abs=0.06)]
+
+
+@pytest.mark.parametrize("edition", registry.SPECS)
+def test_direction_matches_the_curve_label(edition):
+    risk = registry.stacked(edition)["risk"]
+    for p, is_risk in zip(registry.specs(edition), risk):
+        label = p.get("y_label", "")
+        assert bool(is_risk) == ("Risk" in label or "Discomfort" in label), (edition, p["id"])
+
+
+def test_unknown_direction_is_an_error():
+    with pytest.raises(ValueError, match="direction"):
+        registry.spec_direction("booklet", {"id": "cct", "direction": "harm"})
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+room_reports.py: the overall score in each report and in summary.csv ranks
+an all-Optimal room above one whose flicker and glare are in Caution, and
+that one above the same room in Risk.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+import csv
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+docx = pytest.importorskip("docx")
+pytest.importorskip("matplotlib")
+pytest.importorskip("PIL")
+
+import registry  # noqa: E402
+import room_reports  # noqa: E402
+
+ROOMS = ("optimal", "caution", "risk")
+RISKY = ("flicker", "ugr")
+
+
+def _write_rooms(path, edition):
+    """One row per ROOMS entry: every parameter mid-band, flicker and UGR mid-caution or mid-risk."""
+    ids = registry.ids(edition)
+    edges = registry.band_edges(edition)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        out = csv.writer(f)
+        out.writerow(["school", "room"] + ids)
+        for room in ROOMS:
+            row = (edges[:, 2] + edges[:, 3]) / 2
+            for pid in RISKY:
+                i = ids.index(pid)
+                if room == "caution":
+                    row[i] = (edges[i, 3] + edges[i, 4]) / 2
+                elif room == "risk":
+                    row[i] = (edges[i, 4] + edges[i, 5]) / 2
+            out.writerow(["Test School", room] + [f"{v:g}" for v in row])
+
+
+def _report_score(path):
+    (line,) = [p.text for p in docx.Document(path).paragraphs if p.text.startswith("Overall score")]
+    return int(line.split(":")[1].split("%")[0])
+
+
+@pytest.mark.parametrize("edition", ["booklet", "merged", "final"])
+def test_scores_rank_optimal_caution_risk(tmp_path, edition):
+    rooms_csv = tmp_path / "rooms.csv"
+    _write_rooms(rooms_csv, edition)
+    outdir = tmp_path / "reports"
+    stats = room_reports.generate(str(rooms_csv), str(outdir), edition, use_cache=False, progress=False)
+    assert stats["rooms"] == len(ROOMS)
+
+    with open(outdir / "summary.csv", newline="", encoding="utf-8") as f:
+        rows = {r["room"]: r for r in csv.DictReader(f)}
+    for pid in RISKY:
+        assert [rows[room][pid] for room in ROOMS] == ["Optimal", "Caution", "Risk"], pid
+    scores = [float(rows[room]["score"]) for room in ROOMS]
+    assert scores == sorted(scores, reverse=True) and len(set(scores)) == len(scores)
+
+    printed = [_report_score(str(outdir / rows[room]["report"])) for room in ROOMS]
+    assert printed == [round(100 * s) for s in scores]
+    assert printed[0] > printed[2]
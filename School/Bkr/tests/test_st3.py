@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+st3.py incremental rebuilds: an unchanged tree is up to date, and a change
+to the chapter-writing code or to doctemplate.py makes every chapter stale.
+
+Run from School/Bkr:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+import shutil
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("docx")
+
+import st3  # noqa: E402
+import doctemplate  # noqa: E402
+
+
+@pytest.fixture
+def built(tmp_path):
+    outdir = tmp_path / "chapters"
+    paths = st3.build(outdir)
+    assert (paths.rebuilt, paths.up_to_date) == (len(st3.chapters), 0)
+    return outdir
+
+
+def test_second_build_is_up_to_date(built):
+    paths = st3.build(built)
+    assert (paths.rebuilt, paths.up_to_date) == (0, len(st3.chapters))
+
+
+def test_writer_change_makes_every_chapter_stale(built, monkeypatch):
+    def bullets(doc, items):
+        for it in items:
+            doc.add_paragraph("• " + it, style="Body")
+    code = tuple(bullets if fn is st3.bullets else fn for fn in st3.CHAPTER_CODE)
+    monkeypatch.setattr(st3, "CHAPTER_CODE", code)
+    assert len(st3.stale_chapters(built)) == len(st3.chapters)
+
+
+def test_doctemplate_change_makes_every_chapter_stale(built, tmp_path, monkeypatch):
+    edited = tmp_path / "doctemplate.py"
+    shutil.copyfile(doctemplate.__file__, edited)
+    with open(edited, "a", encoding="utf-8") as f:
+        f.write("\n# house style tweak\n")
+    monkeypatch.setattr(doctemplate, "__file__", str(edited))
+    assert len(st3.stale_chapters(built)) == len(st3.chapters)
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Stage timers, counters and peak memory for the document builders.
+
+The builders mark their phases and count what they produce:
+
+  from timing import stage, count, instrument
+  doc = instrument(Document())          # counts add_* calls, times add_picture/save
+  with stage("render figures"):
+      figs = render_chapter_figures(...)
+  count("figures", len(figs))
+
+Nothing is recorded unless a session is running: stage() then returns one
+shared no-op context manager, count() returns at once and instrument()
+hands the document back untouched, so the markers cost nothing in normal
+runs. A session is started by the --timings/--profile flags
+(add_timing_args) of cli.py and the builder scripts:
+
+  python cli.py --timings report.json merged
+  python st2.py --timings - --profile st2.prof     # "-" prints the JSON
+
+The JSON report lists every stage by path ("render figures/savefig"; a stage
+entered several times is summed) with wall and CPU seconds, self seconds
+(wall minus nested stages), calls and the peak RSS reached by its end, then
+the counters and whole-run totals. --profile also dumps cProfile stats
+(python -m pstats st2.prof). Work done in pool workers (-j N) is not split
+into stages: it shows up in the stage waiting for it and in children_cpu_s.
+
+Standard library only, so cli.py can import it while building its parser.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import contextlib
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak memory is reported as null
+    resource = None
+
+_NULL = contextlib.nullcontext()
+_session = None
+
+
+def _peak_rss_mb(who="self"):
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def _children_cpu():
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+class _Stage:
+    __slots__ = ("session", "name", "path", "t0", "c0")
+
+    def __init__(self, session, name):
+        self.session = session
+        self.name = name
+
+    def __enter__(self):
+        stack = self.session.stack
+        stack.append(self.name)
+        self.path = "/".join(stack)
+        if self.path not in self.session.stages:  # entry order, so parents come before their stages
+            self.session.stages[self.path] = {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_mb": None}
+        self.t0 = time.perf_counter()
+        self.c0 = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.t0
+        cpu = time.process_time() - self.c0
+        self.session.stack.pop()
+        rec = self.session.stages[self.path]
+        rec["calls"] += 1
+        rec["wall_s"] += wall
+        rec["cpu_s"] += cpu
+        rec["peak_rss_mb"] = _peak_rss_mb()
+        return False
+
+
+class Session:
+    """One instrumented run: stages (in first-entered order), counters and totals."""
+
+    def __init__(self, label=None):
+        self.label = label
+        self.stack = []
+        self.stages = {}
+        self.counts = {}
+        self.t0 = time.perf_counter()
+        self.c0 = time.process_time()
+        self.children0 = _children_cpu()
+
+    def report(self):
+        stages = []
+        for path, rec in self.stages.items():
+            nested = sum(r["wall_s"] for p, r in self.stages.items()
+                         if p.startswith(path + "/") and "/" not in p[len(path) + 1:])
+            stages.append({"stage": path, "calls": rec["calls"], "wall_s": round(rec["wall_s"], 6),
+                           "cpu_s": round(rec["cpu_s"], 6), "self_s": round(rec["wall_s"] - nested, 6),
+                           "peak_rss_mb": rec["peak_rss_mb"]})
+        return {
+            "label": self.label,
+            "argv": sys.argv,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "total": {
+                "wall_s": round(time.perf_counter() - self.t0, 6),
+                "cpu_s": round(time.process_time() - self.c0, 6),
+                "children_cpu_s": round(_children_cpu() - self.children0, 6),
+                "peak_rss_mb": _peak_rss_mb(),
+                "children_peak_rss_mb": _peak_rss_mb("children"),
+            },
+            "stages": stages,
+            "counts": dict(self.counts),
+        }
+
+
+def stage(name):
+    """Context manager timing one phase; nested stages are reported as "outer/inner"."""
+    if _session is None:
+        return _NULL
+    return _Stage(_session, name)
+
+
+def count(name, n=1):
+    """Add n to a counter in the report (figures, paragraphs, images, rooms, ...)."""
+    if _session is not None:
+        _session.counts[name] = _session.counts.get(name, 0) + n
+
+
+def _wrap(fn, counter, stage_name):
+    if stage_name is None:
+        def wrapper(*args, **kwargs):
+            count(counter)
+            return fn(*args, **kwargs)
+    else:
+        def wrapper(*args, **kwargs):
+            if counter:
+                count(counter)
+            with stage(stage_name):
+                return fn(*args, **kwargs)
+    return wrapper
+
+
+# document method -> (counter, stage name or None when only counted)
+DOC_METHODS = {
+    "add_heading": ("headings", None),
+    "add_paragraph": ("paragraphs", None),
+    "add_table": ("tables", None),
+    "add_page_break": ("page breaks", None),
+    "add_picture": ("images", "add_picture"),
+    "save": (None, "save"),
+}
+
+
+def instrument(doc):
+    """
+    Count a document's add_* calls and time add_picture() and save() as
+    stages. Works for python-docx, docx_stream and pdf_writer documents;
+    returns doc itself (untouched when no session is running).
+    """
+    if _session is None:
+        return doc
+    for method, (counter, stage_name) in DOC_METHODS.items():
+        fn = getattr(doc, method, None)
+        if fn is not None:
+            setattr(doc, method, _wrap(fn, counter, stage_name))
+    return doc
+
+
+@contextlib.contextmanager
+def recording(label=None):
+    """Record stages and counters into a Session while the block runs; nothing is written."""
+    global _session
+    s = _session = Session(label)
+    try:
+        yield s
+    finally:
+        _session = None
+
+
+@contextlib.contextmanager
+def session(report=None, profile=None, label=None):
+    """
+    Record stages and counters while the block runs, then write the JSON
+    report to report ("-" for stdout) and cProfile stats to profile.
+    With neither set this does nothing and costs nothing.
+    """
+    if not report and not profile:
+        yield None
+        return
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with recording(label) as s:
+            yield s
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+            print(f"⏱️ cProfile stats: {profile}")
+        if report:
+            text = json.dumps(s.report(), indent=2, ensure_ascii=False)
+            if report == "-":
+                print(text)
+            else:
+                with open(report, "w", encoding="utf-8") as f:
+                    f.write(text + "\n")
+                print(f"⏱️ Timings: {report}")
+
+
+def add_timing_args(parser):
+    parser.add_argument(
+        "--timings", metavar="JSON",
+        help="write per-stage wall/CPU times, counts and peak memory as JSON ('-' = stdout)",
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE",
+        help="also dump cProfile stats for the whole run (python -m pstats FILE)",
+    )
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized zone classifier for bulk lighting measurements.
+
+Readings are classified against the same good/warn/danger bands the booklet
+charts draw (compiled by registry.py), as whole NumPy arrays with no
+per-reading Python loop:
+
+  zones, dist = classify_param(lux_readings, "eh")              # booklet bands
+  out = classify_readings({"eh": lux, "ugr": ugr, "cri": cri, "flicker": flk},
+                          edition="final")                       # {id: (zones, dist)}
+
+Zone codes (int8):
+  GOOD    0  inside the optimal band
+  WARN    1  inside the caution band, outside optimal
+  DANGER  2  anywhere else (including outside the charted span)
+  MISSING -1 NaN readings
+
+dist is the distance to the nearest edge of the optimal band, in the
+parameter's own units (0 inside the band, NaN for missing readings).
+
+Requirements:
+  pip install numpy
+"""
+
+import numpy as np
+
+import registry
+
+GOOD, WARN, DANGER, MISSING = 0, 1, 2, -1
+ZONE_NAMES = {GOOD: "Optimal", WARN: "Caution", DANGER: "Risk", MISSING: "Missing"}
+
+
+def edges_for(pid, edition="booklet"):
+    """(danger0, warn0, good0, good1, warn1, danger1) for one parameter id."""
+    ids = registry.ids(edition)
+    if pid not in ids:
+        raise KeyError(f"no parameter {pid!r} in the {edition} edition (have: {', '.join(ids)})")
+    return registry.band_edges(edition)[ids.index(pid)]
+
+
+def classify(values, edges):
+    """
+    Classify readings against band edges in one vectorized pass.
+
+    values: array of readings. edges: (..., 6) band edges whose leading
+    dimensions broadcast against values, e.g. (6,) for one parameter, or
+    (P, 1, 6) for a (P, N) block holding P parameters.
+    Returns (zones int8, distance float64), both shaped like values.
+    """
+    v = np.asarray(values, dtype=np.float64)
+    e = np.asarray(edges, dtype=np.float64)
+    w0, g0, g1, w1 = e[..., 1], e[..., 2], e[..., 3], e[..., 4]
+
+    # Whole-array ufuncs with in-place updates; masked assignment is left for the rare NaNs
+    dist = np.subtract(g0, v)
+    np.maximum(dist, v - g1, out=dist)
+    np.maximum(dist, 0.0, out=dist)
+
+    good = dist == 0.0
+    warn = v >= w0
+    warn &= v <= w1
+    warn |= good
+    zones = np.full(dist.shape, DANGER, dtype=np.int8)
+    zones -= warn   # DANGER -> WARN
+    zones -= good   # WARN -> GOOD
+    missing = np.isnan(v)
+    if missing.any():
+        zones[np.broadcast_to(missing, zones.shape)] = MISSING
+        dist[np.broadcast_to(missing, dist.shape)] = np.nan
+    return zones, dist
+
+
+def classify_param(values, pid, edition="booklet"):
+    """Classify one parameter's readings (e.g. pid="eh" for desk lux)."""
+    return classify(values, edges_for(pid, edition))
+
+
+def classify_readings(readings, edition="booklet"):
+    """Classify several parameters at once: {pid: array} -> {pid: (zones, distance)}."""
+    return {pid: classify_param(values, pid, edition) for pid, values in readings.items()}
+
+
+def zone_counts(zones):
+    """Readings per zone: {zone code: count}, missing readings included."""
+    counts = np.bincount(np.asarray(zones, dtype=np.int64).ravel() + 1, minlength=4)
+    return {MISSING: int(counts[0]), GOOD: int(counts[1]), WARN: int(counts[2]), DANGER: int(counts[3])}
@@ -3,146 +3,157 @@ from docx.shared import Inches
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
+from pathlib import Path
+
+OUTFILE = "Smart_Lighting_Research_Final.docx"
+# Downloaded figure shipped next to this script (see Figure 3 below)
+MDPI_IMAGE = Path(__file__).resolve().parent / "mdpi_vis_comparison.png"
+
+def build(outfile=OUTFILE):
+    # Create document
+    doc = Document()
+    doc.add_heading("Smart Adaptive LED Street Lighting (eSCai)", 0)
+
+    # Abstract
+    doc.add_heading("Abstract", level=1)
+    doc.add_paragraph(
+        "This research expands on the eSCai smart street lighting system, emphasizing adaptive control of LED fixtures "
+        "to reduce traffic accidents and optimize energy usage. The study identifies the problem of reduced visibility "
+        "under rain and fog and the high cost of operating LEDs at full power. The proposed solution introduces adaptive "
+        "dimming, correlated color temperature (CCT) adjustment, and smart control algorithms. Comparative analysis "
+        "demonstrates that operating LEDs at 50% doubles lifespan and saves up to 50% energy while maintaining or "
+        "enhancing visibility. The findings show significant improvements in safety and cost-effectiveness."
+    )
+
+    # Introduction
+    doc.add_heading("Introduction", level=1)
+    doc.add_paragraph(
+        "Road safety remains a major global challenge, particularly under adverse weather conditions such as rain and fog. "
+        "Traditional street lighting systems are static and do not adjust to changing environmental conditions. Operating LEDs "
+        "continuously at 100% power shortens lifespan due to heat generation, while also leading to higher energy costs. "
+        "This paper introduces eSCai, a smart adaptive street lighting fixture that addresses these issues."
+    )
+
+    # Problem Statement
+    doc.add_heading("Problem Statement", level=1)
+    doc.add_paragraph(
+        "Traffic accidents are common under fog and rain due to reduced visibility. Conventional lighting does not address "
+        "this issue. At the same time, full-power LED operation increases energy consumption and reduces lifespan. "
+        "The challenge: combine safety, efficiency, and sustainability."
+    )
+
+    # Why 3000K CCT
+    doc.add_heading("Why 3000K CCT Improves Visibility in Fog", level=1)
+    doc.add_paragraph(
+        "Fog consists of fine water droplets that scatter light. Shorter wavelengths (blue/white ~450nm, 6000K CCT) scatter more, "
+        "causing glare. Longer wavelengths (yellowish ~600nm, 3000K CCT) scatter less, penetrating fog more effectively. "
+        "Empirical evidence (Kang & Kwon, 2021, Applied Sciences) shows up to 300% improvement in contrast for dark targets in fog."
+    )
+
+    # --- Figure 1: Improved Block Diagram with Matplotlib ---
+    # import matplotlib.patches as mpatches
+
+    fig, ax = plt.subplots(figsize=(7,3))
+    ax.set_xlim(0,1)
+    ax.set_ylim(0,1)
+    ax.axis("off")
+
+    # Boxes
+    sensor_box = mpatches.FancyBboxPatch((0.05,0.4),0.2,0.2,boxstyle="round,pad=0.1",fc="lightblue", ec="black")
+    controller_box = mpatches.FancyBboxPatch((0.35,0.4),0.2,0.2,boxstyle="round,pad=0.1",fc="lightgreen", ec="black")
+    driver_box = mpatches.FancyBboxPatch((0.65,0.4),0.15,0.2,boxstyle="round,pad=0.1",fc="orange", ec="black")
+    led_box = mpatches.FancyBboxPatch((0.85,0.4),0.1,0.2,boxstyle="round,pad=0.1",fc="yellow", ec="black")
+
+    ax.add_patch(sensor_box)
+    ax.add_patch(controller_box)
+    ax.add_patch(driver_box)
+    ax.add_patch(led_box)
+
+    # Text labels
+    ax.text(0.15,0.5,"Sensors\n(Fog/Rain/Traffic)",ha="center",va="center")
+    ax.text(0.45,0.5,"Control Unit\n(MCU)",ha="center",va="center")
+    ax.text(0.725,0.5,"LED Driver",ha="center",va="center")
+    ax.text(0.9,0.5,"LED Fixture\n(eSCai)",ha="center",va="center")
+
+    # Arrows
+    ax.annotate("", xy=(0.35,0.5), xytext=(0.25,0.5), arrowprops=dict(arrowstyle="->", lw=2))
+    ax.annotate("", xy=(0.65,0.5), xytext=(0.55,0.5), arrowprops=dict(arrowstyle="->", lw=2))
+    ax.annotate("", xy=(0.85,0.5), xytext=(0.8,0.5), arrowprops=dict(arrowstyle="->", lw=2))
+
+    # Save with white background (important for Word)
+    plt.savefig("block_diagram_better.png", dpi=300, bbox_inches="tight", facecolor="white")
+    plt.close()
+
+    doc.add_picture("block_diagram_better.png", width=Inches(5))
+    doc.add_paragraph("Figure 1: Improved block diagram of the eSCai smart lighting system.").alignment = 1
+
+    # --- Figure 2: Energy Consumption Chart ---
+    hours = [0, 200, 400, 600, 800, 1000]
+    power_100 = [h * 0.1 for h in hours]
+    power_50 = [h * 0.05 for h in hours]
+    plt.figure()
+    plt.plot(hours, power_100, label="100% Power (100W)", color="red")
+    plt.plot(hours, power_50, label="50% Power (50W)", color="green")
+    plt.xlabel("Operating Hours")
+    plt.ylabel("Energy Consumption (kWh)")
+    plt.title("Energy Consumption Comparison")
+    plt.legend()
+    plt.savefig("energy_comparison.png")
+    plt.close()
+    doc.add_picture("energy_comparison.png", width=Inches(5))
+    doc.add_paragraph("Figure 2: Energy consumption of traditional 100% LED vs eSCai at 50%.").alignment = 1
+
+    # --- Figure 3: MDPI Visibility Comparison Image ---
+    # Make sure you download the image manually and save it as 'mdpi_vis_comparison.png'
+    doc.add_picture(str(MDPI_IMAGE), width=Inches(5))
+    doc.add_paragraph("Figure 3: Visibility comparison in fog using 3000 K vs 6000 K lighting (from Kang & Kwon, 2021).").alignment = 1
+
+    # --- Figure 4: Spectral Distribution ---
+    wavelengths = np.linspace(400,700,300)
+    blue = np.exp(-0.5*((wavelengths-450)/20)**2)
+    yellow = np.exp(-0.5*((wavelengths-600)/30)**2)
+    plt.figure()
+    plt.plot(wavelengths, blue, label="6000K (Blue-White)")
+    plt.plot(wavelengths, yellow, label="3000K (Yellowish)")
+    plt.xlabel("Wavelength (nm)")
+    plt.ylabel("Relative Intensity")
+    plt.title("Spectral Distribution of LEDs")
+    plt.legend()
+    plt.savefig("spectral.png")
+    plt.close()
+    doc.add_picture("spectral.png", width=Inches(5))
+    doc.add_paragraph("Figure 4: Simplified spectral distribution showing less scattering at 3000K.").alignment = 1
+
+    # Results
+    doc.add_heading("Results and Discussion", level=1)
+    doc.add_paragraph(
+        "The results confirm that eSCai reduces energy use by ~50%, doubles LED lifespan, and improves visibility in fog. "
+        "The MDPI study confirms up to 300% improvement in contrast for pedestrians in heavy fog. Municipalities adopting "
+        "this system can save energy, reduce maintenance, and increase safety."
+    )
+
+    # Conclusion
+    doc.add_heading("Conclusion", level=1)
+    doc.add_paragraph(
+        "The eSCai smart fixture integrates adaptive dimming, CCT adjustment, and efficient control. It demonstrates "
+        "significant improvements over traditional systems. Future enhancements may include IoT connectivity and AI-based prediction."
+    )
+
+    # References
+    doc.add_heading("References", level=1)
+    doc.add_paragraph(
+        "[1] H. Kang and S.-J. Kwon, “A Study on the Night Visibility Evaluation Method of Color Temperature Convertible "
+        "Automotive Headlamps Considering Weather Conditions,” Applied Sciences, vol. 11, no. 18, p. 8661, 2021. "
+        "DOI: 10.3390/app11188661\n"
+        "[2] Analysis of System Response, Energy Savings, and Fault Detection in a Weather and Traffic-Adaptive Smart Lighting System.\n"
+        "[3] Studies on LED thermal stress and lifespan under dimmed operation.\n"
+    )
+
+    # Save DOCX
+    doc.save(outfile)
+    return outfile
+
+if __name__ == "__main__":
+    out = build()
+    print("DOCX generated:", out)
 
-# Create document
-doc = Document()
-doc.add_heading("Smart Adaptive LED Street Lighting (eSCai)", 0)
-
-# Abstract
-doc.add_heading("Abstract", level=1)
-doc.add_paragraph(
-    "This research expands on the eSCai smart street lighting system, emphasizing adaptive control of LED fixtures "
-    "to reduce traffic accidents and optimize energy usage. The study identifies the problem of reduced visibility "
-    "under rain and fog and the high cost of operating LEDs at full power. The proposed solution introduces adaptive "
-    "dimming, correlated color temperature (CCT) adjustment, and smart control algorithms. Comparative analysis "
-    "demonstrates that operating LEDs at 50% doubles lifespan and saves up to 50% energy while maintaining or "
-    "enhancing visibility. The findings show significant improvements in safety and cost-effectiveness."
-)
-
-# Introduction
-doc.add_heading("Introduction", level=1)
-doc.add_paragraph(
-    "Road safety remains a major global challenge, particularly under adverse weather conditions such as rain and fog. "
-    "Traditional street lighting systems are static and do not adjust to changing environmental conditions. Operating LEDs "
-    "continuously at 100% power shortens lifespan due to heat generation, while also leading to higher energy costs. "
-    "This paper introduces eSCai, a smart adaptive street lighting fixture that addresses these issues."
-)
-
-# Problem Statement
-doc.add_heading("Problem Statement", level=1)
-doc.add_paragraph(
-    "Traffic accidents are common under fog and rain due to reduced visibility. Conventional lighting does not address "
-    "this issue. At the same time, full-power LED operation increases energy consumption and reduces lifespan. "
-    "The challenge: combine safety, efficiency, and sustainability."
-)
-
-# Why 3000K CCT
-doc.add_heading("Why 3000K CCT Improves Visibility in Fog", level=1)
-doc.add_paragraph(
-    "Fog consists of fine water droplets that scatter light. Shorter wavelengths (blue/white ~450nm, 6000K CCT) scatter more, "
-    "causing glare. Longer wavelengths (yellowish ~600nm, 3000K CCT) scatter less, penetrating fog more effectively. "
-    "Empirical evidence (Kang & Kwon, 2021, Applied Sciences) shows up to 300% improvement in contrast for dark targets in fog."
-)
-
-# --- Figure 1: Improved Block Diagram with Matplotlib ---
-# import matplotlib.patches as mpatches
-
-fig, ax = plt.subplots(figsize=(7,3))
-ax.set_xlim(0,1)
-ax.set_ylim(0,1)
-ax.axis("off")
-
-# Boxes
-sensor_box = mpatches.FancyBboxPatch((0.05,0.4),0.2,0.2,boxstyle="round,pad=0.1",fc="lightblue", ec="black")
-controller_box = mpatches.FancyBboxPatch((0.35,0.4),0.2,0.2,boxstyle="round,pad=0.1",fc="lightgreen", ec="black")
-driver_box = mpatches.FancyBboxPatch((0.65,0.4),0.15,0.2,boxstyle="round,pad=0.1",fc="orange", ec="black")
-led_box = mpatches.FancyBboxPatch((0.85,0.4),0.1,0.2,boxstyle="round,pad=0.1",fc="yellow", ec="black")
-
-ax.add_patch(sensor_box)
-ax.add_patch(controller_box)
-ax.add_patch(driver_box)
-ax.add_patch(led_box)
-
-# Text labels
-ax.text(0.15,0.5,"Sensors\n(Fog/Rain/Traffic)",ha="center",va="center")
-ax.text(0.45,0.5,"Control Unit\n(MCU)",ha="center",va="center")
-ax.text(0.725,0.5,"LED Driver",ha="center",va="center")
-ax.text(0.9,0.5,"LED Fixture\n(eSCai)",ha="center",va="center")
-
-# Arrows
-ax.annotate("", xy=(0.35,0.5), xytext=(0.25,0.5), arrowprops=dict(arrowstyle="->", lw=2))
-ax.annotate("", xy=(0.65,0.5), xytext=(0.55,0.5), arrowprops=dict(arrowstyle="->", lw=2))
-ax.annotate("", xy=(0.85,0.5), xytext=(0.8,0.5), arrowprops=dict(arrowstyle="->", lw=2))
-
-# Save with white background (important for Word)
-plt.savefig("block_diagram_better.png", dpi=300, bbox_inches="tight", facecolor="white")
-plt.close()
-
-doc.add_picture("block_diagram_better.png", width=Inches(5))
-doc.add_paragraph("Figure 1: Improved block diagram of the eSCai smart lighting system.").alignment = 1
-
-# --- Figure 2: Energy Consumption Chart ---
-hours = [0, 200, 400, 600, 800, 1000]
-power_100 = [h * 0.1 for h in hours]
-power_50 = [h * 0.05 for h in hours]
-plt.figure()
-plt.plot(hours, power_100, label="100% Power (100W)", color="red")
-plt.plot(hours, power_50, label="50% Power (50W)", color="green")
-plt.xlabel("Operating Hours")
-plt.ylabel("Energy Consumption (kWh)")
-plt.title("Energy Consumption Comparison")
-plt.legend()
-plt.savefig("energy_comparison.png")
-plt.close()
-doc.add_picture("energy_comparison.png", width=Inches(5))
-doc.add_paragraph("Figure 2: Energy consumption of traditional 100% LED vs eSCai at 50%.").alignment = 1
-
-# --- Figure 3: MDPI Visibility Comparison Image ---
-# Make sure you download the image manually and save it as 'mdpi_vis_comparison.png'
-doc.add_picture("mdpi_vis_comparison.png", width=Inches(5))
-doc.add_paragraph("Figure 3: Visibility comparison in fog using 3000 K vs 6000 K lighting (from Kang & Kwon, 2021).").alignment = 1
-
-# --- Figure 4: Spectral Distribution ---
-wavelengths = np.linspace(400,700,300)
-blue = np.exp(-0.5*((wavelengths-450)/20)**2)
-yellow = np.exp(-0.5*((wavelengths-600)/30)**2)
-plt.figure()
-plt.plot(wavelengths, blue, label="6000K (Blue-White)")
-plt.plot(wavelengths, yellow, label="3000K (Yellowish)")
-plt.xlabel("Wavelength (nm)")
-plt.ylabel("Relative Intensity")
-plt.title("Spectral Distribution of LEDs")
-plt.legend()
-plt.savefig("spectral.png")
-plt.close()
-doc.add_picture("spectral.png", width=Inches(5))
-doc.add_paragraph("Figure 4: Simplified spectral distribution showing less scattering at 3000K.").alignment = 1
-
-# Results
-doc.add_heading("Results and Discussion", level=1)
-doc.add_paragraph(
-    "The results confirm that eSCai reduces energy use by ~50%, doubles LED lifespan, and improves visibility in fog. "
-    "The MDPI study confirms up to 300% improvement in contrast for pedestrians in heavy fog. Municipalities adopting "
-    "this system can save energy, reduce maintenance, and increase safety."
-)
-
-# Conclusion
-doc.add_heading("Conclusion", level=1)
-doc.add_paragraph(
-    "The eSCai smart fixture integrates adaptive dimming, CCT adjustment, and efficient control. It demonstrates "
-    "significant improvements over traditional systems. Future enhancements may include IoT connectivity and AI-based prediction."
-)
-
-# References
-doc.add_heading("References", level=1)
-doc.add_paragraph(
-    "[1] H. Kang and S.-J. Kwon, “A Study on the Night Visibility Evaluation Method of Color Temperature Convertible "
-    "Automotive Headlamps Considering Weather Conditions,” Applied Sciences, vol. 11, no. 18, p. 8661, 2021. "
-    "DOI: 10.3390/app11188661\n"
-    "[2] Analysis of System Response, Energy Savings, and Fault Detection in a Weather and Traffic-Adaptive Smart Lighting System.\n"
-    "[3] Studies on LED thermal stress and lifespan under dimmed operation.\n"
-)
-
-# Save DOCX
-doc.save("Smart_Lighting_Research_Final.docx")
-print("DOCX generated: Smart_Lighting_Research_Final.docx")